@@ -0,0 +1,836 @@
+"""
+Batch Engine - Векторизованная пакетная валидация документов.
+
+Проверяет сразу весь DataFrame: каждое правило из rules.json вычисляется
+как булева маска по колонкам, а вердикты собираются с тем же приоритетом
+и теми же текстами, что и у logic.check_rules.
+
+Модуль не зависит от Streamlit и может использоваться из CLI и тестов:
+
+    python src/batch_engine.py documents.csv -o results.csv --chunk-size 50000
+    python src/batch_engine.py documents.csv -o results.csv --workers 32
+    python src/batch_engine.py documents.csv -o results.csv --duplicates
+    python src/batch_engine.py documents.csv -o results.csv --registry data/processed/document_numbers.sqlite
+    python src/batch_engine.py documents.csv -o results.csv --excel results.xlsx
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, IO, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from document_validators import (
+    parse_date,
+    validate_date_format,
+    validate_document_type
+)
+from duplicates import DuplicateDetector, DUPLICATE_COLUMN
+from number_registry import NumberRegistry, REGISTERED_COLUMN, REGISTERED_MESSAGE, frame_keys
+from logic import RuleSet, Severity, ValidationContext, Verdict, get_rule_set, check_rules_verdict
+
+
+# ========================================
+# КОНСТАНТЫ
+# ========================================
+
+# Колонки CSV и значения по умолчанию (как в row_to_document)
+COLUMN_DEFAULTS = {
+    "document_type":   "invoice",
+    "document_number": "",
+    "issue_date":      "",
+    "expiry_date":     "",
+    "total_amount":    0,
+    "inn":             "",
+    "is_signed":       "True",
+}
+
+# Строковые поля документа (пустая строка = поле не заполнено)
+STRING_FIELDS = ("document_type", "document_number", "issue_date", "expiry_date", "inn")
+
+# Поля, которые в документе из CSV никогда не бывают пустыми
+NEVER_EMPTY_FIELDS = ("total_amount", "is_signed", "required_fields")
+
+DEFAULT_REQUIRED_FIELDS = ("document_number", "issue_date")
+
+SIGNED_VALUES = ("true", "1", "yes")
+
+STATUS_EMOJI = {Severity.ERROR: "❌", Severity.WARNING: "⚠️", Severity.OK: "✅"}
+
+# Эмодзи по коду severity (индекс массива = int(Severity))
+_EMOJI_BY_CODE = np.array([STATUS_EMOJI[s] for s in sorted(Severity)], dtype=object)
+
+# Размер чанка для потоковой обработки CSV (строк)
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Колонки выходного CSV (results_frame)
+RESULT_COLUMNS = ["№", "Тип", "Дата выдачи", "Сумма", "Статус", "Результат"]
+
+
+# ========================================
+# ПОСТРОЧНЫЙ ПУТЬ (ЭТАЛОН)
+# ========================================
+
+def row_to_document(row: pd.Series) -> dict:
+    """Преобразует строку CSV в словарь документа."""
+    doc_type = str(row.get("document_type", "invoice")).strip()
+
+    # Обязательные поля берем из общего RuleSet (rules.json читается один раз)
+    required_fields = get_rule_set().required_fields_for(doc_type) or DEFAULT_REQUIRED_FIELDS
+
+    return {
+        "document_type":   doc_type,
+        "document_number": str(row.get("document_number", "")),
+        "issue_date":      str(row.get("issue_date", "")),
+        "expiry_date":     str(row.get("expiry_date", "")),
+        "total_amount":    float(row.get("total_amount", 0)),
+        "inn":             str(row.get("inn", "")),
+        "is_signed":       str(row.get("is_signed", "True")).strip().lower() in SIGNED_VALUES,
+        "required_fields": list(required_fields),
+    }
+
+
+def verdict_severity(result: Union[Verdict, str]) -> Severity:
+    """
+    Уровень вердикта. Для Verdict берется готовый severity; разбор префикса
+    остается только для пользовательских функций правил, возвращающих строку.
+    """
+    if isinstance(result, Verdict):
+        return result.severity
+    if "[ERROR]" in result:
+        return Severity.ERROR
+    if "[WARNING]" in result:
+        return Severity.WARNING
+    return Severity.OK
+
+
+def validate_rows(
+    df: pd.DataFrame,
+    check_rules_fn: Optional[Callable[[dict], Union[Verdict, str]]] = None,
+    rule_set: Optional[RuleSet] = None,
+    context: Optional[ValidationContext] = None
+) -> pd.DataFrame:
+    """
+    Построчная валидация (row_to_document + check_rules_fn для каждой строки).
+    Нужна для пользовательских функций правил и как эталон для validate_frame.
+
+    Args:
+        df: DataFrame в формате CSV пакетной валидации
+        check_rules_fn: Функция правил, возвращающая Verdict или строку
+            (по умолчанию check_rules_verdict с rule_set и context)
+        rule_set: Скомпилированные правила для check_rules
+        context: Контекст прогона для check_rules (один на весь пакет)
+
+    Returns:
+        DataFrame с колонками result (текст) и severity (код Severity), индекс как у df
+    """
+    if check_rules_fn is None:
+        rules = rule_set or get_rule_set()
+        context = context or ValidationContext.create(rule_set=rules)
+        check_rules_fn = lambda document: check_rules_verdict(document, rules, context)
+    verdicts = [check_rules_fn(row_to_document(row)) for _, row in df.iterrows()]
+    return pd.DataFrame(
+        {
+            "result": pd.Series([str(v) for v in verdicts], index=df.index, dtype=object),
+            "severity": np.array([verdict_severity(v) for v in verdicts], dtype=np.int8),
+        },
+        index=df.index
+    )
+
+
+# ========================================
+# НОРМАЛИЗАЦИЯ КОЛОНОК
+# ========================================
+
+def _map_unique(column: pd.Series, fn: Callable) -> np.ndarray:
+    """
+    Применяет fn к каждому уникальному значению колонки и раскладывает результат по строкам.
+    В пакетах мало различных типов/дат, поэтому Python-код выполняется O(уникальных) раз.
+    """
+    codes, uniques = pd.factorize(column, use_na_sentinel=False)
+    mapped = np.empty(len(uniques), dtype=object)
+    mapped[:] = [fn(value) for value in uniques]
+    return mapped[codes]
+
+
+def _column(df: pd.DataFrame, name: str) -> pd.Series:
+    if name in df.columns:
+        return df[name]
+    return pd.Series([COLUMN_DEFAULTS[name]] * len(df), index=df.index, dtype=object)
+
+
+def normalize_frame(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Приводит колонки к тем же значениям, что дает row_to_document для каждой строки.
+
+    Returns:
+        Словарь колонка -> numpy-массив (строки как object, сумма как float64, подпись как bool)
+    """
+    columns = {
+        name: _map_unique(_column(df, name), str)
+        for name in STRING_FIELDS
+    }
+    columns["document_type"] = _map_unique(_column(df, "document_type"), lambda v: str(v).strip())
+    columns["total_amount"] = _column(df, "total_amount").to_numpy(dtype=float)
+    columns["is_signed"] = _map_unique(
+        _column(df, "is_signed"),
+        lambda v: str(v).strip().lower() in SIGNED_VALUES
+    ).astype(bool)
+    return columns
+
+
+def _parse_dates(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Проверяет формат дат и разбирает их (по одному разу на уникальную строку).
+
+    Returns:
+        (valid, message, datetime64[D]) - массивы по строкам
+    """
+    def parse(value):
+        is_valid, msg = validate_date_format(value)
+        if not is_valid:
+            return False, msg, np.datetime64("NaT", "D")
+        return True, msg, np.datetime64(parse_date(value), "D")
+
+    parsed = _map_unique(pd.Series(values), parse)
+    valid = np.fromiter((p[0] for p in parsed), dtype=bool, count=len(parsed))
+    messages = np.array([p[1] for p in parsed], dtype=object)
+    dates = np.array([p[2] for p in parsed], dtype="datetime64[D]")
+    return valid, messages, dates
+
+
+# ========================================
+# ВЕКТОРИЗОВАННАЯ МАШИНА ВЫВОДА
+# ========================================
+
+class _VerdictBuilder:
+    """Назначает вердикты по маскам с приоритетом первой ошибки."""
+
+    def __init__(self, size: int):
+        self.result = np.empty(size, dtype=object)
+        self.pending = np.ones(size, dtype=bool)
+
+    def fail(self, mask: np.ndarray, messages: Callable[[np.ndarray], Iterable[str]]) -> None:
+        """Помечает ошибкой строки mask, у которых еще нет вердикта."""
+        rows = np.flatnonzero(mask & self.pending)
+        if len(rows):
+            self.result[rows] = list(messages(rows))
+            self.pending[rows] = False
+
+
+def validate_frame(
+    df: pd.DataFrame,
+    rule_set: Optional[RuleSet] = None,
+    context: Optional[ValidationContext] = None
+) -> pd.DataFrame:
+    """
+    Векторизованная валидация пакета документов.
+
+    Дает те же вердикты, что row_to_document + check_rules для каждой строки,
+    но каждое правило вычисляется одной маской по колонке.
+
+    Args:
+        df: DataFrame в формате CSV пакетной валидации
+        rule_set: Скомпилированные правила (по умолчанию общий get_rule_set())
+        context: Контекст прогона (по умолчанию - на сегодня)
+
+    Returns:
+        DataFrame с колонками result (текст вердикта) и severity (код Severity)
+    """
+    rules = rule_set or get_rule_set()
+    context = context or ValidationContext.create(rule_set=rules)
+    messages = rules.messages
+    size = len(df)
+    cols = normalize_frame(df)
+    doc_type = cols["document_type"]
+    amount = cols["total_amount"]
+    verdicts = _VerdictBuilder(size)
+
+    # --- 1. CRITICAL FILTERS ---
+
+    if rules.must_be_signed:
+        verdicts.fail(~cols["is_signed"], lambda rows: [messages['error_not_signed']] * len(rows))
+
+    type_codes, type_values = pd.factorize(pd.Series(doc_type), use_na_sentinel=False)
+    type_results = [
+        validate_document_type(t, rules.allowed_types_order, rules.blacklisted_types)
+        for t in type_values
+    ]
+    type_valid = np.array([ok for ok, _ in type_results], dtype=bool)[type_codes]
+    verdicts.fail(~type_valid, lambda rows: [
+        f"{messages['error_invalid_type']} ({type_results[type_codes[i]][1]})" for i in rows
+    ])
+
+    missing = np.empty(size, dtype=object)
+    missing[:] = ""
+    for code, t in enumerate(type_values):
+        in_type = type_codes == code
+        for name in rules.required_fields_for(t):
+            if name in cols and name not in NEVER_EMPTY_FIELDS:
+                empty = in_type & (cols[name] == "")
+            elif name in NEVER_EMPTY_FIELDS:
+                continue
+            else:
+                empty = in_type
+            missing[empty] = missing[empty] + (name + ", ")
+    has_missing = missing != ""
+    verdicts.fail(has_missing, lambda rows: [
+        f"{messages['error_missing_fields']} (Missing required fields: {missing[i][:-2]})" for i in rows
+    ])
+
+    # --- 2. HARD VALIDATION ---
+
+    issue_ok, issue_msg, issue = _parse_dates(cols["issue_date"])
+    verdicts.fail(~issue_ok, lambda rows: [
+        f"{messages['error_invalid_date']} ({issue_msg[i]})" for i in rows
+    ])
+
+    expiry_ok, expiry_msg, expiry = _parse_dates(cols["expiry_date"])
+    verdicts.fail(~expiry_ok, lambda rows: [
+        f"{messages['error_invalid_date']} ({expiry_msg[i]})" for i in rows
+    ])
+
+    both_ok = issue_ok & expiry_ok
+    verdicts.fail(both_ok & (expiry <= issue), lambda rows: [
+        f"[ERROR] Expiry date ({cols['expiry_date'][i]}) must be after issue date ({cols['issue_date'][i]})"
+        for i in rows
+    ])
+
+    today = np.datetime64(context.reference_date, "D")
+    cutoff = np.datetime64(context.expiry_warning_cutoff, "D")
+    days_left = (expiry - today).astype("int64")
+    if rules.expiry_date_must_be_future:
+        verdicts.fail(expiry_ok & (expiry < today), lambda rows: [
+            f"{messages['error_expired']} (Date is {-days_left[i]} days in the past)" for i in rows
+        ])
+
+    if rules.must_have_inn:
+        inn = cols["inn"]
+        lengths = " or ".join(map(str, rules.inn_lengths_order))
+        inn_series = pd.Series(inn, dtype=object)
+        inn_empty = inn == ""
+        inn_digits = inn_series.str.isdigit().to_numpy(dtype=bool)
+        inn_len = inn_series.str.len().to_numpy()
+        inn_len_ok = np.isin(inn_len, list(rules.inn_lengths))
+        verdicts.fail(inn_empty, lambda rows: [
+            f"{messages['error_invalid_inn']} (INN is empty)"
+        ] * len(rows))
+        verdicts.fail(~inn_digits, lambda rows: [
+            f"{messages['error_invalid_inn']} (INN must contain only digits, got: '{inn[i]}')" for i in rows
+        ])
+        verdicts.fail(~inn_len_ok, lambda rows: [
+            f"{messages['error_invalid_inn']} (INN length must be {lengths}, got: {inn_len[i]})" for i in rows
+        ])
+
+    verdicts.fail(amount < rules.min_amount, lambda rows: [
+        f"{messages['error_amount_range']} (Amount {amount[i]} is below minimum {rules.min_amount})"
+        for i in rows
+    ])
+    verdicts.fail(amount > rules.max_amount, lambda rows: [
+        f"{messages['error_amount_range']} (Amount {amount[i]} exceeds maximum {rules.max_amount})"
+        for i in rows
+    ])
+
+    # --- 3. SOFT VALIDATION ---
+
+    is_error = ~verdicts.pending
+    expiring = verdicts.pending & expiry_ok & (expiry >= today) & (expiry <= cutoff)
+    large = verdicts.pending & (amount >= rules.max_amount * rules.large_amount_threshold)
+
+    warnings = np.empty(size, dtype=object)
+    warnings[:] = ""
+    for i in np.flatnonzero(expiring):
+        warnings[i] = f"{messages['warning_expiring_soon']} (Document expires in {days_left[i]} days)"
+    for i in np.flatnonzero(large):
+        percent = (amount[i] / rules.max_amount) * 100
+        line = f"{messages['warning_large_amount']} (Amount {amount[i]} is {percent:.1f}% of maximum allowed)"
+        warnings[i] = f"{warnings[i]}\n{line}" if warnings[i] else line
+    has_warning = warnings != ""
+
+    # --- 4. ИТОГОВЫЙ ВЕРДИКТ ---
+
+    result = verdicts.result
+    result[has_warning] = warnings[has_warning]
+    ok_rows = np.flatnonzero(verdicts.pending & ~has_warning)
+    result[ok_rows] = [f"{messages['success']} for '{doc_type[i]}' document" for i in ok_rows]
+
+    severity = np.full(size, Severity.OK, dtype=np.int8)
+    severity[has_warning] = Severity.WARNING
+    severity[is_error] = Severity.ERROR
+    return pd.DataFrame(
+        {"result": result, "severity": severity},
+        index=df.index
+    )
+
+
+def results_frame(df: pd.DataFrame, verdicts: pd.DataFrame) -> pd.DataFrame:
+    """Таблица результатов (формат выгрузки страницы Batch Validation) по исходным колонкам и вердиктам."""
+    def column(name, default):
+        if name in df.columns:
+            return df[name].to_numpy()
+        return [default] * len(df)
+
+    return pd.DataFrame({
+        "№":           column("document_number", "—"),
+        "Тип":         column("document_type", "—"),
+        "Дата выдачи": column("issue_date", "—"),
+        "Сумма":       column("total_amount", 0),
+        "Статус":      _EMOJI_BY_CODE[verdicts["severity"].to_numpy()],
+        "Результат":   verdicts["result"].to_numpy(),
+    })
+
+
+# ========================================
+# ПОТОКОВАЯ ОБРАБОТКА CSV
+# ========================================
+
+@dataclass
+class BatchStats:
+    """
+    Счетчики пакетной валидации (в памяти хранятся только они).
+
+    Атрибуты:
+        total, ok, warnings, errors: Количество документов по статусам
+        chunks: Сколько чанков обработано
+        elapsed: Время обработки, сек
+        preview: Первые строки результата (не больше preview_limit)
+        error_samples: Первые ошибки (номер документа, вердикт)
+        duplicates: Сколько найдено дубликатов (если поиск включен)
+        registered: Сколько номеров уже было принято раньше (если задан реестр)
+    """
+    total: int = 0
+    ok: int = 0
+    warnings: int = 0
+    errors: int = 0
+    chunks: int = 0
+    elapsed: float = 0.0
+    preview_limit: int = 0
+    error_limit: int = 0
+    duplicates: int = 0
+    registered: int = 0
+    preview: List[pd.DataFrame] = field(default_factory=list, repr=False)
+    error_samples: List[Tuple[str, str]] = field(default_factory=list, repr=False)
+
+    def add(self, results: pd.DataFrame, verdicts: pd.DataFrame) -> None:
+        """Учитывает очередной чанк результатов."""
+        self.merge(summarize_chunk(results, verdicts, self.preview_limit, self.error_limit))
+
+    def merge(self, chunk: "ChunkSummary") -> None:
+        """Учитывает сводку чанка (в том числе посчитанную в другом процессе)."""
+        self.total += chunk.total
+        self.errors += chunk.errors
+        self.warnings += chunk.warnings
+        self.ok += chunk.ok
+        self.chunks += 1
+
+        shown = sum(len(part) for part in self.preview)
+        if shown < self.preview_limit:
+            self.preview.append(chunk.preview.head(self.preview_limit - shown))
+
+        if len(self.error_samples) < self.error_limit:
+            self.error_samples += chunk.error_samples[:self.error_limit - len(self.error_samples)]
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.total / self.elapsed if self.elapsed > 0 else 0.0
+
+    def preview_frame(self) -> pd.DataFrame:
+        if not self.preview:
+            return pd.DataFrame()
+        return pd.concat(self.preview, ignore_index=True)
+
+
+@dataclass
+class ChunkSummary:
+    """Компактная сводка по чанку: счетчики и ограниченные выборки строк."""
+    total: int
+    ok: int
+    warnings: int
+    errors: int
+    preview: pd.DataFrame
+    error_samples: List[Tuple[str, str]]
+
+
+def summarize_chunk(
+    results: pd.DataFrame,
+    verdicts: pd.DataFrame,
+    preview_limit: int,
+    error_limit: int
+) -> ChunkSummary:
+    """Считает статусы чанка (по кодам severity) и отбирает строки для предпросмотра."""
+    severity = verdicts["severity"].to_numpy()
+    counts = np.bincount(severity, minlength=len(Severity))
+    error_rows = results[severity == Severity.ERROR].head(error_limit)
+    return ChunkSummary(
+        total=len(severity),
+        ok=int(counts[Severity.OK]),
+        warnings=int(counts[Severity.WARNING]),
+        errors=int(counts[Severity.ERROR]),
+        preview=results.head(preview_limit),
+        error_samples=list(zip(error_rows["№"].astype(str), error_rows["Результат"]))
+    )
+
+
+def iter_csv_chunks(source: Union[str, IO], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Читает CSV чанками фиксированного размера.
+
+    Все колонки читаются как строки: так типы не "плавают" между чанками
+    (например, ИНН не превращается в float из-за пропуска в одном из чанков)
+    и не теряются ведущие нули ИНН.
+    """
+    yield from pd.read_csv(source, chunksize=chunk_size, dtype=str)
+
+
+def validate_chunks(
+    chunks: Iterable[pd.DataFrame],
+    output: Union[str, IO],
+    rule_set: Optional[RuleSet] = None,
+    context: Optional[ValidationContext] = None,
+    validator: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+    on_chunk: Optional[Callable[[BatchStats], None]] = None,
+    preview_limit: int = 100,
+    error_limit: int = 100,
+    duplicates: Optional[DuplicateDetector] = None,
+    registry: Optional[NumberRegistry] = None
+) -> BatchStats:
+    """
+    Валидирует поток чанков и дописывает результаты в выходной CSV по мере обработки.
+
+    Args:
+        chunks: Итератор DataFrame в формате CSV пакетной валидации
+        output: Путь к выходному CSV или текстовый файловый объект
+        rule_set: Скомпилированные правила (по умолчанию общий get_rule_set())
+        context: Контекст прогона (одна опорная дата на весь поток)
+        validator: Функция чанк -> вердикты (по умолчанию validate_frame)
+        on_chunk: Колбэк после каждого чанка (например, для прогресса)
+        preview_limit: Сколько первых строк результата сохранить для предпросмотра
+        error_limit: Сколько первых ошибок сохранить для показа
+        duplicates: Детектор дубликатов - если задан, в результат добавляется
+            колонка DUPLICATE_COLUMN (документы сравниваются со всеми
+            предыдущими в потоке)
+        registry: Реестр принятых номеров - если задан, в результат добавляется
+            колонка REGISTERED_COLUMN, документ без замечаний с уже принятым
+            номером получает предупреждение, а номера документов без ошибок
+            заносятся в реестр
+
+    Returns:
+        BatchStats
+    """
+    rules = rule_set or get_rule_set()
+    context = context or ValidationContext.create(rule_set=rules)
+    validate = validator or (lambda chunk: validate_frame(chunk, rules, context))
+    stats = BatchStats(preview_limit=preview_limit, error_limit=error_limit)
+    started = time.perf_counter()
+
+    own_file = isinstance(output, str)
+    out = open(output, "w", encoding="utf-8-sig", newline="") if own_file else output
+    try:
+        for chunk in chunks:
+            verdicts = validate(chunk)
+            results = results_frame(chunk, verdicts)
+            if duplicates is not None:
+                labels = duplicates.add_frame(chunk)
+                results[DUPLICATE_COLUMN] = labels
+                stats.duplicates += sum(1 for label in labels if label)
+            if registry is not None:
+                stats.registered += _check_registry(registry, chunk, verdicts, results)
+            results.to_csv(out, index=False, header=stats.chunks == 0)
+            stats.add(results, verdicts)
+            stats.elapsed = time.perf_counter() - started
+            if on_chunk:
+                on_chunk(stats)
+    finally:
+        if own_file:
+            out.close()
+
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+def _check_registry(
+    registry: NumberRegistry,
+    chunk: pd.DataFrame,
+    verdicts: pd.DataFrame,
+    results: pd.DataFrame
+) -> int:
+    """
+    Отмечает в results номера, уже принятые раньше (в реестре или выше в
+    этом же чанке), и заносит в реестр новые номера документов без ошибок.
+    Документ без замечаний с принятым номером получает предупреждение
+    REGISTERED_MESSAGE (verdicts и results обновляются на месте).
+    Возвращает число отмеченных.
+    """
+    keys = frame_keys(chunk)
+    in_registry = registry.contains_many(keys)
+    severity = verdicts["severity"].to_numpy()
+
+    # Реестр опрашивается одним запросом на чанк, а повторы внутри чанка
+    # проверяются построчно - как если бы каждая строка заносилась сразу
+    seen = np.zeros(len(keys), dtype=bool)
+    accepted = {}
+    for i, key in enumerate(keys):
+        if not key.number:
+            continue
+        if in_registry[i] or key in accepted:
+            seen[i] = True
+        elif severity[i] != Severity.ERROR:
+            accepted[key] = i
+    # Фильтр реестра не видит номера, принятые другими процессами после его
+    # открытия: такой номер обнаруживается по отклоненной вставке
+    added = registry.try_add_many(accepted)
+    for i, was_added in zip(accepted.values(), added):
+        if not was_added:
+            seen[i] = True
+
+    results[REGISTERED_COLUMN] = np.where(seen, "Да", "")
+    repeated = seen & (severity == Severity.OK)
+    if repeated.any():
+        severity = np.where(repeated, int(Severity.WARNING), severity)
+        verdicts["severity"] = severity
+        verdicts["result"] = np.where(repeated, REGISTERED_MESSAGE, verdicts["result"].to_numpy())
+        results["Статус"] = _EMOJI_BY_CODE[severity]
+        results["Результат"] = verdicts["result"].to_numpy()
+    return int(seen.sum())
+
+
+def validate_csv_stream(
+    source: Union[str, IO],
+    output: Union[str, IO],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    **kwargs
+) -> BatchStats:
+    """
+    Потоковая валидация CSV с ограниченным потреблением памяти.
+
+    Файл читается чанками по chunk_size строк, каждый чанк валидируется
+    validate_frame и сразу дописывается в output; в памяти остаются только
+    счетчики BatchStats. Остальные аргументы - как у validate_chunks.
+    """
+    return validate_chunks(iter_csv_chunks(source, chunk_size), output, **kwargs)
+
+
+# ========================================
+# ПАРАЛЛЕЛЬНАЯ ОБРАБОТКА (PROCESS POOL)
+# ========================================
+
+# RuleSet и контекст рабочего процесса (передаются один раз через initializer пула)
+_worker_rule_set: Optional[RuleSet] = None
+_worker_context: Optional[ValidationContext] = None
+
+
+def _init_worker(rule_set: RuleSet, context: ValidationContext) -> None:
+    global _worker_rule_set, _worker_context
+    _worker_rule_set = rule_set
+    _worker_context = context
+
+
+def plan_byte_ranges(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """
+    Делит CSV на диапазоны байт примерно по chunk_size строк, выровненные по концам строк.
+
+    Рассчитано на формат generate_sample_csv (одна запись - одна строка файла,
+    без переводов строк внутри кавычек).
+
+    Returns:
+        (имена колонок, список (start, end) в байтах)
+    """
+    columns = list(pd.read_csv(path, nrows=0, dtype=str).columns)
+    size = os.path.getsize(path)
+    ranges = []
+
+    with open(path, "rb") as f:
+        f.readline()
+        start = f.tell()
+        sample = f.read(1 << 16)
+        lines_in_sample = max(sample.count(b"\n"), 1)
+        chunk_bytes = max(int(len(sample) / lines_in_sample * chunk_size), 1)
+
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            if f.tell() < size:
+                f.readline()
+            end = f.tell()
+            ranges.append((start, end))
+            start = end
+
+    return columns, ranges
+
+
+def _validate_byte_range(
+    path: str,
+    start: int,
+    end: int,
+    columns: List[str],
+    preview_limit: int,
+    error_limit: int
+) -> Tuple[str, ChunkSummary]:
+    """Задача рабочего процесса: читает свой диапазон файла, валидирует, возвращает готовый CSV."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    chunk = pd.read_csv(io.BytesIO(data), header=None, names=columns, dtype=str)
+    verdicts = validate_frame(chunk, _worker_rule_set, _worker_context)
+    results = results_frame(chunk, verdicts)
+    return (
+        results.to_csv(index=False, header=False),
+        summarize_chunk(results, verdicts, preview_limit, error_limit)
+    )
+
+
+def validate_csv_parallel(
+    path: str,
+    output: Union[str, IO],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    rule_set: Optional[RuleSet] = None,
+    context: Optional[ValidationContext] = None,
+    on_chunk: Optional[Callable[[BatchStats], None]] = None,
+    preview_limit: int = 100,
+    error_limit: int = 100
+) -> BatchStats:
+    """
+    Параллельная валидация CSV на пуле процессов.
+
+    Файл делится на диапазоны байт по chunk_size строк; каждый процесс сам читает
+    и валидирует свой диапазон и возвращает готовый текст CSV, а главный процесс
+    только дописывает его в output в исходном порядке. RuleSet передается каждому
+    процессу один раз при запуске пула. Одновременно в работе не больше 2 * workers
+    диапазонов, поэтому память ограничена так же, как в validate_csv_stream.
+
+    Args:
+        path: Путь к входному CSV
+        output: Путь к выходному CSV или текстовый файловый объект
+        workers: Число процессов (по умолчанию os.cpu_count())
+        chunk_size: Примерное число строк в одной задаче
+        rule_set: Скомпилированные правила (по умолчанию общий get_rule_set())
+        context: Контекст прогона (одна опорная дата для всех процессов)
+        on_chunk, preview_limit, error_limit: Как у validate_chunks
+
+    Returns:
+        BatchStats (elapsed и rows_per_second - пропускная способность всего прогона)
+    """
+    rules = rule_set or get_rule_set()
+    context = context or ValidationContext.create(rule_set=rules)
+    workers = workers or os.cpu_count() or 1
+    stats = BatchStats(preview_limit=preview_limit, error_limit=error_limit)
+    started = time.perf_counter()
+    columns, ranges = plan_byte_ranges(path, chunk_size)
+
+    own_file = isinstance(output, str)
+    out = open(output, "w", encoding="utf-8-sig", newline="") if own_file else output
+    try:
+        pd.DataFrame(columns=RESULT_COLUMNS).to_csv(out, index=False)
+
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(rules, context)
+        ) as pool:
+            pending = deque()
+            tasks = iter(ranges)
+
+            def submit_next() -> None:
+                task = next(tasks, None)
+                if task is not None:
+                    pending.append(pool.submit(
+                        _validate_byte_range, path, task[0], task[1], columns, preview_limit, error_limit
+                    ))
+
+            for _ in range(2 * workers):
+                submit_next()
+
+            while pending:
+                csv_text, summary = pending.popleft().result()
+                submit_next()
+                out.write(csv_text)
+                stats.merge(summary)
+                stats.elapsed = time.perf_counter() - started
+                if on_chunk:
+                    on_chunk(stats)
+    finally:
+        if own_file:
+            out.close()
+
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+# ========================================
+# CLI
+# ========================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа командной строки для пакетной валидации."""
+    parser = argparse.ArgumentParser(description="Пакетная валидация документов из CSV или Excel")
+    parser.add_argument("input", help="Входной CSV или .xlsx (все листы с колонками документов)")
+    parser.add_argument("-o", "--output", required=True, help="Куда записать результаты (CSV)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Строк в чанке")
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Число процессов (1 - потоково в одном процессе, 0 - по числу ядер)"
+    )
+    parser.add_argument("--as-of", help="Проверить на дату YYYY-MM-DD (по умолчанию - сегодня)")
+    parser.add_argument(
+        "--duplicates", action="store_true",
+        help="Искать точные и почти-дубликаты (только в одном процессе)"
+    )
+    parser.add_argument(
+        "--registry",
+        help="Реестр принятых номеров (SQLite): отметить ранее принятые и занести новые "
+             "(только в одном процессе)"
+    )
+    parser.add_argument("--excel", help="Дополнительно выгрузить результаты в Excel (.xlsx)")
+    args = parser.parse_args(argv)
+
+    context = ValidationContext.create(args.as_of)
+    is_xlsx = args.input.lower().endswith(".xlsx")
+    if args.duplicates or args.registry or is_xlsx:
+        # Дубликаты и реестр сравнивают документ со всем потоком, а .xlsx нельзя
+        # поделить по байтам - только в одном процессе
+        args.workers = 1
+    if args.workers == 1:
+        validate_stream = validate_csv_stream
+        if is_xlsx:
+            # excel_import сам импортирует batch_engine - импорт здесь, а не в начале модуля
+            from excel_import import validate_xlsx_stream as validate_stream
+        registry = NumberRegistry(args.registry) if args.registry else None
+        try:
+            stats = validate_stream(
+                args.input, args.output, chunk_size=args.chunk_size, context=context,
+                duplicates=DuplicateDetector() if args.duplicates else None,
+                registry=registry
+            )
+        finally:
+            if registry is not None:
+                registry.close()
+    else:
+        stats = validate_csv_parallel(
+            args.input, args.output, workers=args.workers or None, chunk_size=args.chunk_size,
+            context=context
+        )
+
+    print(f"Документов: {stats.total}")
+    print(f"  OK:              {stats.ok}")
+    print(f"  Предупреждения:  {stats.warnings}")
+    print(f"  Ошибки:          {stats.errors}")
+    if args.duplicates:
+        print(f"  Дубликаты:       {stats.duplicates}")
+    if args.registry:
+        print(f"  Ранее приняты:   {stats.registered}")
+    print(f"Время: {stats.elapsed:.2f} c ({stats.rows_per_second:,.0f} строк/с, процессов: {args.workers or os.cpu_count()})")
+    if args.excel:
+        # excel_export сам импортирует batch_engine - импорт здесь, а не в начале модуля
+        from excel_export import export_results_excel, print_summary
+        print_summary(export_results_excel(args.output, args.excel, chunk_size=args.chunk_size), args.excel)
+    return 1 if stats.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
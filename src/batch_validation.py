@@ -1,53 +1,42 @@
 """
-Batch Validation - Пакетная обработка документов из CSV.
+Batch Validation - Пакетная обработка документов из CSV и Excel (.xlsx).
 Добавить в src/main.py в режим "Batch Validation".
 """
 
+import os
+import shutil
+import tempfile
 import streamlit as st
 import pandas as pd
-import io
 from datetime import datetime
 
-# Импортируй свои модули:
-# from logic import check_rules
+from logic import check_rules, ValidationContext, Verdict, BASE_DIR
+from batch_engine import (
+    verdict_severity,
+    validate_rows,
+    validate_csv_stream,
+    validate_csv_parallel,
+    DEFAULT_CHUNK_SIZE,
+    STATUS_EMOJI
+)
+from duplicates import DuplicateDetector
+from number_registry import NumberRegistry
+from excel_export import export_results_excel
+from excel_import import iter_xlsx_chunks, validate_xlsx_stream
+
+# Где создаются временные каталоги прогонов (удаляются после отрисовки результатов)
+RESULTS_DIR = os.path.join(BASE_DIR, 'data', 'processed')
 
 
 # ========================================
 # ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ
 # ========================================
 
-def row_to_document(row: pd.Series) -> dict:
-    """Преобразует строку CSV в словарь документа."""
-    doc_type = str(row.get("document_type", "invoice")).strip()
-
-    required_fields_map = {
-        "invoice":  ["document_number", "issue_date", "total_amount", "inn"],
-        "contract": ["document_number", "issue_date", "expiry_date", "total_amount", "inn"],
-        "act":      ["document_number", "issue_date", "total_amount"],
-        "receipt":  ["document_number", "issue_date", "total_amount"],
-    }
-
-    return {
-        "document_type":   doc_type,
-        "document_number": str(row.get("document_number", "")),
-        "issue_date":      str(row.get("issue_date", "")),
-        "expiry_date":     str(row.get("expiry_date", "")),
-        "total_amount":    float(row.get("total_amount", 0)),
-        "inn":             str(row.get("inn", "")),
-        "is_signed":       str(row.get("is_signed", "True")).strip().lower() in ("true", "1", "yes"),
-        "required_fields": required_fields_map.get(doc_type, ["document_number", "issue_date"]),
-    }
-
-
-def get_status_emoji(result: str) -> str:
-    if "[ERROR]" in result:
-        return "❌"
-    elif "[WARNING]" in result:
-        return "⚠️"
-    return "✅"
-
-
-def results_to_dataframe(docs: list[dict], results: list[str]) -> pd.DataFrame:
+def get_status_emoji(result: Verdict | str) -> str:
+    return STATUS_EMOJI[verdict_severity(result)]
+
+
+def results_to_dataframe(docs: list[dict], results: list[Verdict | str]) -> pd.DataFrame:
     rows = []
     for doc, result in zip(docs, results):
         rows.append({
@@ -56,7 +45,7 @@ def results_to_dataframe(docs: list[dict], results: list[str]) -> pd.DataFrame:
             "Дата выдачи":    doc.get("issue_date", "—"),
             "Сумма":          doc.get("total_amount", 0),
             "Статус":         get_status_emoji(result),
-            "Результат":      result,
+            "Результат":      str(result),
         })
     return pd.DataFrame(rows)
 
@@ -79,16 +68,20 @@ def generate_sample_csv() -> str:
 # STREAMLIT СТРАНИЦА
 # ========================================
 
-def render_batch_validation_page(check_rules_fn):
+def render_batch_validation_page(check_rules_fn=check_rules):
     """
     Главная функция страницы. Вызови её в main.py:
 
         from batch_validation import render_batch_validation_page
         from logic import check_rules
         render_batch_validation_page(check_rules)
+
+    Файл обрабатывается потоково (validate_csv_stream, для .xlsx -
+    validate_xlsx_stream): для logic.check_rules используется векторизованный
+    движок validate_frame, любая другая функция правил применяется построчно.
     """
     st.header("📦 Batch Validation — Пакетная обработка")
-    st.markdown("Загрузи CSV-файл с документами и проверь их все за один раз.")
+    st.markdown("Загрузи CSV или Excel (.xlsx) с документами и проверь их все за один раз.")
 
     # --- Скачать пример CSV ---
     with st.expander("📄 Посмотреть формат / скачать пример CSV"):
@@ -104,69 +97,187 @@ def render_batch_validation_page(check_rules_fn):
     st.divider()
 
     # --- Загрузка файла ---
-    uploaded = st.file_uploader("Загрузи CSV файл", type=["csv"])
+    uploaded = st.file_uploader("Загрузи CSV или Excel файл", type=["csv", "xlsx"])
 
     if not uploaded:
         st.info("Жди загрузки файла...")
         return
 
-    # --- Чтение CSV ---
+    # --- Предпросмотр (читаем только первые строки, файл целиком в память не грузится) ---
+    is_xlsx = uploaded.name.lower().endswith(".xlsx")
+    file_kind = "Excel" if is_xlsx else "CSV"
     try:
-        df = pd.read_csv(uploaded)
+        if is_xlsx:
+            # Генератор закрывается явно - вместе с ним закрывается книга
+            chunks = iter_xlsx_chunks(uploaded, chunk_size=20)
+            try:
+                head = next(chunks, pd.DataFrame())
+            finally:
+                chunks.close()
+        else:
+            head = pd.read_csv(uploaded, nrows=20, dtype=str)
+        uploaded.seek(0)
     except Exception as e:
-        st.error(f"Ошибка чтения CSV: {e}")
+        st.error(f"Ошибка чтения {file_kind}: {e}")
         return
 
-    st.success(f"Файл загружен: {len(df)} документов")
-    st.dataframe(df, use_container_width=True)
+    st.success(f"Файл загружен: {uploaded.size / 1024 / 1024:.1f} МБ")
+    st.dataframe(head, use_container_width=True)
+
+    chunk_size = st.number_input(
+        "Размер чанка (строк)",
+        min_value=1_000,
+        value=DEFAULT_CHUNK_SIZE,
+        step=10_000,
+        help="Файл валидируется по частям, результаты сразу пишутся на диск"
+    )
+
+    as_of = st.date_input(
+        "Проверить на дату",
+        value=datetime.now().date(),
+        help="Опорная дата для сроков действия (для повторной проверки старых пакетов)"
+    )
+
+    workers = 1
+    # Параллельный режим делит CSV по байтам - .xlsx читается в одном процессе
+    if check_rules_fn is check_rules and not is_xlsx:
+        workers = st.slider(
+            "Процессов",
+            min_value=1,
+            max_value=os.cpu_count() or 1,
+            value=1,
+            help="Больше 1 - файл делится на части и валидируется параллельно"
+        )
+
+    find_duplicates = st.checkbox(
+        "Искать дубликаты",
+        value=False,
+        help="Точные и почти-дубликаты (тот же ИНН, сумма ±1%, опечатки в номере). "
+             "Проверка идет в одном процессе"
+    )
+
+    check_registry = st.checkbox(
+        "Сверять с ранее принятыми номерами",
+        value=False,
+        help="Повторный номер (из прошлых пакетов или выше в этом же) получает "
+             "предупреждение; новые документы без ошибок заносятся в реестр. "
+             "Проверка идет в одном процессе"
+    )
+
+    export_excel = st.checkbox(
+        "Выгрузить в Excel",
+        value=False,
+        help="Книга с листами ошибок, предупреждений и OK и сводкой; пишется потоково"
+    )
 
     st.divider()
 
     # --- Запуск валидации ---
     if st.button("🚀 Запустить валидацию", type="primary"):
-        documents = []
-        results = []
-
-        progress = st.progress(0, text="Валидация...")
-        total = len(df)
-
-        for i, (_, row) in enumerate(df.iterrows()):
-            doc = row_to_document(row)
-            result = check_rules_fn(doc)
-            documents.append(doc)
-            results.append(result)
-            progress.progress((i + 1) / total, text=f"Обработано: {i+1}/{total}")
-
-        progress.empty()
-
-        # --- Сводка ---
-        errors   = sum(1 for r in results if "[ERROR]"   in r)
-        warnings = sum(1 for r in results if "[WARNING]" in r)
-        ok       = sum(1 for r in results if "[OK]"      in r)
-
-        col1, col2, col3 = st.columns(3)
-        col1.metric("✅ Прошли", ok)
-        col2.metric("⚠️ Предупреждения", warnings)
-        col3.metric("❌ Ошибки", errors)
-
-        st.divider()
-
-        # --- Таблица результатов ---
-        result_df = results_to_dataframe(documents, results)
-        st.dataframe(result_df, use_container_width=True)
-
-        # --- Скачать результаты ---
-        csv_out = result_df.to_csv(index=False, encoding="utf-8-sig")
-        st.download_button(
-            label="⬇️ Скачать результаты CSV",
-            data=csv_out,
-            file_name=f"validation_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            mime="text/csv",
-        )
-
-        # --- Детали по ошибкам ---
-        if errors > 0:
-            with st.expander(f"🔍 Показать детали ошибок ({errors})"):
-                for doc, result in zip(documents, results):
-                    if "[ERROR]" in result:
-                        st.error(f"**{doc['document_number']}** — {result}")
+        context = ValidationContext.create(as_of)
+        validator = None
+        if check_rules_fn is not check_rules:
+            validator = lambda chunk: validate_rows(chunk, check_rules_fn)
+
+        # Файлы прогона пишутся во временный каталог: download_button сразу
+        # забирает данные, после отрисовки кнопок каталог удаляется
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        work_dir = tempfile.mkdtemp(prefix="batch_", dir=RESULTS_DIR)
+        try:
+            output_path = os.path.join(
+                work_dir,
+                f"validation_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+            )
+
+            status_text = st.empty()
+            on_chunk = lambda s: status_text.text(f"Обработано: {s.total:,} документов")
+            try:
+                if workers > 1 and not (find_duplicates or check_registry):
+                    # Процессам нужен файл на диске: копируем загрузку блоками
+                    input_path = output_path.replace("validation_results_", "upload_")
+                    with open(input_path, "wb") as f:
+                        shutil.copyfileobj(uploaded, f)
+                    try:
+                        stats = validate_csv_parallel(
+                            input_path,
+                            output_path,
+                            workers=workers,
+                            chunk_size=int(chunk_size),
+                            context=context,
+                            on_chunk=on_chunk,
+                        )
+                    finally:
+                        os.remove(input_path)
+                else:
+                    registry = NumberRegistry() if check_registry else None
+                    validate_stream = validate_xlsx_stream if is_xlsx else validate_csv_stream
+                    try:
+                        stats = validate_stream(
+                            uploaded,
+                            output_path,
+                            chunk_size=int(chunk_size),
+                            context=context,
+                            validator=validator,
+                            on_chunk=on_chunk,
+                            duplicates=DuplicateDetector() if find_duplicates else None,
+                            registry=registry,
+                        )
+                    finally:
+                        if registry is not None:
+                            registry.close()
+            except Exception as e:
+                st.error(f"Ошибка чтения {file_kind}: {e}")
+                return
+            status_text.empty()
+
+            # --- Сводка ---
+            col1, col2, col3 = st.columns(3)
+            col1.metric("✅ Прошли", stats.ok)
+            col2.metric("⚠️ Предупреждения", stats.warnings)
+            col3.metric("❌ Ошибки", stats.errors)
+            if find_duplicates:
+                st.metric("🔁 Дубликаты", stats.duplicates)
+            if check_registry:
+                st.metric("🗂️ Ранее приняты", stats.registered)
+            st.caption(
+                f"{stats.total:,} документов за {stats.elapsed:.2f} с "
+                f"({stats.rows_per_second:,.0f} документов/с)"
+            )
+
+            st.divider()
+
+            # --- Таблица результатов (первые строки) ---
+            st.dataframe(stats.preview_frame(), use_container_width=True)
+            if stats.total > stats.preview_limit:
+                st.caption(f"Показаны первые {stats.preview_limit} строк, полный результат — в файле")
+
+            # --- Скачать результаты ---
+            with open(output_path, "rb") as f:
+                st.download_button(
+                    label="⬇️ Скачать результаты CSV",
+                    data=f,
+                    file_name=os.path.basename(output_path),
+                    mime="text/csv",
+                )
+
+            if export_excel:
+                excel_path = output_path[:-len(".csv")] + ".xlsx"
+                with st.spinner("Выгрузка в Excel..."):
+                    export_results_excel(output_path, excel_path, chunk_size=int(chunk_size))
+                with open(excel_path, "rb") as f:
+                    st.download_button(
+                        label="⬇️ Скачать результаты Excel",
+                        data=f,
+                        file_name=os.path.basename(excel_path),
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    )
+
+            # --- Детали по ошибкам ---
+            if stats.errors > 0:
+                with st.expander(f"🔍 Показать детали ошибок ({stats.errors})"):
+                    for number, result in stats.error_samples:
+                        st.error(f"**{number}** — {result}")
+                    if stats.errors > len(stats.error_samples):
+                        st.caption(f"Показаны первые {len(stats.error_samples)} ошибок")
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
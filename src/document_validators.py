@@ -3,8 +3,82 @@ Document Validators - Модуль валидации полей докумен
 Содержит функции для проверки отдельных полей и бизнес-правил.
 """
 
-from datetime import datetime, timedelta
-from typing import Tuple, List
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Optional, Tuple, List
+
+
+# ========================================
+# РАЗБОР ДАТ
+# ========================================
+
+DATE_FORMAT = "%Y-%m-%d"
+
+# Сколько различных строк дат держать в кэше разбора
+DATE_CACHE_SIZE = 65536
+
+
+def _is_canonical_date(date_str: str) -> bool:
+    """Строка ровно вида YYYY-MM-DD из ASCII-цифр."""
+    return (
+        len(date_str) == 10
+        and date_str[4] == "-"
+        and date_str[7] == "-"
+        and date_str.isascii()
+        and date_str[:4].isdigit()
+        and date_str[5:7].isdigit()
+        and date_str[8:].isdigit()
+    )
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_date_cached(date_str: str) -> Tuple[Optional[date], Optional[str]]:
+    """
+    Разбирает строку даты один раз и запоминает результат (или текст ошибки).
+    
+    Быстрый путь - date.fromisoformat для канонического YYYY-MM-DD;
+    все остальные строки (и невозможные даты) разбираются strptime,
+    чтобы принимаемые форматы и тексты ошибок не изменились.
+    """
+    if _is_canonical_date(date_str):
+        try:
+            return date.fromisoformat(date_str), None
+        except ValueError:
+            pass
+    
+    try:
+        return datetime.strptime(date_str, DATE_FORMAT).date(), None
+    except ValueError as e:
+        return None, str(e)
+
+
+def parse_date(date_str: str) -> date:
+    """
+    Разбирает дату в формате YYYY-MM-DD через общий кэш.
+    
+    Args:
+        date_str: Строка с датой
+        
+    Returns:
+        datetime.date
+        
+    Raises:
+        ValueError: С тем же текстом, что и datetime.strptime
+    """
+    parsed, error = _parse_date_cached(date_str)
+    if error is not None:
+        raise ValueError(error)
+    return parsed
+
+
+def clear_date_cache() -> None:
+    """Очищает кэш разобранных дат."""
+    _parse_date_cached.cache_clear()
+
+
+def date_cache_info():
+    """Статистика кэша дат (hits, misses, maxsize, currsize)."""
+    return _parse_date_cached.cache_info()
 
 
 # ========================================
@@ -26,26 +100,27 @@ def validate_date_format(date_str: str) -> Tuple[bool, str]:
         return False, "Date is empty"
     
     try:
-        datetime.strptime(date_str, "%Y-%m-%d")
+        parse_date(date_str)
         return True, "Valid date format"
     except ValueError:
         return False, f"Invalid date format: '{date_str}'. Expected YYYY-MM-DD"
 
 
-def validate_date_not_past(date_str: str) -> Tuple[bool, str]:
+def validate_date_not_past(date_str: str, today: Optional[date] = None) -> Tuple[bool, str]:
     """
     Проверяет, что дата не в прошлом.
     
     Args:
         date_str: Строка с датой в формате YYYY-MM-DD
+        today: Опорная дата (по умолчанию текущая)
         
     Returns:
         (True, message) если дата в будущем или сегодня
         (False, message) если дата в прошлом
     """
     try:
-        date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        date_obj = parse_date(date_str)
+        today = today or date.today()
         
         if date_obj < today:
             days_ago = (today - date_obj).days
@@ -69,8 +144,8 @@ def validate_expiry_date(issue_date: str, expiry_date: str) -> Tuple[bool, str]:
         (False, message) если expiry_date <= issue_date
     """
     try:
-        issue = datetime.strptime(issue_date, "%Y-%m-%d")
-        expiry = datetime.strptime(expiry_date, "%Y-%m-%d")
+        issue = parse_date(issue_date)
+        expiry = parse_date(expiry_date)
         
         if expiry <= issue:
             return False, f"Expiry date ({expiry_date}) must be after issue date ({issue_date})"
@@ -80,25 +155,32 @@ def validate_expiry_date(issue_date: str, expiry_date: str) -> Tuple[bool, str]:
         return False, f"Date parsing error: {str(e)}"
 
 
-def check_expiry_warning(expiry_date: str, warning_days: int) -> Tuple[bool, str]:
+def check_expiry_warning(
+    expiry_date: str,
+    warning_days: int,
+    today: Optional[date] = None,
+    cutoff: Optional[date] = None
+) -> Tuple[bool, str]:
     """
     Проверяет, не истекает ли срок действия в ближайшее время.
     
     Args:
         expiry_date: Срок действия
         warning_days: Количество дней для предупреждения
+        today: Опорная дата (по умолчанию текущая)
+        cutoff: Заранее посчитанная дата today + warning_days
         
     Returns:
         (True, message) если срок истекает скоро
         (False, message) если срок не истекает скоро
     """
     try:
-        expiry = datetime.strptime(expiry_date, "%Y-%m-%d")
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        days_until_expiry = (expiry - today).days
+        expiry = parse_date(expiry_date)
+        today = today or date.today()
+        cutoff = cutoff or today + timedelta(days=warning_days)
         
-        if 0 <= days_until_expiry <= warning_days:
-            return True, f"Document expires in {days_until_expiry} days"
+        if today <= expiry <= cutoff:
+            return True, f"Document expires in {(expiry - today).days} days"
         
         return False, "Expiry date is not approaching"
     except ValueError:
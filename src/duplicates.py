@@ -0,0 +1,312 @@
+"""
+Duplicates - Поиск точных и почти-дубликатов документов.
+
+Точный дубликат - документ с теми же типом, номером, ИНН, суммой и датой.
+Почти-дубликат - документ того же контрагента (ИНН) на ту же сумму с
+точностью AMOUNT_TOLERANCE, номер которого отличается не больше чем на
+MAX_NUMBER_TYPOS опечаток, а дата сдвинута не больше чем на
+MAX_DATE_SHIFT_DAYS дней. Документы без номера (пустой или из одних
+разделителей) почти-дубликатами не считаются - только точными.
+
+Чтобы не сравнивать все пары, кандидаты ищутся через MinHash/LSH:
+- документы разбиваются на блоки по ИНН и диапазону суммы;
+- внутри блока номер документа превращается в набор триграмм, по нему
+  считается MinHash-сигнатура из NUM_PERM хэшей;
+- сигнатура режется на BANDS полос, документы с совпавшей полосой
+  становятся кандидатами и проверяются точными правилами выше.
+
+Детектор работает потоково: каждый новый документ сравнивается со всеми
+уже добавленными, поэтому им можно проверять CSV по чанкам.
+
+    detector = DuplicateDetector()
+    labels = detector.add_frame(chunk)   # колонка "Дубликат" для batch
+"""
+
+import math
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from document_validators import parse_date
+from models import Document
+
+
+# ========================================
+# КОНСТАНТЫ
+# ========================================
+
+# Допустимое относительное расхождение сумм почти-дубликатов
+AMOUNT_TOLERANCE = 0.01
+
+# Сколько опечаток (расстояние Левенштейна) допускается в номере
+MAX_NUMBER_TYPOS = 2
+
+# На сколько дней может быть сдвинута дата выдачи
+MAX_DATE_SHIFT_DAYS = 7
+
+# MinHash: число хэш-функций и полос LSH (строк в полосе = NUM_PERM // BANDS)
+NUM_PERM = 32
+BANDS = 16
+
+# Размер шингла (символов) для номера документа
+SHINGLE_SIZE = 3
+
+# Виды совпадений
+EXACT = "exact"
+NEAR = "near"
+
+# Колонка с результатом поиска дубликатов в выгрузке batch-валидации
+DUPLICATE_COLUMN = "Дубликат"
+
+# Простое число Мерсенна 2^31 - 1: (a * h + b) mod P не переполняет uint64
+_PRIME = np.uint64((1 << 31) - 1)
+_RNG = np.random.default_rng(20240201)
+_PERM_A = _RNG.integers(1, int(_PRIME), size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _RNG.integers(0, int(_PRIME), size=NUM_PERM, dtype=np.uint64)
+
+
+# ========================================
+# НОРМАЛИЗАЦИЯ
+# ========================================
+
+class DocumentKey(NamedTuple):
+    """Поля документа, по которым ищутся дубликаты."""
+    number: str
+    document_type: str
+    inn: str
+    amount: Optional[float]
+    day: Optional[int]
+
+
+def normalize_number(number) -> str:
+    """Номер документа без регистра, пробелов и разделителей."""
+    return "".join(ch for ch in str(number or "").upper() if ch.isalnum())
+
+
+def _amount(value) -> Optional[float]:
+    try:
+        amount = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(amount) else amount
+
+
+def _day(value) -> Optional[int]:
+    try:
+        return parse_date(str(value)).toordinal()
+    except ValueError:
+        return None
+
+
+def document_key(document: Union[dict, Document]) -> DocumentKey:
+    """Ключ для словаря документа (формат batch/check_rules) или models.Document."""
+    if isinstance(document, Document):
+        number, doc_type = document.document_number, document.document_type
+        inn, amount, issued = document.inn, document.total_amount, document.issue_date
+    else:
+        number, doc_type = document.get("document_number"), document.get("document_type")
+        inn, amount, issued = document.get("inn"), document.get("total_amount"), document.get("issue_date")
+    return DocumentKey(
+        normalize_number(number),
+        str(doc_type or "").strip(),
+        str(inn or "").strip(),
+        _amount(amount),
+        _day(issued)
+    )
+
+
+# ========================================
+# СРАВНЕНИЕ
+# ========================================
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Расстояние Левенштейна, обрезанное сверху: если оно больше limit,
+    возвращается limit + 1 (и расчет прекращается досрочно).
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) == len(b):
+        # Частый случай - замена символов: расстояние Хэмминга - верхняя оценка
+        mismatches = sum(ca != cb for ca, cb in zip(a, b))
+        if mismatches <= limit:
+            return mismatches
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb)
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return min(previous[-1], limit + 1)
+
+
+def amounts_close(a: Optional[float], b: Optional[float], tolerance: float = AMOUNT_TOLERANCE) -> bool:
+    if a is None or b is None:
+        return a is b
+    return abs(a - b) <= tolerance * max(abs(a), abs(b))
+
+
+def is_near_duplicate(a: DocumentKey, b: DocumentKey) -> bool:
+    """Точные правила почти-дубликата (см. описание модуля)."""
+    if not a.inn or a.inn != b.inn:
+        return False
+    # Два пустых номера совпадают "без опечаток", но ничего не говорят о документе
+    if not a.number or not b.number:
+        return False
+    if not amounts_close(a.amount, b.amount):
+        return False
+    if a.day is not None and b.day is not None and abs(a.day - b.day) > MAX_DATE_SHIFT_DAYS:
+        return False
+    return edit_distance(a.number, b.number, MAX_NUMBER_TYPOS) <= MAX_NUMBER_TYPOS
+
+
+# ========================================
+# MINHASH / LSH
+# ========================================
+
+def shingles(number: str) -> List[str]:
+    """Триграммы номера с маркерами начала и конца."""
+    padded = f"^{number}$"
+    if len(padded) <= SHINGLE_SIZE:
+        return [padded]
+    return [padded[i:i + SHINGLE_SIZE] for i in range(len(padded) - SHINGLE_SIZE + 1)]
+
+
+def minhash(tokens: Iterable[str]) -> np.ndarray:
+    """MinHash-сигнатура набора строк (NUM_PERM значений uint64)."""
+    hashes = np.fromiter(
+        (zlib.crc32(token.encode("utf-8")) for token in set(tokens)),
+        dtype=np.uint64
+    ) % _PRIME
+    return ((_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _PRIME).min(axis=1)
+
+
+def amount_bucket(amount: Optional[float]) -> int:
+    """
+    Диапазон суммы в логарифмической шкале. Ширина диапазона больше
+    допуска AMOUNT_TOLERANCE, поэтому суммы почти-дубликатов попадают
+    в один или соседние диапазоны.
+    """
+    if amount is None or amount <= 0:
+        return 0
+    return int(math.log(amount) // math.log1p(2 * AMOUNT_TOLERANCE))
+
+
+# ========================================
+# ДЕТЕКТОР
+# ========================================
+
+@dataclass(frozen=True)
+class DuplicateMatch:
+    """
+    Найденный дубликат.
+
+    Атрибуты:
+        index: Порядковый номер документа в потоке
+        duplicate_of: Порядковый номер более раннего документа
+        number: Номер более раннего документа (как в исходных данных)
+        kind: EXACT или NEAR
+    """
+    index: int
+    duplicate_of: int
+    number: str
+    kind: str
+
+    def __str__(self) -> str:
+        if self.kind == EXACT:
+            return f"Дубликат {self.number}"
+        return f"Возможный дубликат {self.number}"
+
+
+class DuplicateDetector:
+    """
+    Потоковый поиск дубликатов: add() сравнивает документ со всеми ранее
+    добавленными за время, близкое к константному.
+    """
+
+    def __init__(self):
+        self.keys: List[DocumentKey] = []
+        self.numbers: List[str] = []
+        self._exact: Dict[DocumentKey, int] = {}
+        self._buckets: Dict[int, List[int]] = {}
+        self._rows = NUM_PERM // BANDS
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _bands(self, key: DocumentKey) -> List[bytes]:
+        signature = minhash(shingles(key.number))
+        return [
+            signature[band * self._rows:(band + 1) * self._rows].tobytes()
+            for band in range(BANDS)
+        ]
+
+    def add(self, document: Union[dict, Document]) -> Optional[DuplicateMatch]:
+        """Добавляет документ; возвращает совпадение с самым ранним дубликатом или None."""
+        key = document_key(document)
+        number = str(document.document_number if isinstance(document, Document)
+                     else document.get("document_number", ""))
+        index = len(self.keys)
+        self.keys.append(key)
+        self.numbers.append(number)
+
+        match = None
+        original = self._exact.setdefault(key, index)
+        if original != index:
+            match = DuplicateMatch(index, original, self.numbers[original], EXACT)
+
+        # Без ИНН или номера почти-дубликат не определяется - в LSH такие документы не идут
+        if not key.inn or not key.number:
+            return match
+
+        # Ключ корзины - хэш (ИНН, диапазон суммы, полоса): коллизии дают
+        # лишних кандидатов, но не пропуски, а память на корзину меньше
+        bucket = amount_bucket(key.amount)
+        candidates = set()
+        for band, value in enumerate(self._bands(key)):
+            for neighbor in (bucket - 1, bucket + 1):
+                candidates.update(self._buckets.get(hash((key.inn, neighbor, band, value)), ()))
+            own = self._buckets.setdefault(hash((key.inn, bucket, band, value)), [])
+            candidates.update(own)
+            own.append(index)
+
+        if match is None:
+            for candidate in sorted(candidates):
+                if is_near_duplicate(key, self.keys[candidate]):
+                    match = DuplicateMatch(index, candidate, self.numbers[candidate], NEAR)
+                    break
+        return match
+
+    def add_many(self, documents: Iterable[Union[dict, Document]]) -> List[Optional[DuplicateMatch]]:
+        return [self.add(document) for document in documents]
+
+    def add_frame(self, df: pd.DataFrame) -> List[str]:
+        """
+        Добавляет чанк CSV batch-валидации и возвращает значения колонки
+        DUPLICATE_COLUMN (пустая строка - дубликат не найден).
+        """
+        columns = ("document_number", "document_type", "inn", "total_amount", "issue_date")
+        values = [
+            df[column].astype(object).where(df[column].notna(), None).to_numpy()
+            if column in df.columns else [None] * len(df)
+            for column in columns
+        ]
+        labels = []
+        for row in zip(*values):
+            match = self.add(dict(zip(columns, row)))
+            labels.append(str(match) if match else "")
+        return labels
+
+
+def find_duplicates(documents: Iterable[Union[dict, Document]]) -> List[DuplicateMatch]:
+    """Все дубликаты в наборе документов (каждый указывает на самый ранний)."""
+    return [match for match in DuplicateDetector().add_many(documents) if match]
@@ -0,0 +1,533 @@
+"""
+Entity Extraction - Извлечение сущностей (NER) из текстов документов.
+
+Из неструктурированного текста (например, файлов data/external/*.txt)
+извлекаются ИНН, даты, номер, тип и сумма документа, а также упоминания
+сотрудников, и собирается словарь документа в формате logic.check_rules.
+
+Текст просматривается двумя заранее скомпилированными автоматами:
+- ENTITY_PATTERN - одно регулярное выражение с именованными группами для
+  ИНН, дат, номеров, сумм и ключевых слов (тип документа, подпись, срок
+  действия); весь текст проходится одним finditer;
+- EntityMatcher.names - словарь ФИО сотрудников (models.Employee) и их
+  сокращений ("Иванова М.П."), свернутый в префиксное дерево (trie_pattern).
+
+Файлы обрабатываются пулом процессов пачками по FILES_PER_TASK, результат
+пишется в JSON Lines по мере готовности в исходном порядке:
+
+    python src/entity_extraction.py data/external -o data/processed/extracted.jsonl --workers 8
+    python src/entity_extraction.py --benchmark 200 --workers 8
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, IO, Iterable, Iterator, List, Optional, Tuple, Union
+
+from batch_engine import DEFAULT_REQUIRED_FIELDS
+from logic import RuleSet, ValidationContext, get_rule_set, check_rules
+from models import Employee, create_sample_employees
+
+
+# ========================================
+# КОНСТАНТЫ
+# ========================================
+
+# Сколько файлов отдается рабочему процессу за одну задачу
+FILES_PER_TASK = 64
+
+DEFAULT_FILE_PATTERN = "*.txt"
+
+MONTHS = {
+    "января": 1, "февраля": 2, "марта": 3, "апреля": 4, "мая": 5, "июня": 6,
+    "июля": 7, "августа": 8, "сентября": 9, "октября": 10, "ноября": 11, "декабря": 12,
+}
+
+# Ключевые слова типов документов из rules.json (имя группы = тип документа).
+# Первая буква - в обоих регистрах: это дешевле флага IGNORECASE на кириллице
+DOCUMENT_TYPE_WORDS = {
+    "invoice":  r"[Сс]ч[её]т|[Нн]акладн",
+    "contract": r"[Дд]оговор|[Кк]онтракт",
+    "act":      r"[Аа]кт(?:[аеуы]|ом)?(?!\w)",
+    "receipt":  r"[Кк]витанц|[Чч]ек(?:[аеиу]|ом)?(?!\w)",
+}
+
+# Группы дат и группы, для которых граница слова слева проверяется после
+# совпадения (ретроспективная проверка в начале ветки отключает быструю
+# пропуск-оптимизацию re)
+DATE_GROUPS = ("date_iso", "date_dots", "date_words")
+WORD_START_GROUPS = DATE_GROUPS + ("code",) + tuple(DOCUMENT_TYPE_WORDS)
+
+_MONTH_NAMES = "|".join(MONTHS)
+
+# Один автомат на все сущности: группа-победитель определяется по match.lastgroup.
+# Опережающая проверка первого символа позволяет пропускать позиции, с которых
+# не начинается ни одна ветка; "не подписан" проверяется раньше "подписан".
+ENTITY_PATTERN = re.compile(
+    r"(?=[\dA-Z№ВвДдИиКкНнПпСсЧчЭАа])(?:"
+    r"(?:ИНН|INN)\W{0,3}(?P<inn>\d{12}|\d{10})(?!\d)"
+    r"|(?P<date_iso>\d{4}-\d{2}-\d{2})(?!\d)"
+    r"|(?P<date_dots>\d{2}\.\d{2}\.\d{4})(?!\d)"
+    rf"|(?P<date_words>\d{{1,2}}\s+(?:{_MONTH_NAMES})\s+\d{{4}})(?!\d)"
+    r"|(?:№|N°|No\.)\s*(?P<number>\w(?:[\w/-]*\w)?)"
+    r"|(?P<code>[A-Z]{2,5}-\d{4}-\d{2,})(?![\w-])"
+    r"|(?:[Сс]умм[аеуы]|[Ии]того|[Вв]сего)[^\d\n]{0,30}?"
+    r"(?P<amount>(?:\d{1,3}(?:[ \u00a0]\d{3})+|\d+)(?:[.,]\d{1,2})?)"
+    r"|(?P<expiry>[Дд]ейств\w*\s+до|[Сс]рок\w*\s+действия)"
+    r"|(?P<unsigned>[Нн]е\s+подписан\w*)"
+    r"|(?P<signed>[Пп]одпис\w*|ЭЦП)"
+    + "".join(f"|(?P<{doc_type}>{words})" for doc_type, words in DOCUMENT_TYPE_WORDS.items())
+    + ")"
+)
+
+
+# ========================================
+# СЛОВАРЬ ИМЕН
+# ========================================
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """
+    Регулярное выражение, совпадающее с любым из words, в виде префиксного
+    дерева: общие префиксы проверяются один раз, а при нескольких
+    совпадениях в одной позиции выигрывает самое длинное.
+    """
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            return f"(?:{body})?"
+        return body
+
+    return build(trie)
+
+
+def name_variants(name: str) -> List[str]:
+    """ФИО и его сокращения: "Иванова М.П.", "Иванова М. П.", "М.П. Иванова"."""
+    parts = name.split()
+    variants = [name]
+    if len(parts) == 3:
+        surname, first, middle = parts
+        initials = (f"{first[0]}.{middle[0]}.", f"{first[0]}. {middle[0]}.")
+        variants += [f"{surname} {i}" for i in initials]
+        variants += [f"{i} {surname}" for i in initials]
+    return variants
+
+
+class EntityMatcher:
+    """
+    Скомпилированные автоматы извлечения.
+
+    Атрибуты:
+        names: Регулярное выражение словаря имен (None - словарь пуст)
+        canonical: Вариант написания -> полное ФИО сотрудника
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self.canonical: Dict[str, str] = {
+            variant: name
+            for name in names
+            for variant in name_variants(name)
+        }
+        self.names = None
+        if self.canonical:
+            self.names = re.compile(rf"(?<!\w)(?:{trie_pattern(self.canonical)})(?!\w)")
+
+    @classmethod
+    def from_employees(cls, employees: Optional[Iterable[Employee]] = None) -> "EntityMatcher":
+        """Словарь имен из сотрудников (по умолчанию - models.create_sample_employees())."""
+        if employees is None:
+            employees = create_sample_employees()
+        return cls(employee.name for employee in employees)
+
+    def find_names(self, text: str) -> List[Tuple[int, str]]:
+        """Упоминания сотрудников: (позиция, полное ФИО)."""
+        if self.names is None:
+            return []
+        return [(m.start(), self.canonical[m.group()]) for m in self.names.finditer(text)]
+
+
+# ========================================
+# ИЗВЛЕЧЕНИЕ
+# ========================================
+
+def _iso_date(kind: str, value: str) -> str:
+    """Дата в формате YYYY-MM-DD (проверка корректности - дело check_rules)."""
+    if kind == "date_dots":
+        day, month, year = value.split(".")
+        return f"{year}-{month}-{day}"
+    if kind == "date_words":
+        day, month, year = value.split()
+        return f"{year}-{MONTHS[month.lower()]:02d}-{int(day):02d}"
+    return value
+
+
+def _amount(value: str) -> float:
+    return float(value.replace(" ", "").replace("\u00a0", "").replace(",", "."))
+
+
+def extract_document(
+    text: str,
+    matcher: Optional[EntityMatcher] = None,
+    rule_set: Optional[RuleSet] = None,
+    source: str = ""
+) -> dict:
+    """
+    Извлекает сущности из текста документа.
+
+    Берутся первые найденные тип, номер, ИНН и сумма. Первая дата - дата
+    выдачи, дата после "действует до"/"срок действия" - срок действия.
+    Документ подписан, если есть отметка о подписи и нет "не подписан";
+    подписантами считаются сотрудники, упомянутые после первой отметки.
+
+    Returns:
+        Словарь в формате check_rules (как batch_engine.row_to_document)
+        с дополнительными полями source, persons и signed_by. Необязательные
+        поля (expiry_date, total_amount, inn) есть в словаре, только если
+        найдены в тексте: check_rules проверяет их по наличию ключа
+    """
+    matcher = matcher or EntityMatcher.from_employees()
+    rules = rule_set or get_rule_set()
+
+    found: Dict[str, str] = {}
+    issue_date = expiry_date = ""
+    expecting_expiry = False
+    signed_at = None
+    unsigned = False
+
+    for match in ENTITY_PATTERN.finditer(text):
+        kind = match.lastgroup
+        value = match.group(kind)
+        start = match.start()
+        if kind in WORD_START_GROUPS and start and (text[start - 1].isalnum() or text[start - 1] == "-"):
+            continue
+        if kind in DATE_GROUPS:
+            if expecting_expiry and not expiry_date:
+                expiry_date = _iso_date(kind, value)
+            elif not issue_date:
+                issue_date = _iso_date(kind, value)
+            expecting_expiry = False
+        elif kind == "expiry":
+            expecting_expiry = True
+        elif kind == "signed":
+            if signed_at is None:
+                signed_at = start
+        elif kind == "unsigned":
+            unsigned = True
+        elif kind in DOCUMENT_TYPE_WORDS:
+            found.setdefault("document_type", kind)
+        elif kind == "code":
+            found.setdefault("number", value)
+        else:
+            found.setdefault(kind, value)
+
+    persons: List[str] = []
+    signed_by: List[str] = []
+    for position, name in matcher.find_names(text):
+        if name not in persons:
+            persons.append(name)
+        if signed_at is not None and position > signed_at and name not in signed_by:
+            signed_by.append(name)
+
+    doc_type = found.get("document_type", "")
+    document = {
+        "source":          source,
+        "document_type":   doc_type,
+        "document_number": found.get("number", ""),
+        "issue_date":      issue_date,
+        "is_signed":       signed_at is not None and not unsigned,
+        "required_fields": list(rules.required_fields_for(doc_type) or DEFAULT_REQUIRED_FIELDS),
+        "persons":         persons,
+        "signed_by":       signed_by,
+    }
+    if expiry_date:
+        document["expiry_date"] = expiry_date
+    if "amount" in found:
+        document["total_amount"] = _amount(found["amount"])
+    if "inn" in found:
+        document["inn"] = found["inn"]
+    return document
+
+
+# ========================================
+# КОНВЕЙЕР ФАЙЛОВ
+# ========================================
+
+@dataclass
+class ExtractionStats:
+    """
+    Счетчики прогона извлечения.
+
+    Атрибуты:
+        files: Сколько файлов обработано
+        bytes: Объем прочитанного текста, байт
+        elapsed: Время прогона, сек
+        workers: Число процессов
+    """
+    files: int = 0
+    bytes: int = 0
+    elapsed: float = 0.0
+    workers: int = 1
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes / 1e6 / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def mb_per_second_per_core(self) -> float:
+        return self.mb_per_second / self.workers
+
+
+def iter_text_files(paths: Iterable[str], pattern: str = DEFAULT_FILE_PATTERN) -> Iterator[str]:
+    """Файлы из списка путей; каталоги обходятся рекурсивно по маске pattern."""
+    for path in paths:
+        if os.path.isdir(path):
+            yield from sorted(glob.glob(os.path.join(path, "**", pattern), recursive=True))
+        else:
+            yield path
+
+
+def _extract_batch(
+    paths: List[str],
+    matcher: EntityMatcher,
+    rule_set: RuleSet,
+    context: Optional[ValidationContext]
+) -> Tuple[str, int]:
+    """Извлекает документы из пачки файлов; возвращает строки JSON Lines и объем в байтах."""
+    lines = []
+    size = 0
+    for path in paths:
+        with open(path, "rb") as f:
+            raw = f.read()
+        size += len(raw)
+        document = extract_document(raw.decode("utf-8", errors="replace"), matcher, rule_set, source=path)
+        if context is not None:
+            document["verdict"] = check_rules(document, rule_set, context)
+        lines.append(json.dumps(document, ensure_ascii=False))
+    return "".join(line + "\n" for line in lines), size
+
+
+# Автоматы и правила рабочего процесса (передаются один раз через initializer пула)
+_worker_matcher: Optional[EntityMatcher] = None
+_worker_rule_set: Optional[RuleSet] = None
+_worker_context: Optional[ValidationContext] = None
+
+
+def _init_worker(names: List[str], rule_set: RuleSet, context: Optional[ValidationContext]) -> None:
+    global _worker_matcher, _worker_rule_set, _worker_context
+    _worker_matcher = EntityMatcher(names)
+    _worker_rule_set = rule_set
+    _worker_context = context
+
+
+def _extract_batch_in_worker(paths: List[str]) -> Tuple[str, int]:
+    return _extract_batch(paths, _worker_matcher, _worker_rule_set, _worker_context)
+
+
+def _batches(paths: Iterable[str], size: int) -> Iterator[List[str]]:
+    batch = []
+    for path in paths:
+        batch.append(path)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def extract_files(
+    paths: Iterable[str],
+    output: Union[str, IO],
+    workers: int = 1,
+    employees: Optional[Iterable[Employee]] = None,
+    validate: bool = False,
+    rule_set: Optional[RuleSet] = None,
+    context: Optional[ValidationContext] = None,
+    files_per_task: int = FILES_PER_TASK,
+    on_batch: Optional[Callable[[ExtractionStats], None]] = None
+) -> ExtractionStats:
+    """
+    Извлекает документы из текстовых файлов и пишет их в JSON Lines.
+
+    Файлы делятся на пачки по files_per_task; при workers > 1 пачки
+    обрабатываются пулом процессов (в работе не больше 2 * workers пачек),
+    а результаты дописываются в output в исходном порядке.
+
+    Args:
+        paths: Пути к файлам (например, из iter_text_files)
+        output: Путь к выходному .jsonl или текстовый файловый объект
+        workers: Число процессов (1 - в текущем процессе)
+        employees: Сотрудники для словаря имен (по умолчанию - примеры из models)
+        validate: Добавить в каждый документ вердикт check_rules (поле verdict)
+        rule_set: Скомпилированные правила (по умолчанию общий get_rule_set())
+        context: Контекст валидации (по умолчанию - на сегодня)
+        files_per_task: Файлов в одной задаче
+        on_batch: Колбэк после каждой пачки (например, для прогресса)
+
+    Returns:
+        ExtractionStats
+    """
+    matcher = EntityMatcher.from_employees(employees)
+    names = sorted(set(matcher.canonical.values()))
+    rules = rule_set or get_rule_set()
+    if validate:
+        context = context or ValidationContext.create(rule_set=rules)
+    else:
+        context = None
+
+    stats = ExtractionStats(workers=workers)
+    started = time.perf_counter()
+
+    def write(text: str, size: int, count: int) -> None:
+        out.write(text)
+        stats.files += count
+        stats.bytes += size
+        stats.elapsed = time.perf_counter() - started
+        if on_batch:
+            on_batch(stats)
+
+    own_file = isinstance(output, str)
+    out = open(output, "w", encoding="utf-8") if own_file else output
+    try:
+        batches = _batches(paths, files_per_task)
+        if workers == 1:
+            for batch in batches:
+                text, size = _extract_batch(batch, matcher, rules, context)
+                write(text, size, len(batch))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(names, rules, context)
+            ) as pool:
+                pending = deque()
+
+                def submit_next() -> None:
+                    batch = next(batches, None)
+                    if batch is not None:
+                        pending.append((len(batch), pool.submit(_extract_batch_in_worker, batch)))
+
+                for _ in range(2 * workers):
+                    submit_next()
+
+                while pending:
+                    count, future = pending.popleft()
+                    text, size = future.result()
+                    submit_next()
+                    write(text, size, count)
+    finally:
+        if own_file:
+            out.close()
+
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+# ========================================
+# БЕНЧМАРК
+# ========================================
+
+SAMPLE_TEXT = """\
+{doc_title} № {number} от {issued}
+
+Поставщик: ООО "Ромашка", ИНН {inn}
+Покупатель: АО "Василек"
+Ответственный: {author}
+
+Поставка канцелярских товаров согласно спецификации.
+Итого к оплате: на сумму {amount} руб. (НДС не облагается).
+Документ действует до {expiry}.
+
+Подписано электронной подписью: {signer}
+"""
+
+_SAMPLE_TITLES = (("Счет", "INV"), ("Договор поставки", "DOG"), ("Акт выполненных работ", "ACT"))
+
+
+def sample_text(i: int, employees: List[Employee]) -> str:
+    """Синтетический текст документа для бенчмарка и тестов."""
+    title, prefix = _SAMPLE_TITLES[i % len(_SAMPLE_TITLES)]
+    return SAMPLE_TEXT.format(
+        doc_title=title,
+        number=f"{prefix}-2024-{i:06d}",
+        issued=f"{1 + i % 28:02d}.02.2024",
+        inn=f"{7700000000 + i:010d}",
+        author=employees[i % len(employees)].name,
+        amount=f"{1000 + i % 90000:,}".replace(",", " ") + ",00",
+        expiry=f"{1 + i % 28} марта 2025",
+        signer=employees[(i + 1) % len(employees)].name,
+    )
+
+
+def benchmark(size_mb: float = 50, workers: int = 1, files_per_task: int = FILES_PER_TASK) -> ExtractionStats:
+    """
+    Замер пропускной способности: генерирует синтетические тексты на size_mb
+    мегабайт во временном каталоге и извлекает их (результат не сохраняется).
+    """
+    employees = create_sample_employees()
+    with tempfile.TemporaryDirectory() as directory:
+        written = 0
+        i = 0
+        while written < size_mb * 1e6:
+            path = os.path.join(directory, f"doc_{i:07d}.txt")
+            data = sample_text(i, employees).encode("utf-8")
+            with open(path, "wb") as f:
+                written += f.write(data)
+            i += 1
+        with open(os.devnull, "w", encoding="utf-8") as out:
+            return extract_files(
+                iter_text_files([directory]), out,
+                workers=workers, employees=employees, files_per_task=files_per_task
+            )
+
+
+# ========================================
+# CLI
+# ========================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа командной строки для извлечения сущностей."""
+    parser = argparse.ArgumentParser(description="Извлечение сущностей (ИНН, даты, номера, ФИО) из текстов")
+    parser.add_argument("inputs", nargs="*", help="Текстовые файлы или каталоги")
+    parser.add_argument("-o", "--output", help="Куда записать документы (JSON Lines)")
+    parser.add_argument("--pattern", default=DEFAULT_FILE_PATTERN, help="Маска файлов в каталогах")
+    parser.add_argument("--workers", type=int, default=1, help="Число процессов (0 - по числу ядер)")
+    parser.add_argument("--validate", action="store_true", help="Добавить вердикт check_rules")
+    parser.add_argument("--benchmark", type=float, metavar="MB", help="Замерить скорость на MB мегабайт текста")
+    args = parser.parse_args(argv)
+
+    workers = args.workers or os.cpu_count() or 1
+    if args.benchmark:
+        stats = benchmark(args.benchmark, workers)
+    elif args.inputs and args.output:
+        stats = extract_files(
+            iter_text_files(args.inputs, args.pattern), args.output,
+            workers=workers, validate=args.validate
+        )
+    else:
+        parser.error("нужны входные файлы и --output (или --benchmark)")
+
+    print(f"Файлов: {stats.files} ({stats.bytes / 1e6:.1f} МБ)")
+    print(
+        f"Время: {stats.elapsed:.2f} c ({stats.mb_per_second:.1f} МБ/с, "
+        f"{stats.mb_per_second_per_core:.1f} МБ/с на процесс, процессов: {workers})"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
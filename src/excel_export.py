@@ -0,0 +1,252 @@
+"""
+Excel Export - Потоковая выгрузка результатов пакетной валидации в Excel.
+
+Результаты (CSV от batch_engine) читаются чанками и пишутся в .xlsx через
+openpyxl в режиме write_only: строки сразу уходят во временные файлы
+листов, поэтому память не зависит от числа строк.
+
+Структура книги:
+- "Сводка" - число документов по статусам и по колонкам-отметкам
+  ("Дубликат", "Ранее принят"), если они есть в результатах;
+- "Ошибки", "Предупреждения", "OK" - строки результатов по статусам.
+  Лист больше MAX_SHEET_ROWS строк продолжается на листе "Ошибки (2)" и т.д.
+
+    python src/excel_export.py results.csv -o results.xlsx
+    python src/batch_engine.py documents.csv -o results.csv --excel results.xlsx
+"""
+
+import argparse
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, IO, List, Optional, Union
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+
+from batch_engine import DEFAULT_CHUNK_SIZE, STATUS_EMOJI
+from duplicates import DUPLICATE_COLUMN
+from logic import Severity
+from number_registry import REGISTERED_COLUMN
+
+
+# ========================================
+# КОНСТАНТЫ
+# ========================================
+
+# Лимит строк листа Excel (1 048 576) минус строка заголовка
+MAX_SHEET_ROWS = 1_048_575
+
+SUMMARY_SHEET = "Сводка"
+SHEET_TITLES = {
+    Severity.ERROR: "Ошибки",
+    Severity.WARNING: "Предупреждения",
+    Severity.OK: "OK",
+}
+
+# Колонки-отметки: в сводке считаются непустые значения
+FLAG_COLUMNS = (DUPLICATE_COLUMN, REGISTERED_COLUMN)
+
+# Числовые колонки результатов (остальные пишутся как текст)
+NUMERIC_COLUMNS = ("Сумма",)
+
+# Ширина колонок по умолчанию и для колонки вердикта
+COLUMN_WIDTH = 16
+RESULT_COLUMN_WIDTH = 60
+
+_SEVERITY_BY_EMOJI = {emoji: severity for severity, emoji in STATUS_EMOJI.items()}
+_HEADER_FONT = Font(bold=True)
+
+
+# ========================================
+# ЗАПИСЬ КНИГИ
+# ========================================
+
+@dataclass
+class ExportSummary:
+    """
+    Итоги выгрузки.
+
+    Атрибуты:
+        total, ok, warnings, errors: Количество строк по статусам
+        flagged: Колонка-отметка -> число непустых значений
+        elapsed: Время выгрузки, сек
+    """
+    total: int = 0
+    ok: int = 0
+    warnings: int = 0
+    errors: int = 0
+    flagged: Dict[str, int] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+
+class _SheetSeries:
+    """Лист статуса с продолжением на новых листах после MAX_SHEET_ROWS строк."""
+
+    def __init__(self, workbook: Workbook, title: str, columns: List[str], max_rows: int):
+        self.workbook = workbook
+        self.title = title
+        self.columns = columns
+        self.max_rows = max_rows
+        self.sheets = 0
+        self.rows = 0
+        self.sheet = self._new_sheet()
+
+    def _new_sheet(self):
+        self.sheets += 1
+        title = self.title if self.sheets == 1 else f"{self.title} ({self.sheets})"
+        sheet = self.workbook.create_sheet(title)
+        sheet.freeze_panes = "A2"
+        for i, column in enumerate(self.columns, 1):
+            width = RESULT_COLUMN_WIDTH if column == "Результат" else COLUMN_WIDTH
+            sheet.column_dimensions[get_column_letter(i)].width = width
+        sheet.append([_header_cell(sheet, column) for column in self.columns])
+        self.rows = 0
+        return sheet
+
+    def append(self, row: list) -> None:
+        if self.rows == self.max_rows:
+            self.sheet = self._new_sheet()
+        self.sheet.append(row)
+        self.rows += 1
+
+
+def _header_cell(sheet, value: str) -> WriteOnlyCell:
+    cell = WriteOnlyCell(sheet, value=value)
+    cell.font = _HEADER_FONT
+    return cell
+
+
+class ExcelResultWriter:
+    """
+    Книга Excel с результатами валидации в режиме write_only.
+
+    Строки добавляются чанками (write_frame), сводка пишется при close().
+    Лист сводки создается первым, чтобы открываться по умолчанию.
+    """
+
+    def __init__(self, output: Union[str, IO], columns: List[str], max_sheet_rows: int = MAX_SHEET_ROWS):
+        self.output = output
+        self.columns = list(columns)
+        self.summary = ExportSummary(flagged={c: 0 for c in FLAG_COLUMNS if c in self.columns})
+        self.workbook = Workbook(write_only=True)
+        self._summary_sheet = self.workbook.create_sheet(SUMMARY_SHEET)
+        self._sheets = {
+            severity: _SheetSeries(self.workbook, title, self.columns, max_sheet_rows)
+            for severity, title in SHEET_TITLES.items()
+        }
+        self._numeric = [i for i, column in enumerate(self.columns) if column in NUMERIC_COLUMNS]
+        self._started = time.perf_counter()
+
+    def write_frame(self, results: pd.DataFrame) -> None:
+        """
+        Дописывает чанк результатов (колонки как в results_frame).
+        Статус строки определяется по эмодзи в колонке "Статус".
+        """
+        results = results.reindex(columns=self.columns)
+        for i in self._numeric:
+            column = self.columns[i]
+            results[column] = pd.to_numeric(results[column], errors="coerce").astype(object)
+        results = results.astype(object).where(results.notna(), None)
+
+        severities = results["Статус"].map(_SEVERITY_BY_EMOJI)
+        counts = severities.value_counts()
+        self.summary.total += len(results)
+        self.summary.ok += int(counts.get(Severity.OK, 0))
+        self.summary.warnings += int(counts.get(Severity.WARNING, 0))
+        self.summary.errors += int(counts.get(Severity.ERROR, 0))
+        for column in self.summary.flagged:
+            self.summary.flagged[column] += int((results[column].fillna("") != "").sum())
+
+        sheets = self._sheets
+        for severity, row in zip(severities.to_numpy(), results.itertuples(index=False, name=None)):
+            # Строки с неизвестным статусом (например, правленный вручную CSV) - к ошибкам
+            sheets.get(severity, sheets[Severity.ERROR]).append(list(row))
+
+    def _write_summary(self) -> None:
+        sheet = self._summary_sheet
+        sheet.column_dimensions["A"].width = 30
+        sheet.column_dimensions["B"].width = 20
+        sheet.append([_header_cell(sheet, "Показатель"), _header_cell(sheet, "Значение")])
+        sheet.append(["Всего документов", self.summary.total])
+        sheet.append([f"{STATUS_EMOJI[Severity.OK]} Прошли", self.summary.ok])
+        sheet.append([f"{STATUS_EMOJI[Severity.WARNING]} Предупреждения", self.summary.warnings])
+        sheet.append([f"{STATUS_EMOJI[Severity.ERROR]} Ошибки", self.summary.errors])
+        for column, count in self.summary.flagged.items():
+            sheet.append([column, count])
+        sheet.append(["Сформировано", datetime.now().strftime("%Y-%m-%d %H:%M:%S")])
+
+    def close(self) -> ExportSummary:
+        """Пишет сводку и сохраняет книгу."""
+        self._write_summary()
+        self.workbook.save(self.output)
+        self.summary.elapsed = time.perf_counter() - self._started
+        return self.summary
+
+
+def export_results_excel(
+    source: Union[str, IO],
+    output: Union[str, IO],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_sheet_rows: int = MAX_SHEET_ROWS
+) -> ExportSummary:
+    """
+    Выгружает CSV результатов пакетной валидации в Excel.
+
+    Args:
+        source: Путь к CSV результатов (validate_csv_stream / validate_csv_parallel)
+            или текстовый файловый объект
+        output: Путь к .xlsx или бинарный файловый объект
+        chunk_size: Сколько строк CSV читать за раз
+        max_sheet_rows: Строк на листе до переноса на следующий
+
+    Returns:
+        ExportSummary
+    """
+    chunks = pd.read_csv(
+        source, chunksize=chunk_size, dtype=str, keep_default_na=False, encoding="utf-8-sig"
+    )
+    writer = None
+    for chunk in chunks:
+        if writer is None:
+            writer = ExcelResultWriter(output, list(chunk.columns), max_sheet_rows)
+        writer.write_frame(chunk)
+    if writer is None:
+        # Пустой CSV (только заголовок): колонки берем из него же
+        if hasattr(source, "seek"):
+            source.seek(0)
+        columns = list(pd.read_csv(source, nrows=0, encoding="utf-8-sig").columns)
+        writer = ExcelResultWriter(output, columns, max_sheet_rows)
+    return writer.close()
+
+
+# ========================================
+# CLI
+# ========================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа командной строки для выгрузки результатов в Excel."""
+    parser = argparse.ArgumentParser(description="Выгрузка результатов пакетной валидации в Excel")
+    parser.add_argument("input", help="CSV результатов (batch_engine -o ...)")
+    parser.add_argument("-o", "--output", required=True, help="Куда записать книгу (.xlsx)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Строк в чанке")
+    args = parser.parse_args(argv)
+
+    summary = export_results_excel(args.input, args.output, chunk_size=args.chunk_size)
+    print_summary(summary, args.output)
+    return 0
+
+
+def print_summary(summary: ExportSummary, path: str) -> None:
+    print(f"Excel: {os.path.abspath(path)}")
+    print(f"  Строк: {summary.total} (OK: {summary.ok}, предупреждения: {summary.warnings}, "
+          f"ошибки: {summary.errors}) за {summary.elapsed:.2f} c")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Excel Import - Потоковое чтение документов из Excel (.xlsx) для пакетной валидации.
+
+Книга открывается openpyxl в режиме read_only: строки листов читаются из
+XML по мере обхода, в памяти держится только текущий чанк (и таблица
+общих строк книги). Каждый лист с заголовком в формате CSV пакетной
+валидации (хотя бы одна колонка из COLUMN_DEFAULTS) отдается чанками
+по chunk_size строк - в том же виде, что iter_csv_chunks, поэтому дальше
+работает тот же путь валидации:
+
+    stats = validate_xlsx_stream("documents.xlsx", "results.csv")
+    python src/batch_engine.py documents.xlsx -o results.csv
+"""
+
+from datetime import date, datetime, time
+from typing import IO, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from batch_engine import COLUMN_DEFAULTS, DEFAULT_CHUNK_SIZE, BatchStats, validate_chunks
+from document_validators import DATE_FORMAT
+
+
+# ========================================
+# ПРЕОБРАЗОВАНИЕ ЯЧЕЕК
+# ========================================
+
+def cell_to_str(value) -> Optional[str]:
+    """
+    Значение ячейки как строка CSV (None - пустая ячейка).
+
+    Даты Excel -> YYYY-MM-DD, целые числа без ".0" (ИНН, введенный числом,
+    не превращается в "7707083893.0"), логические -> True/False.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value if value.strip() else None
+    if isinstance(value, bool):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.strftime(DATE_FORMAT)
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, time):
+        return value.isoformat()
+    return str(value)
+
+
+def _header(row: tuple) -> List[str]:
+    return [str(value).strip() if value is not None else "" for value in row]
+
+
+def _frame(columns: List[str], rows: List[list]) -> pd.DataFrame:
+    data = np.array(rows, dtype=object).reshape(len(rows), len(columns))
+    df = pd.DataFrame(data, columns=columns)
+    # Пустые ячейки - NaN, как у pd.read_csv(dtype=str)
+    return df.fillna(np.nan)
+
+
+# ========================================
+# ЧТЕНИЕ ЧАНКАМИ
+# ========================================
+
+def sheet_names(source: Union[str, IO]) -> List[str]:
+    """Имена листов книги (без чтения строк)."""
+    workbook = load_workbook(source, read_only=True)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def iter_xlsx_chunks(
+    source: Union[str, IO],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    sheets: Optional[Iterable[str]] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Читает документы из .xlsx чанками по chunk_size строк, лист за листом.
+
+    Args:
+        source: Путь к .xlsx или бинарный файловый объект
+        chunk_size: Строк в чанке
+        sheets: Какие листы читать (по умолчанию - все)
+
+    Листы без колонок пакетной валидации в заголовке (первая строка)
+    пропускаются, полностью пустые строки тоже. Колонки без заголовка
+    отбрасываются.
+    """
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        for name in (list(sheets) if sheets is not None else workbook.sheetnames):
+            rows = workbook[name].iter_rows(values_only=True)
+            header = _header(next(rows, ()))
+            if not any(column in COLUMN_DEFAULTS for column in header):
+                continue
+            keep = [i for i, column in enumerate(header) if column]
+            columns = [header[i] for i in keep]
+
+            chunk: List[list] = []
+            for row in rows:
+                values = [cell_to_str(row[i]) if i < len(row) else None for i in keep]
+                if all(value is None for value in values):
+                    continue
+                chunk.append(values)
+                if len(chunk) == chunk_size:
+                    yield _frame(columns, chunk)
+                    chunk = []
+            if chunk:
+                yield _frame(columns, chunk)
+    finally:
+        workbook.close()
+
+
+def validate_xlsx_stream(
+    source: Union[str, IO],
+    output: Union[str, IO],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    sheets: Optional[Iterable[str]] = None,
+    **kwargs
+) -> BatchStats:
+    """
+    Потоковая валидация .xlsx: то же, что validate_csv_stream, но чанки
+    берутся из iter_xlsx_chunks. Остальные аргументы - как у validate_chunks.
+    """
+    return validate_chunks(iter_xlsx_chunks(source, chunk_size, sheets), output, **kwargs)
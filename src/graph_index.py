@@ -0,0 +1,302 @@
+"""
+Graph Index - Индексы графа документооборота для быстрых запросов.
+
+DocumentFlowIndex хранит рядом с nx.DiGraph смежность, разложенную по типам
+связей, чтобы find_approval_chain и find_who_can_sign не перебирали соседей:
+
+- документ -> узел типа (is_type)
+- тип -> отделы согласования в порядке цепочки (approval_required)
+- отдел -> сотрудники с правом подписи, отсортированные по max_sign_amount
+- тип -> таблица допуска: границы сумм и подписанты для каждого диапазона
+
+Индекс строится в create_document_flow_graph и хранится в graph.graph.
+"""
+
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import networkx as nx
+
+
+# ========================================
+# КОНСТАНТЫ
+# ========================================
+
+# Ключ, под которым индекс лежит в graph.graph
+INDEX_KEY = "flow_index"
+
+# Префикс узлов типов документов
+TYPE_NODE_PREFIX = "type_"
+
+# Типы связей графа
+WORKS_IN = "works_in"
+CREATED_IN = "created_in"
+SIGNED_BY = "signed_by"
+IS_TYPE = "is_type"
+APPROVAL_REQUIRED = "approval_required"
+CAN_SIGN = "can_sign"
+MANAGED_BY = "managed_by"
+
+RELATIONS = (WORKS_IN, CREATED_IN, SIGNED_BY, IS_TYPE, APPROVAL_REQUIRED, CAN_SIGN, MANAGED_BY)
+
+
+def type_node_name(doc_type: str) -> str:
+    """Имя узла графа для типа документа."""
+    return f"{TYPE_NODE_PREFIX}{doc_type}"
+
+
+# ========================================
+# ПОДПИСАНТЫ ОТДЕЛА
+# ========================================
+
+@dataclass
+class SignerTable:
+    """
+    Сотрудники отдела с правом подписи.
+
+    Атрибуты:
+        limits: Лимиты подписи по возрастанию (только ненулевые)
+        names: ФИО сотрудников в том же порядке, что и limits
+        unlimited: Сотрудники без ограничения суммы (max_sign_amount == 0)
+    """
+    limits: List[float] = field(default_factory=list)
+    names: List[str] = field(default_factory=list)
+    unlimited: List[str] = field(default_factory=list)
+
+    def add(self, name: str, limit: float) -> None:
+        """Добавляет подписанта (limit == 0 - без ограничений)."""
+        if limit == 0:
+            self.unlimited.append(name)
+            return
+        position = bisect_left(self.limits, limit)
+        # Среди равных лимитов сохраняем порядок добавления
+        while position < len(self.limits) and self.limits[position] == limit:
+            position += 1
+        self.limits.insert(position, limit)
+        self.names.insert(position, name)
+
+    def remove(self, name: str) -> None:
+        """Убирает подписанта (если он есть)."""
+        if name in self.unlimited:
+            self.unlimited.remove(name)
+            return
+        if name in self.names:
+            position = self.names.index(name)
+            del self.names[position]
+            del self.limits[position]
+
+    def eligible(self, amount: float) -> List[str]:
+        """Сотрудники, которые могут подписать документ на сумму amount."""
+        return self.unlimited + self.names[bisect_left(self.limits, amount):]
+
+    def __len__(self) -> int:
+        return len(self.names) + len(self.unlimited)
+
+
+# ========================================
+# ТАБЛИЦА ДОПУСКА К ПОДПИСИ
+# ========================================
+
+@dataclass
+class EligibilityTable:
+    """
+    Подписанты типа документа по диапазонам сумм.
+
+    Атрибуты:
+        breakpoints: Лимиты подписантов цепочки по возрастанию (без повторов)
+        signers: Подписанты для каждого диапазона; signers[i] относится к
+            суммам, для которых bisect_left(breakpoints, amount) == i,
+            последний элемент - к суммам выше всех лимитов
+    """
+    breakpoints: List[float]
+    signers: List[Tuple[str, ...]]
+
+    def lookup(self, amount: float) -> Tuple[str, ...]:
+        """Сотрудники, которые могут подписать сумму amount."""
+        return self.signers[bisect_left(self.breakpoints, amount)]
+
+
+# ========================================
+# ИНДЕКС ГРАФА
+# ========================================
+
+class DocumentFlowIndex:
+    """
+    Смежность графа документооборота, разложенная по типам связей.
+
+    Атрибуты:
+        doc_type: Документ -> узел его типа
+        doc_amount: Документ -> сумма (из Document.total_amount)
+        signed_by: Документ -> подписавшие сотрудники в порядке ребер signed_by
+        approval_chain: Узел типа -> отделы согласования в порядке цепочки
+        signers: Отдел -> SignerTable
+        eligibility: Узел типа -> EligibilityTable (строится при первом запросе
+            и сбрасывается, когда меняются подписанты отделов цепочки)
+    """
+
+    def __init__(self):
+        self.doc_type: Dict[str, str] = {}
+        self.doc_amount: Dict[str, float] = {}
+        self.signed_by: Dict[str, List[str]] = {}
+        self.approval_chain: Dict[str, List[str]] = {}
+        self.signers: Dict[str, SignerTable] = {}
+        self.eligibility: Dict[Optional[str], EligibilityTable] = {}
+        self.fingerprint: int = 0
+
+    @classmethod
+    def from_graph(cls, graph: nx.DiGraph) -> "DocumentFlowIndex":
+        """
+        Строит индекс по готовому графу за один проход по ребрам.
+
+        Порядок отделов в цепочке совпадает с порядком ребер approval_required,
+        т.е. с DocumentType.approval_chain.
+        """
+        index = cls()
+        nodes = graph.nodes
+
+        for node, data in nodes(data=True):
+            if data.get('type') == 'document' and data.get('data'):
+                index.doc_amount[node] = data['data'].total_amount
+
+        for source, target, relation in graph.edges(data='relation'):
+            source_type = nodes[source].get('type')
+            target_type = nodes[target].get('type')
+
+            if relation == IS_TYPE and target_type == 'document_type':
+                index.doc_type.setdefault(source, target)
+            elif relation == APPROVAL_REQUIRED and target_type == 'department':
+                index.approval_chain.setdefault(source, []).append(target)
+            elif relation == SIGNED_BY and target_type == 'employee':
+                index.signed_by.setdefault(source, []).append(target)
+            elif relation == WORKS_IN and source_type == 'employee':
+                index.add_employee(source, target, nodes[source].get('data'))
+
+        index.fingerprint = graph.number_of_nodes()
+        return index
+
+    # --- ОБНОВЛЕНИЕ ---
+
+    def add_employee(self, name: str, department: str, employee) -> None:
+        """Регистрирует сотрудника отдела, если у него есть право подписи."""
+        if employee and employee.can_sign:
+            self.signers.setdefault(department, SignerTable()).add(name, employee.max_sign_amount)
+            self.invalidate_department(department)
+
+    def remove_employee(self, name: str, department: str) -> None:
+        table = self.signers.get(department)
+        if table is not None:
+            table.remove(name)
+            self.invalidate_department(department)
+
+    def invalidate_department(self, department: str) -> None:
+        """Сбрасывает таблицы допуска типов, в цепочку которых входит отдел."""
+        if not self.eligibility:
+            return
+        for type_node, chain in self.approval_chain.items():
+            if department in chain:
+                self.eligibility.pop(type_node, None)
+
+    def invalidate_eligibility(self, type_node: Optional[str] = None) -> None:
+        """Сбрасывает таблицу допуска типа (None - все таблицы)."""
+        if type_node is None:
+            self.eligibility.clear()
+        else:
+            self.eligibility.pop(type_node, None)
+
+    def add_document(self, document_number: str, type_node: Optional[str], amount: float) -> None:
+        """Регистрирует документ (type_node is None - тип отсутствует в графе)."""
+        self.doc_amount[document_number] = amount
+        if type_node is not None:
+            self.doc_type[document_number] = type_node
+
+    def remove_document(self, document_number: str) -> None:
+        self.doc_type.pop(document_number, None)
+        self.doc_amount.pop(document_number, None)
+        self.signed_by.pop(document_number, None)
+
+    def add_signature(self, document_number: str, employee_name: str) -> None:
+        self.signed_by.setdefault(document_number, []).append(employee_name)
+
+    def sync(self, graph: nx.DiGraph) -> None:
+        """
+        Фиксирует размер графа после обновления через API knowledge_graph,
+        чтобы get_flow_index не принял его за изменение в обход индекса.
+        """
+        self.fingerprint = graph.number_of_nodes()
+
+    # --- ЗАПРОСЫ ---
+
+    def approval_chain_for(self, document_number: str) -> List[str]:
+        """Отделы согласования документа (пустой список, если тип неизвестен)."""
+        type_node = self.doc_type.get(document_number)
+        if type_node is None:
+            return []
+        return list(self.approval_chain.get(type_node, ()))
+
+    def signers_for_amount(self, departments: List[str], amount: float) -> List[str]:
+        """Сотрудники перечисленных отделов, которые могут подписать сумму amount."""
+        result: List[str] = []
+        for department in departments:
+            table = self.signers.get(department)
+            if table is not None:
+                result += table.eligible(amount)
+        return list(dict.fromkeys(result))
+
+    def chain_limits(self, type_node: str) -> List[float]:
+        """
+        Отсортированные лимиты подписантов всех отделов цепочки типа.
+
+        Документы одного типа, у которых bisect_left по этому списку дает одну
+        позицию, имеют один и тот же набор подписантов.
+        """
+        limits = set()
+        for department in self.approval_chain.get(type_node, ()):
+            table = self.signers.get(department)
+            if table is not None:
+                limits.update(table.limits)
+        return sorted(limits)
+
+    def eligibility_for(self, type_node: Optional[str]) -> EligibilityTable:
+        """Таблица допуска типа документа (строится один раз до изменения подписантов)."""
+        table = self.eligibility.get(type_node)
+        if table is None:
+            chain = self.approval_chain.get(type_node, [])
+            breakpoints = self.chain_limits(type_node)
+            # Внутри диапазона набор подписантов тот же, что и на его верхней границе
+            table = EligibilityTable(breakpoints, [
+                tuple(self.signers_for_amount(chain, limit))
+                for limit in breakpoints + [float('inf')]
+            ])
+            self.eligibility[type_node] = table
+        return table
+
+    def who_can_sign(self, document_number: str) -> List[str]:
+        """Сотрудники из цепочки согласования, которые могут подписать документ."""
+        amount = self.doc_amount.get(document_number)
+        if amount is None:
+            return []
+        return list(self.eligibility_for(self.doc_type.get(document_number)).lookup(amount))
+
+
+def get_flow_index(graph: nx.DiGraph) -> DocumentFlowIndex:
+    """
+    Индекс графа. Если граф построен не через create_document_flow_graph
+    или изменен напрямую через networkx (изменилось число узлов),
+    индекс перестраивается.
+
+    Сверяется только число узлов: number_of_edges в networkx обходит все
+    узлы графа и стоил бы дороже самого запроса. После прямых изменений
+    одних ребер нужно вызвать rebuild_flow_index.
+    """
+    index: Optional[DocumentFlowIndex] = graph.graph.get(INDEX_KEY)
+    if index is None or index.fingerprint != graph.number_of_nodes():
+        index = rebuild_flow_index(graph)
+    return index
+
+
+def rebuild_flow_index(graph: nx.DiGraph) -> DocumentFlowIndex:
+    """Перестраивает индекс графа заново."""
+    index = DocumentFlowIndex.from_graph(graph)
+    graph.graph[INDEX_KEY] = index
+    return index
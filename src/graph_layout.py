@@ -0,0 +1,271 @@
+"""
+Graph Layout - Раскладки графа для вкладки визуализации.
+
+Раскладка пересчитывается только при изменении графа, фильтра типов узлов
+или алгоритма: результаты хранятся в LayoutCache по ключу
+(версия графа, типы узлов, алгоритм). При смене одного фильтра новая
+раскладка стартует с позиций предыдущей и сходится за несколько итераций.
+Граф для отрисовки (display_graph) кэшируется там же по ключу
+(версия графа, типы узлов) - от алгоритма он не зависит.
+
+Для больших графов документы сворачиваются в узлы-группы по типу
+(aggregate_documents), а при необходимости и сотрудники по отделам
+(aggregate_employees); kamada_kawai (O(n^2) по памяти) заменяется на spring.
+
+    cache = LayoutCache()
+    view = cache.display_graph(G, graph_version(G), {'employee', 'department'})
+    pos = cache.layout(view, graph_version(G), {'employee', 'department'}, "spring")
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+import networkx as nx
+
+from graph_index import WORKS_IN
+
+
+# ========================================
+# КОНСТАНТЫ
+# ========================================
+
+LAYOUTS = ("spring", "circular", "kamada_kawai", "shell")
+
+# Больше узлов - kamada_kawai заменяется на spring
+KAMADA_KAWAI_MAX_NODES = 500
+
+# Больше узлов в видимой части - документы сворачиваются по типам
+AGGREGATE_THRESHOLD = 300
+
+# Итерации spring: полный расчет и дорасчет от предыдущей раскладки
+SPRING_ITERATIONS = 50
+SPRING_WARM_ITERATIONS = 15
+
+# Фиксированное зерно, чтобы раскладка не "прыгала" между перезапусками
+LAYOUT_SEED = 42
+
+DEFAULT_LAYOUT_CACHE_SIZE = 32
+
+# Типы узлов-групп в свернутом виде
+DOCUMENT_GROUP = "document_group"
+EMPLOYEE_GROUP = "employee_group"
+
+Position = Dict[str, Tuple[float, float]]
+LayoutKey = Tuple[int, FrozenSet[str], str]
+DisplayKey = Tuple[int, FrozenSet[str]]
+
+
+# ========================================
+# ВИДИМАЯ ЧАСТЬ ГРАФА
+# ========================================
+
+def visible_subgraph(graph: nx.DiGraph, node_types: Iterable[str]) -> nx.DiGraph:
+    """Подграф из узлов выбранных типов."""
+    node_types = set(node_types)
+    return graph.subgraph(n for n, t in graph.nodes(data='type') if t in node_types)
+
+
+def _collapse(graph: nx.DiGraph, node_type: str, group_type: str, title: str, group_of) -> nx.DiGraph:
+    """
+    Заменяет узлы node_type узлами-группами: group_of(node, data) дает ключ
+    группы, связи свернутых узлов переносятся на группы (без повторов).
+    """
+    keys = {
+        node: group_of(node, data)
+        for node, data in graph.nodes(data=True) if data.get('type') == node_type
+    }
+    counts: Dict[str, int] = {}
+    for key in keys.values():
+        counts[key] = counts.get(key, 0) + 1
+    names = {node: f"{title}: {key} ({counts[key]})" for node, key in keys.items()}
+
+    view = nx.DiGraph()
+    view.add_nodes_from((n, d) for n, d in graph.nodes(data=True) if n not in keys)
+    for key, count in counts.items():
+        view.add_node(f"{title}: {key} ({count})", type=group_type, key=key, count=count)
+
+    for source, target, data in graph.edges(data=True):
+        source = names.get(source, source)
+        target = names.get(target, target)
+        if source != target and not view.has_edge(source, target):
+            view.add_edge(source, target, **data)
+    return view
+
+
+def aggregate_documents(graph: nx.DiGraph) -> nx.DiGraph:
+    """
+    Сворачивает документы в узлы-группы по типу документа.
+
+    Узел группы получает имя "Документы: <тип> (<количество>)", тип
+    DOCUMENT_GROUP и связи свернутых документов (с типом, отделами,
+    подписантами). Остальные узлы и связи сохраняются.
+    """
+    return _collapse(graph, 'document', DOCUMENT_GROUP, "Документы",
+                     lambda node, data: data.get('doc_type'))
+
+
+def aggregate_employees(graph: nx.DiGraph) -> nx.DiGraph:
+    """Сворачивает сотрудников в узлы-группы по отделу (связь works_in)."""
+    def department(node, data):
+        return next(
+            (t for t, edge in graph.adj[node].items() if edge.get('relation') == WORKS_IN),
+            None
+        )
+    return _collapse(graph, 'employee', EMPLOYEE_GROUP, "Сотрудники", department)
+
+
+def display_graph(graph: nx.DiGraph, node_types: Iterable[str]) -> nx.DiGraph:
+    """
+    Граф для отрисовки: видимые узлы, а если их больше AGGREGATE_THRESHOLD -
+    с документами, а затем и сотрудниками, свернутыми в группы.
+    """
+    view = visible_subgraph(graph, node_types)
+    for aggregate in (aggregate_documents, aggregate_employees):
+        if view.number_of_nodes() <= AGGREGATE_THRESHOLD:
+            break
+        view = aggregate(view)
+    return view
+
+
+# ========================================
+# РАСЧЕТ РАСКЛАДКИ
+# ========================================
+
+def effective_layout(layout_type: str, node_count: int) -> str:
+    """Алгоритм, который будет реально использован для графа из node_count узлов."""
+    if layout_type == "kamada_kawai" and node_count > KAMADA_KAWAI_MAX_NODES:
+        return "spring"
+    return layout_type
+
+
+def compute_layout(
+    graph: nx.DiGraph,
+    layout_type: str,
+    initial: Optional[Position] = None
+) -> Position:
+    """
+    Считает раскладку графа.
+
+    Args:
+        graph: Граф (или подграф) для отрисовки
+        layout_type: Один из LAYOUTS
+        initial: Позиции предыдущей раскладки - с них стартуют итеративные
+            алгоритмы (узлы без позиции получают место на окружности)
+
+    Raises:
+        ValueError: Если алгоритм неизвестен
+    """
+    if layout_type not in LAYOUTS:
+        raise ValueError(f"Unknown layout: {layout_type}")
+    if graph.number_of_nodes() == 0:
+        return {}
+
+    layout_type = effective_layout(layout_type, graph.number_of_nodes())
+    if layout_type == "circular":
+        return nx.circular_layout(graph)
+    if layout_type == "shell":
+        return nx.shell_layout(graph)
+
+    start = None
+    if initial:
+        start = nx.circular_layout(graph)
+        start.update((n, p) for n, p in initial.items() if n in start)
+
+    if layout_type == "kamada_kawai":
+        return nx.kamada_kawai_layout(graph, pos=start)
+
+    iterations = SPRING_WARM_ITERATIONS if start else SPRING_ITERATIONS
+    return nx.spring_layout(graph, k=1, pos=start, iterations=iterations, seed=LAYOUT_SEED)
+
+
+# ========================================
+# КЭШ РАСКЛАДОК
+# ========================================
+
+def layout_key(version: int, node_types: Iterable[str], layout_type: str) -> LayoutKey:
+    """Ключ раскладки; им же пользуются кэши, производные от раскладки."""
+    return (version, frozenset(node_types), layout_type)
+
+
+class LayoutCache:
+    """
+    LRU-кэш раскладок по ключу (версия графа, типы узлов, алгоритм) и
+    графов для отрисовки по ключу (версия графа, типы узлов).
+
+    Потокобезопасен: Streamlit выполняет сессии в разных потоках.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_LAYOUT_CACHE_SIZE):
+        if maxsize <= 0:
+            raise ValueError(f"Cache size must be positive, got: {maxsize}")
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[LayoutKey, Position]" = OrderedDict()
+        self._views: "OrderedDict[DisplayKey, nx.DiGraph]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def display_graph(self, graph: nx.DiGraph, version: int, node_types: Iterable[str]) -> nx.DiGraph:
+        """
+        Граф для отрисовки (display_graph) из кэша: видимая часть и
+        свертка групп считаются один раз на (версию графа, типы узлов).
+        """
+        key = (version, frozenset(node_types))
+        with self._lock:
+            view = self._views.get(key)
+            if view is not None:
+                self._views.move_to_end(key)
+                return view
+
+        view = display_graph(graph, key[1])
+
+        with self._lock:
+            self._views[key] = view
+            self._views.move_to_end(key)
+            while len(self._views) > self.maxsize:
+                self._views.popitem(last=False)
+        return view
+
+    def layout(
+        self,
+        graph: nx.DiGraph,
+        version: int,
+        node_types: Iterable[str],
+        layout_type: str
+    ) -> Position:
+        """
+        Раскладка graph из кэша или новая, начатая с последней раскладки
+        того же алгоритма (если она есть).
+        """
+        key = layout_key(version, node_types, layout_type)
+        with self._lock:
+            pos = self._entries.get(key)
+            if pos is not None:
+                self._entries.move_to_end(key)
+                return pos
+            initial = self._latest(layout_type)
+
+        pos = compute_layout(graph, layout_type, initial)
+
+        with self._lock:
+            self._entries[key] = pos
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return pos
+
+    def _latest(self, layout_type: str) -> Optional[Position]:
+        for (_, _, cached_type), pos in reversed(self._entries.items()):
+            if cached_type == layout_type:
+                return pos
+        return None
+
+    def __contains__(self, key: LayoutKey) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._views.clear()
@@ -0,0 +1,204 @@
+"""
+Graph Render - Отрисовка графа в PNG/SVG на стороне сервера.
+
+Изображение рисуется один раз на (раскладка, размер узлов, подписи, формат)
+и хранится в RenderCache как байты - повторные перезапуски скрипта
+Streamlit только отдают готовую картинку. Фигуры создаются через
+matplotlib.figure.Figure (без глобального реестра pyplot) и явно
+освобождаются после сохранения.
+
+Графы больше FAST_PATH_THRESHOLD узлов рисуются быстрым путем: узлы одним
+scatter, ребра одной LineCollection, без подписей и стрелок.
+
+    cache = RenderCache()
+    png = cache.render(layout_key(...), subgraph, pos, node_size=1500, show_labels=True)
+"""
+
+import io
+import threading
+from collections import OrderedDict
+from typing import Hashable, Tuple
+
+import networkx as nx
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+
+from graph_layout import Position, DOCUMENT_GROUP, EMPLOYEE_GROUP
+
+
+# ========================================
+# КОНСТАНТЫ
+# ========================================
+
+RENDER_FORMATS = ("png", "svg")
+
+# Больше узлов - быстрый путь без подписей и стрелок
+FAST_PATH_THRESHOLD = 500
+
+FIGURE_SIZE = (14, 10)
+FIGURE_DPI = 100
+TITLE = "Граф знаний системы документооборота"
+
+# Длинные подписи обрезаются до LABEL_MAX_LENGTH символов
+LABEL_MAX_LENGTH = 20
+
+DEFAULT_RENDER_CACHE_SIZE = 16
+
+# Цвета узлов по типу
+NODE_COLORS = {
+    'employee': '#FFB6C1',       # Розовый
+    'department': '#87CEEB',     # Голубой
+    'document': '#90EE90',       # Светло-зеленый
+    'document_type': '#FFD700',  # Золотой
+    DOCUMENT_GROUP: '#3CB371',   # Зеленый
+    EMPLOYEE_GROUP: '#DB7093',   # Темно-розовый
+}
+DEFAULT_NODE_COLOR = '#CCCCCC'
+
+
+# ========================================
+# ОТРИСОВКА
+# ========================================
+
+def short_label(node: str) -> str:
+    """Подпись узла, обрезанная до LABEL_MAX_LENGTH символов."""
+    if len(node) > LABEL_MAX_LENGTH:
+        return node[:LABEL_MAX_LENGTH - 3] + "..."
+    return node
+
+
+def _draw_full(ax, graph: nx.DiGraph, pos: Position, colors: list, node_size: int, show_labels: bool) -> None:
+    nx.draw_networkx_nodes(graph, pos, node_color=colors, node_size=node_size, alpha=0.8, ax=ax)
+    nx.draw_networkx_edges(
+        graph, pos,
+        edge_color='gray',
+        alpha=0.5,
+        arrows=True,
+        arrowsize=20,
+        ax=ax
+    )
+    if show_labels:
+        nx.draw_networkx_labels(
+            graph, pos,
+            labels={node: short_label(node) for node in graph.nodes()},
+            font_size=8,
+            font_weight='bold',
+            ax=ax
+        )
+
+
+def _draw_fast(ax, graph: nx.DiGraph, pos: Position, colors: list, node_size: int) -> None:
+    nodes = list(graph.nodes())
+    xy = np.array([pos[node] for node in nodes], dtype=float)
+    segments = [(pos[u], pos[v]) for u, v in graph.edges()]
+    if segments:
+        ax.add_collection(LineCollection(segments, colors='gray', alpha=0.3, linewidths=0.5))
+    # Размер узла уменьшается с ростом графа, иначе узлы сливаются
+    size = max(4.0, node_size * FAST_PATH_THRESHOLD / len(nodes) / 10)
+    ax.scatter(xy[:, 0], xy[:, 1], c=colors, s=size, alpha=0.8, linewidths=0)
+
+
+def render_graph(
+    graph: nx.DiGraph,
+    pos: Position,
+    node_size: int = 1500,
+    show_labels: bool = True,
+    fmt: str = "png"
+) -> bytes:
+    """
+    Рисует граф и возвращает изображение в формате fmt.
+
+    Args:
+        graph: Граф для отрисовки (узлы с атрибутом type)
+        pos: Раскладка (позиции всех узлов graph)
+        node_size: Размер узлов
+        show_labels: Рисовать подписи (игнорируется на быстром пути)
+        fmt: "png" или "svg"
+
+    Raises:
+        ValueError: Если формат не поддерживается
+    """
+    if fmt not in RENDER_FORMATS:
+        raise ValueError(f"Unsupported image format: {fmt}")
+
+    colors = [NODE_COLORS.get(graph.nodes[node].get('type'), DEFAULT_NODE_COLOR) for node in graph.nodes()]
+
+    fig = Figure(figsize=FIGURE_SIZE, dpi=FIGURE_DPI)
+    FigureCanvasAgg(fig)
+    try:
+        ax = fig.add_subplot()
+        if graph.number_of_nodes() > FAST_PATH_THRESHOLD:
+            _draw_fast(ax, graph, pos, colors, node_size)
+        elif graph.number_of_nodes():
+            _draw_full(ax, graph, pos, colors, node_size, show_labels)
+        ax.set_title(TITLE, fontsize=16, fontweight='bold')
+        ax.axis('off')
+
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt)
+        return buffer.getvalue()
+    finally:
+        fig.clear()
+
+
+# ========================================
+# КЭШ ИЗОБРАЖЕНИЙ
+# ========================================
+
+RenderKey = Tuple[Hashable, int, bool, str]
+
+
+class RenderCache:
+    """
+    LRU-кэш готовых изображений графа.
+
+    Ключ - (ключ раскладки, размер узлов, подписи, формат); ключ раскладки
+    (graph_layout.layout_key) уже включает версию графа и фильтр типов узлов.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_RENDER_CACHE_SIZE):
+        if maxsize <= 0:
+            raise ValueError(f"Cache size must be positive, got: {maxsize}")
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[RenderKey, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.renders = 0
+
+    def render(
+        self,
+        layout: Hashable,
+        graph: nx.DiGraph,
+        pos: Position,
+        node_size: int = 1500,
+        show_labels: bool = True,
+        fmt: str = "png"
+    ) -> bytes:
+        """Изображение из кэша или новое (см. render_graph)."""
+        if graph.number_of_nodes() > FAST_PATH_THRESHOLD:
+            # Быстрый путь подписей не рисует - не плодим одинаковые картинки
+            show_labels = False
+        key = (layout, node_size, show_labels, fmt)
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+                return image
+
+        image = render_graph(graph, pos, node_size, show_labels, fmt)
+
+        with self._lock:
+            self.renders += 1
+            self._entries[key] = image
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return image
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,317 @@
+"""
+Graph Snapshot - Двоичный снимок CompactGraph для быстрой загрузки.
+
+Вместо пересборки графа из объектов моделей при каждом запуске процесса
+граф один раз сохраняется в файл, а затем отображается в память (mmap):
+массивы узлов и ребер читаются без копирования, декодируются только
+таблицы строк.
+
+Формат файла (версия SNAPSHOT_VERSION):
+
+    MAGIC (8 байт) | версия (uint32) | длина заголовка (uint32) | CRC32 (uint32)
+    | заголовок JSON | выравнивание до ALIGNMENT | массивы, каждый выровнен до ALIGNMENT
+
+Заголовок описывает массивы (dtype, shape, смещение) и ключ исходных данных
+(source_key). CRC32 считается по всему, что идет после преамбулы: заголовку
+и массивам.
+
+Ключ исходных данных должен быть дешевле сборки графа: при старте
+используется file_source_key - mtime и размер файлов, из которых берутся
+данные (как get_rule_set для rules.json).
+
+    source_key = file_source_key(models.__file__, __file__)
+    store = load_or_build(DEFAULT_SNAPSHOT_PATH, source_key, build)
+"""
+
+import hashlib
+import json
+import os
+import struct
+import zlib
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from logic import BASE_DIR
+from graph_store import Adjacency, CompactGraph
+
+
+# ========================================
+# КОНСТАНТЫ
+# ========================================
+
+MAGIC = b"DFGSNAP\0"
+SNAPSHOT_VERSION = 2
+
+# Выравнивание массивов в файле (байт)
+ALIGNMENT = 64
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'graph.snapshot')
+
+# Разделитель строк в таблицах имен и значений
+STRING_SEPARATOR = "\0"
+
+_PREAMBLE = struct.Struct("<8sIII")
+
+# Обязательные поля заголовка и описания массива
+HEADER_KEYS = ('source_key', 'node_count', 'string_count', 'data_size', 'arrays')
+ARRAY_KEYS = ('dtype', 'shape', 'offset')
+REQUIRED_ARRAYS = ('kind', 'names', 'strings')
+
+
+# ========================================
+# КЛЮЧ ИСХОДНЫХ ДАННЫХ
+# ========================================
+
+def file_source_key(*paths: str) -> str:
+    """
+    Ключ исходных данных по файлам: SHA-256 от путей, mtime и размеров.
+
+    Не требует загрузки данных, поэтому годится для проверки снимка при
+    старте. Отсутствующий файл дает ключ, не совпадающий ни с каким снимком.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+            digest.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size}\n".encode('utf-8'))
+        except OSError:
+            digest.update(f"{path}:missing\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+# ========================================
+# ЗАПИСЬ
+# ========================================
+
+def _pack_strings(values) -> np.ndarray:
+    for value in values:
+        if STRING_SEPARATOR in value:
+            raise ValueError(f"Строка содержит недопустимый символ \\0: {value!r}")
+    return np.frombuffer(STRING_SEPARATOR.join(values).encode('utf-8'), dtype=np.uint8)
+
+
+def _arrays(store: CompactGraph) -> Dict[str, np.ndarray]:
+    arrays = {
+        'kind': store.kind,
+        'names': _pack_strings(store.names),
+        'strings': _pack_strings(store.strings),
+    }
+    for column, values in store.columns.items():
+        arrays[f'columns/{column}'] = values
+    for relation, adjacency in store.adjacency.items():
+        arrays[f'adjacency/{relation}/indptr'] = adjacency.indptr
+        arrays[f'adjacency/{relation}/indices'] = adjacency.indices
+    return arrays
+
+
+def _align(offset: int) -> int:
+    return -offset % ALIGNMENT
+
+
+def save_snapshot(store: CompactGraph, path: str, source_key: str = "") -> None:
+    """
+    Записывает снимок графа. Файл заменяется атомарно, так что параллельно
+    запущенный процесс видит либо старый, либо новый снимок целиком.
+    """
+    arrays = {name: np.ascontiguousarray(values) for name, values in _arrays(store).items()}
+
+    layout = {}
+    offset = 0
+    for name, values in arrays.items():
+        layout[name] = {'dtype': values.dtype.str, 'shape': list(values.shape), 'offset': offset}
+        offset += values.nbytes + _align(values.nbytes)
+
+    header = json.dumps({
+        'source_key': source_key,
+        'node_count': len(store.names),
+        'string_count': len(store.strings),
+        'data_size': offset,
+        'arrays': layout,
+    }, ensure_ascii=False).encode('utf-8')
+
+    blocks = [header, bytes(_align(_PREAMBLE.size + len(header)))]
+    for values in arrays.values():
+        blocks.append(values.tobytes())
+        blocks.append(bytes(_align(values.nbytes)))
+    crc = 0
+    for block in blocks:
+        crc = zlib.crc32(block, crc)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, SNAPSHOT_VERSION, len(header), crc))
+        for block in blocks:
+            f.write(block)
+    os.replace(tmp_path, path)
+
+
+# ========================================
+# ЧТЕНИЕ
+# ========================================
+
+def read_header(path: str) -> Tuple[dict, int, int]:
+    """
+    Читает заголовок снимка.
+
+    Returns:
+        (заголовок, смещение области массивов, CRC32 из преамбулы)
+
+    Raises:
+        ValueError: Если файл не является снимком или версия не поддерживается
+    """
+    with open(path, 'rb') as f:
+        preamble = f.read(_PREAMBLE.size)
+        if len(preamble) < _PREAMBLE.size:
+            raise ValueError(f"Snapshot is truncated: {path}")
+        magic, version, header_size, crc = _PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise ValueError(f"Not a graph snapshot: {path}")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}, expected {SNAPSHOT_VERSION}")
+        raw = f.read(header_size)
+    try:
+        header = json.loads(raw.decode('utf-8'))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Corrupted snapshot header: {e}")
+    _check_header(header)
+    prefix = _PREAMBLE.size + header_size
+    return header, prefix + _align(prefix), crc
+
+
+def _check_header(header) -> None:
+    """Проверяет структуру заголовка (ValueError, если поля отсутствуют)."""
+    if not isinstance(header, dict):
+        raise ValueError("Corrupted snapshot header: not an object")
+    missing = [key for key in HEADER_KEYS if key not in header]
+    if missing:
+        raise ValueError(f"Corrupted snapshot header: missing {', '.join(missing)}")
+    arrays = header['arrays']
+    if not isinstance(arrays, dict):
+        raise ValueError("Corrupted snapshot header: arrays is not an object")
+    missing = [name for name in REQUIRED_ARRAYS if name not in arrays]
+    if missing:
+        raise ValueError(f"Corrupted snapshot header: missing arrays {', '.join(missing)}")
+    for name, spec in arrays.items():
+        if not isinstance(spec, dict) or any(key not in spec for key in ARRAY_KEYS):
+            raise ValueError(f"Corrupted snapshot header: bad description of array {name}")
+
+
+def _check_arrays(
+    node_count: int,
+    kind: np.ndarray,
+    columns: Dict[str, np.ndarray],
+    adjacency_parts: Dict[str, Dict[str, np.ndarray]]
+) -> None:
+    """
+    Проверяет согласованность массивов с числом узлов (ValueError при
+    нарушении): столбцы - по значению на узел, у каждой связи есть indptr
+    длиной node_count + 1 и indices с номерами существующих узлов.
+    """
+    for name, values in [('kind', kind)] + [(f'columns/{c}', v) for c, v in columns.items()]:
+        if values.shape != (node_count,):
+            raise ValueError(f"Snapshot array {name} has shape {values.shape}, expected ({node_count},)")
+    for relation, parts in adjacency_parts.items():
+        missing = [part for part in ('indptr', 'indices') if part not in parts]
+        if missing:
+            raise ValueError(f"Snapshot adjacency {relation} is missing {', '.join(missing)}")
+        indptr, indices = parts['indptr'], parts['indices']
+        if indptr.dtype.kind not in 'iu' or indices.dtype.kind not in 'iu':
+            raise ValueError(f"Snapshot adjacency {relation} is not integer")
+        if indptr.shape != (node_count + 1,) or indices.ndim != 1:
+            raise ValueError(f"Snapshot adjacency {relation} does not match node count {node_count}")
+        if indptr[0] != 0 or indptr[-1] != len(indices) or np.any(np.diff(indptr) < 0):
+            raise ValueError(f"Snapshot adjacency {relation} has inconsistent indptr")
+        if len(indices) and (indices.min() < 0 or indices.max() >= node_count):
+            raise ValueError(f"Snapshot adjacency {relation} refers to missing nodes")
+
+
+def _unpack_strings(blob: np.ndarray, count: int) -> list:
+    if count == 0:
+        return []
+    return blob.tobytes().decode('utf-8').split(STRING_SEPARATOR)
+
+
+def load_snapshot(path: str, source_key: Optional[str] = None, verify: bool = True) -> CompactGraph:
+    """
+    Загружает снимок. Массивы отображаются в память только для чтения;
+    их размеры и ссылки на узлы проверяются и без verify.
+
+    Args:
+        path: Путь к файлу снимка
+        source_key: Ожидаемый ключ исходных данных (None - не проверять)
+        verify: Проверять контрольную сумму области массивов
+
+    Raises:
+        FileNotFoundError: Если файла нет
+        ValueError: Если снимок поврежден, другой версии или устарел
+    """
+    header, data_offset, crc = read_header(path)
+    if source_key is not None and header['source_key'] != source_key:
+        raise ValueError("Snapshot is stale: source key does not match")
+
+    data = np.memmap(path, dtype=np.uint8, mode='r')
+    if len(data) != data_offset + header['data_size']:
+        raise ValueError(f"Snapshot size mismatch: {path}")
+    if verify and zlib.crc32(data[_PREAMBLE.size:]) != crc:
+        raise ValueError(f"Snapshot checksum mismatch: {path}")
+
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        try:
+            dtype = np.dtype(spec['dtype'])
+            start = data_offset + spec['offset']
+            size = int(np.prod(spec['shape'])) * dtype.itemsize
+            arrays[name] = data[start:start + size].view(dtype).reshape(spec['shape'])
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Snapshot array {name} is corrupted: {e}")
+
+    names = _unpack_strings(arrays.pop('names'), header['node_count'])
+    strings = _unpack_strings(arrays.pop('strings'), header['string_count'])
+    if len(names) != header['node_count'] or len(strings) != header['string_count']:
+        raise ValueError(f"Snapshot string tables are corrupted: {path}")
+
+    columns = {}
+    adjacency_parts: Dict[str, Dict[str, np.ndarray]] = {}
+    for name, values in arrays.items():
+        section, _, rest = name.partition('/')
+        if section == 'columns':
+            columns[rest] = values
+        elif section == 'adjacency':
+            relation, _, part = rest.rpartition('/')
+            adjacency_parts.setdefault(relation, {})[part] = values
+    _check_arrays(header['node_count'], arrays['kind'], columns, adjacency_parts)
+
+    adjacency = {
+        relation: Adjacency(parts['indptr'], parts['indices'])
+        for relation, parts in adjacency_parts.items()
+    }
+    return CompactGraph(names, arrays['kind'], strings, columns, adjacency)
+
+
+def load_or_build(
+    path: str,
+    source_key: str,
+    build: Callable[[], CompactGraph],
+    verify: bool = True
+) -> CompactGraph:
+    """
+    Загружает снимок, а если его нет, он поврежден или устарел -
+    строит граф через build() и перезаписывает снимок. Если снимок не
+    удалось записать (нет прав, строки с символом \\0), граф возвращается
+    без снимка.
+    """
+    try:
+        return load_snapshot(path, source_key, verify=verify)
+    except (OSError, ValueError):
+        pass
+
+    store = build()
+    try:
+        save_snapshot(store, path, source_key)
+    except (OSError, ValueError):
+        # Нет прав на запись или данные не помещаются в формат - работаем без снимка
+        pass
+    return store
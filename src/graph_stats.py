@@ -0,0 +1,176 @@
+"""
+Graph Stats - Статистика графа документооборота на счетчиках.
+
+GraphStats считается один раз при построении графа, а затем обновляется
+функциями инкрементальных обновлений knowledge_graph при каждой вставке
+и удалении узла или ребра. Чтение статистики не обходит граф.
+
+Кроме размеров графа, хранятся операционные показатели:
+- документы по статусам;
+- документы на согласовании (pending) по отделам-авторам;
+- среднее число недостающих подписей у документов на согласовании
+  (длина цепочки согласования минус уже подписавшие).
+"""
+
+from typing import Dict, NamedTuple, Optional
+
+import networkx as nx
+
+from graph_index import DocumentFlowIndex, get_flow_index, CREATED_IN
+
+
+# ========================================
+# КОНСТАНТЫ
+# ========================================
+
+# Ключ, под которым статистика лежит в graph.graph
+STATS_KEY = "stats"
+
+PENDING = "pending"
+
+
+class DocumentFacts(NamedTuple):
+    """Свойства документа, от которых зависят операционные показатели."""
+    status: Optional[str]
+    department: Optional[str]
+    outstanding: int
+
+
+def _increment(counter: Dict, key, delta: int) -> None:
+    value = counter.get(key, 0) + delta
+    if value:
+        counter[key] = value
+    else:
+        counter.pop(key, None)
+
+
+# ========================================
+# СТАТИСТИКА
+# ========================================
+
+class GraphStats:
+    """
+    Счетчики графа.
+
+    Атрибуты:
+        node_types: Тип узла -> количество
+        edge_relations: Тип связи -> количество ребер
+        degree_sum: Сумма степеней узлов (каждое ребро дает 2)
+        documents_by_status: Статус -> количество документов
+        pending_by_department: Отдел -> документы на согласовании
+        outstanding_signatures: Сумма недостающих подписей документов на согласовании
+    """
+
+    def __init__(self):
+        self.node_types: Dict[str, int] = {}
+        self.edge_relations: Dict[str, int] = {}
+        self.degree_sum = 0
+        self.documents_by_status: Dict[str, int] = {}
+        self.pending_by_department: Dict[str, int] = {}
+        self.outstanding_signatures = 0
+        self.fingerprint = 0
+
+    @classmethod
+    def from_graph(cls, graph: nx.DiGraph, index: Optional[DocumentFlowIndex] = None) -> "GraphStats":
+        """Считает все счетчики за один проход по узлам и ребрам."""
+        index = index or get_flow_index(graph)
+        stats = cls()
+        for node, node_type in graph.nodes(data='type'):
+            stats.add_node(node_type or 'unknown')
+            if node_type == 'document':
+                stats.add_document(document_facts(graph, index, node))
+        for _, _, relation in graph.edges(data='relation'):
+            stats.add_edge(relation)
+        stats.fingerprint = graph.number_of_nodes()
+        return stats
+
+    # --- ОБНОВЛЕНИЕ ---
+
+    def add_node(self, node_type: str) -> None:
+        _increment(self.node_types, node_type, 1)
+
+    def remove_node(self, node_type: str) -> None:
+        _increment(self.node_types, node_type, -1)
+
+    def add_edge(self, relation: Optional[str]) -> None:
+        _increment(self.edge_relations, relation, 1)
+        self.degree_sum += 2
+
+    def remove_edge(self, relation: Optional[str]) -> None:
+        _increment(self.edge_relations, relation, -1)
+        self.degree_sum -= 2
+
+    def add_document(self, facts: DocumentFacts) -> None:
+        self._count_document(facts, 1)
+
+    def remove_document(self, facts: DocumentFacts) -> None:
+        self._count_document(facts, -1)
+
+    def replace_document(self, before: DocumentFacts, after: DocumentFacts) -> None:
+        """Учитывает изменение документа (статус, подписи)."""
+        if before != after:
+            self.remove_document(before)
+            self.add_document(after)
+
+    def _count_document(self, facts: DocumentFacts, delta: int) -> None:
+        _increment(self.documents_by_status, facts.status, delta)
+        if facts.status == PENDING:
+            _increment(self.pending_by_department, facts.department, delta)
+            self.outstanding_signatures += delta * facts.outstanding
+
+    def sync(self, graph: nx.DiGraph) -> None:
+        """Фиксирует размер графа после обновления через API knowledge_graph."""
+        self.fingerprint = graph.number_of_nodes()
+
+    # --- ЧТЕНИЕ ---
+
+    @property
+    def node_count(self) -> int:
+        return sum(self.node_types.values())
+
+    @property
+    def edge_count(self) -> int:
+        return self.degree_sum // 2
+
+    @property
+    def average_degree(self) -> float:
+        node_count = self.node_count
+        return self.degree_sum / node_count if node_count > 0 else 0
+
+    @property
+    def average_outstanding_signatures(self) -> float:
+        pending = self.documents_by_status.get(PENDING, 0)
+        return self.outstanding_signatures / pending if pending else 0.0
+
+
+def document_facts(graph: nx.DiGraph, index: DocumentFlowIndex, document_number: str) -> DocumentFacts:
+    """Статус, отдел-автор и число недостающих подписей документа."""
+    department = next(
+        (t for t, edge in graph.adj[document_number].items() if edge.get('relation') == CREATED_IN),
+        None
+    )
+    chain = index.approval_chain_for(document_number)
+    signed = index.signed_by.get(document_number, ())
+    return DocumentFacts(
+        graph.nodes[document_number].get('status'),
+        department,
+        max(0, len(chain) - len(signed))
+    )
+
+
+def get_graph_stats(graph: nx.DiGraph) -> GraphStats:
+    """
+    Статистика графа. Как и get_flow_index, пересчитывается, если граф
+    изменили в обход API knowledge_graph (изменилось число узлов).
+    """
+    stats: Optional[GraphStats] = graph.graph.get(STATS_KEY)
+    if stats is None or stats.fingerprint != graph.number_of_nodes():
+        stats = rebuild_graph_stats(graph)
+    return stats
+
+
+def rebuild_graph_stats(graph: nx.DiGraph) -> GraphStats:
+    """Пересчитывает статистику графа заново."""
+    stats = GraphStats.from_graph(graph)
+    graph.graph[STATS_KEY] = stats
+    return stats
@@ -0,0 +1,572 @@
+"""
+Graph Store - Компактное хранилище графа документооборота.
+
+Альтернатива nx.DiGraph для больших графов (год документов и больше):
+
+- узлы пронумерованы целыми числами, имена лежат в одном списке names;
+- атрибуты узлов хранятся по столбцам (numpy-массивы), строковые значения -
+  индексами в общей таблице строк;
+- смежность для каждого типа связи - CSR-массивы indptr/indices, обратная
+  смежность строится по требованию.
+
+CompactGraph отвечает на те же запросы, что и knowledge_graph.py, а
+to_networkx выгружает граф в nx.DiGraph. С объектами моделей (node_objects)
+выгрузка совпадает с create_document_flow_graph: так main_lab3 загружает
+граф из снимка (graph_snapshot), а запросы выполняет к nx-графу с его
+индексами, счетчиками и кэшем запросов.
+
+    store = CompactGraph.from_objects(departments, employees, documents, doc_types)
+    store.find_who_can_sign("INV-2024-001")
+    G = store.to_networkx(node_objects(departments, employees, documents, doc_types))
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+
+from models import Department, Employee, Document, DocumentType
+from graph_stats import DocumentFacts, GraphStats, STATS_KEY
+from graph_index import (
+    DocumentFlowIndex,
+    INDEX_KEY,
+    type_node_name,
+    RELATIONS,
+    WORKS_IN,
+    CREATED_IN,
+    SIGNED_BY,
+    IS_TYPE,
+    APPROVAL_REQUIRED,
+    CAN_SIGN,
+    MANAGED_BY
+)
+
+
+# ========================================
+# КОНСТАНТЫ
+# ========================================
+
+# Типы узлов; код типа - позиция в кортеже
+NODE_KINDS = ('department', 'employee', 'document', 'document_type')
+DEPARTMENT, EMPLOYEE, DOCUMENT, DOCUMENT_TYPE = range(len(NODE_KINDS))
+
+# Атрибуты узлов (имена совпадают с атрибутами узлов nx-графа)
+STRING_COLUMNS = ('head', 'position', 'doc_type', 'status', 'description')
+INT_COLUMNS = ('level', 'required_sigs')
+FLOAT_COLUMNS = ('amount', 'max_amount')
+BOOL_COLUMNS = ('can_sign',)
+
+# Атрибуты, которые выгружаются в nx.DiGraph для каждого типа узла
+NODE_ATTRIBUTES = {
+    DEPARTMENT: ('head', 'level'),
+    EMPLOYEE: ('position', 'can_sign', 'max_amount'),
+    DOCUMENT: ('doc_type', 'status', 'amount'),
+    DOCUMENT_TYPE: ('description', 'required_sigs'),
+}
+
+# Значение "нет строки" в строковых столбцах
+NO_STRING = -1
+
+
+# ========================================
+# CSR-СМЕЖНОСТЬ
+# ========================================
+
+@dataclass
+class Adjacency:
+    """
+    Смежность одного типа связи в формате CSR.
+
+    Соседи узла i - indices[indptr[i]:indptr[i + 1]] в порядке добавления ребер.
+    """
+    indptr: np.ndarray
+    indices: np.ndarray
+
+    @classmethod
+    def from_pairs(cls, node_count: int, sources: np.ndarray, targets: np.ndarray) -> "Adjacency":
+        order = np.argsort(sources, kind='stable')
+        counts = np.bincount(sources, minlength=node_count)
+        indptr = np.zeros(node_count + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        return cls(indptr, targets[order].astype(np.int32))
+
+    def row(self, node: int) -> np.ndarray:
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def transpose(self) -> "Adjacency":
+        """Обратная смежность (входящие ребра)."""
+        node_count = len(self.indptr) - 1
+        sources = np.repeat(np.arange(node_count, dtype=np.int32), np.diff(self.indptr))
+        return Adjacency.from_pairs(node_count, self.indices, sources)
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+
+# ========================================
+# СБОРКА
+# ========================================
+
+class _Builder:
+    """Накапливает узлы и ребра в списках, затем упаковывает их в массивы."""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.kinds: List[int] = []
+        self.attributes: List[dict] = []
+        # (источник, приемник) -> связь; как и в nx.DiGraph, между парой
+        # узлов одно ребро, повторное добавление меняет только связь
+        self.edges: Dict[Tuple[int, int], str] = {}
+
+    def add_node(self, name: str, kind: int, **attributes) -> None:
+        node = self.ids.get(name)
+        if node is None:
+            self.ids[name] = len(self.names)
+            self.names.append(name)
+            self.kinds.append(kind)
+            self.attributes.append(attributes)
+        else:
+            self.kinds[node] = kind
+            self.attributes[node].update(attributes)
+
+    def add_edge(self, source: str, target: str, relation: str) -> None:
+        self.edges[(self.ids[source], self.ids[target])] = relation
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.ids
+
+    def build(self) -> "CompactGraph":
+        node_count = len(self.names)
+        strings: List[str] = []
+        string_ids: Dict[str, int] = {}
+
+        def intern(value) -> int:
+            if value is None:
+                return NO_STRING
+            value = str(value)
+            if value not in string_ids:
+                string_ids[value] = len(strings)
+                strings.append(value)
+            return string_ids[value]
+
+        columns = {}
+        for column in STRING_COLUMNS:
+            columns[column] = np.array(
+                [intern(attrs.get(column)) for attrs in self.attributes], dtype=np.int32
+            )
+        for column in INT_COLUMNS:
+            columns[column] = np.array(
+                [attrs.get(column, 0) for attrs in self.attributes], dtype=np.int32
+            )
+        for column in FLOAT_COLUMNS:
+            columns[column] = np.array(
+                [attrs.get(column, np.nan) for attrs in self.attributes], dtype=np.float64
+            )
+        for column in BOOL_COLUMNS:
+            columns[column] = np.array(
+                [bool(attrs.get(column, False)) for attrs in self.attributes], dtype=bool
+            )
+
+        by_relation: Dict[str, Tuple[List[int], List[int]]] = {r: ([], []) for r in RELATIONS}
+        for (source, target), relation in self.edges.items():
+            sources, targets = by_relation.setdefault(relation, ([], []))
+            sources.append(source)
+            targets.append(target)
+
+        adjacency = {
+            relation: Adjacency.from_pairs(
+                node_count,
+                np.array(sources, dtype=np.int32),
+                np.array(targets, dtype=np.int32)
+            )
+            for relation, (sources, targets) in by_relation.items()
+        }
+
+        return CompactGraph(
+            self.names,
+            np.array(self.kinds, dtype=np.int8),
+            strings,
+            columns,
+            adjacency
+        )
+
+
+# ========================================
+# ХРАНИЛИЩЕ
+# ========================================
+
+class CompactGraph:
+    """
+    Граф документооборота на массивах.
+
+    Атрибуты:
+        names: Имена узлов (номер узла - позиция в списке)
+        ids: Имя узла -> номер
+        kind: Тип узла (код из NODE_KINDS) для каждого узла
+        strings: Таблица строковых значений атрибутов
+        columns: Имя атрибута -> массив значений по узлам
+        adjacency: Тип связи -> исходящая CSR-смежность
+    """
+
+    def __init__(
+        self,
+        names: List[str],
+        kind: np.ndarray,
+        strings: List[str],
+        columns: Dict[str, np.ndarray],
+        adjacency: Dict[str, Adjacency]
+    ):
+        self.names = names
+        self.ids = {name: node for node, name in enumerate(names)}
+        self.kind = kind
+        self.strings = strings
+        self.columns = columns
+        self.adjacency = adjacency
+        self._incoming: Dict[str, Adjacency] = {}
+
+    # --- ПОСТРОЕНИЕ ---
+
+    @classmethod
+    def from_objects(
+        cls,
+        departments: List[Department],
+        employees: List[Employee],
+        documents: List[Document],
+        doc_types: List[DocumentType]
+    ) -> "CompactGraph":
+        """
+        Строит хранилище по тем же правилам, что и create_document_flow_graph,
+        не создавая промежуточный nx.DiGraph.
+        """
+        builder = _Builder()
+
+        for dept in departments:
+            builder.add_node(dept.name, DEPARTMENT, head=dept.head_name, level=dept.level)
+        for emp in employees:
+            builder.add_node(
+                emp.name, EMPLOYEE,
+                position=emp.position, can_sign=emp.can_sign, max_amount=emp.max_sign_amount
+            )
+        for doc in documents:
+            builder.add_node(
+                doc.document_number, DOCUMENT,
+                doc_type=doc.document_type, status=doc.current_status, amount=doc.total_amount
+            )
+        for dt in doc_types:
+            builder.add_node(
+                type_node_name(dt.name), DOCUMENT_TYPE,
+                description=dt.description, required_sigs=dt.required_signatures
+            )
+
+        for emp in employees:
+            if emp.department in builder:
+                builder.add_edge(emp.name, emp.department, WORKS_IN)
+        for doc in documents:
+            if doc.department in builder:
+                builder.add_edge(doc.document_number, doc.department, CREATED_IN)
+        for doc in documents:
+            for signer in doc.signed_by:
+                if signer in builder:
+                    builder.add_edge(doc.document_number, signer, SIGNED_BY)
+        for doc in documents:
+            type_node = type_node_name(doc.document_type)
+            if type_node in builder:
+                builder.add_edge(doc.document_number, type_node, IS_TYPE)
+        for dt in doc_types:
+            for dept_name in dt.approval_chain:
+                if dept_name in builder:
+                    builder.add_edge(type_node_name(dt.name), dept_name, APPROVAL_REQUIRED)
+        for dept in departments:
+            for doc_type in dept.can_sign_types:
+                type_node = type_node_name(doc_type)
+                if type_node in builder:
+                    builder.add_edge(dept.name, type_node, CAN_SIGN)
+        for dept in departments:
+            if dept.head_name in builder:
+                builder.add_edge(dept.name, dept.head_name, MANAGED_BY)
+
+        return builder.build()
+
+    @classmethod
+    def from_networkx(cls, graph: nx.DiGraph) -> "CompactGraph":
+        """Упаковывает граф, построенный create_document_flow_graph."""
+        builder = _Builder()
+        codes = {kind: code for code, kind in enumerate(NODE_KINDS)}
+        for node, data in graph.nodes(data=True):
+            code = codes[data['type']]
+            builder.add_node(
+                node, code,
+                **{column: data[column] for column in NODE_ATTRIBUTES[code] if column in data}
+            )
+        for source, target, relation in graph.edges(data='relation'):
+            builder.add_edge(source, target, relation)
+        return builder.build()
+
+    def to_networkx(self, objects: Optional[Dict[str, object]] = None) -> nx.DiGraph:
+        """
+        Выгружает граф в nx.DiGraph с атрибутами type и relation.
+
+        Args:
+            objects: Объекты моделей по именам узлов (node_objects) - узлы
+                получают их в атрибуте data, а граф - индекс и счетчики
+                статистики, как в create_document_flow_graph (они считаются
+                по CSR-массивам, без обхода nx-графа). Без них узлы получают
+                только скалярные атрибуты (для визуализации)
+        """
+        objects = objects or {}
+        names = self.names
+        # Столбцы переводятся в списки Python один раз, а не по значению на узел
+        values = {column: self._column_values(column) for column in self.columns}
+
+        def attributes(node: int, code: int) -> dict:
+            data = {'type': NODE_KINDS[code]}
+            for column in NODE_ATTRIBUTES[code]:
+                data[column] = values[column][node]
+            if names[node] in objects:
+                data['data'] = objects[names[node]]
+            return data
+
+        G = nx.DiGraph()
+        G.add_nodes_from(
+            (name, attributes(node, code)) for node, (name, code) in enumerate(zip(names, self.kind.tolist()))
+        )
+        for relation, adjacency in self.adjacency.items():
+            sources = np.repeat(np.arange(len(names)), np.diff(adjacency.indptr)).tolist()
+            G.add_edges_from(
+                ((names[source], names[target]) for source, target in zip(sources, adjacency.indices.tolist())),
+                relation=relation
+            )
+        if objects:
+            index = self._flow_index(objects)
+            G.graph[INDEX_KEY] = index
+            G.graph[STATS_KEY] = self._graph_stats(index)
+        return G
+
+    def _rows(self, relation: str, kind: Optional[int] = None) -> Dict[int, List[int]]:
+        """
+        Узел -> соседи по связи relation в порядке ребер (только типа kind,
+        если он задан). Узлы без таких соседей в словарь не попадают.
+        """
+        adjacency = self.adjacency[relation]
+        sources = np.repeat(np.arange(len(self.names)), np.diff(adjacency.indptr))
+        targets = adjacency.indices
+        if kind is not None:
+            matching = self.kind[targets] == kind
+            sources, targets = sources[matching], targets[matching]
+        rows: Dict[int, List[int]] = {}
+        for source, target in zip(sources.tolist(), targets.tolist()):
+            rows.setdefault(source, []).append(target)
+        return rows
+
+    def _flow_index(self, objects: Dict[str, object]) -> DocumentFlowIndex:
+        """DocumentFlowIndex, равный DocumentFlowIndex.from_graph(self.to_networkx(objects))."""
+        names = self.names
+        index = DocumentFlowIndex()
+        for node in np.flatnonzero(self.kind == DOCUMENT).tolist():
+            document = objects.get(names[node])
+            if document:
+                index.doc_amount[names[node]] = document.total_amount
+        for source, targets in self._rows(IS_TYPE, DOCUMENT_TYPE).items():
+            index.doc_type[names[source]] = names[targets[0]]
+        for source, targets in self._rows(APPROVAL_REQUIRED, DEPARTMENT).items():
+            index.approval_chain[names[source]] = self._labels(targets)
+        for source, targets in self._rows(SIGNED_BY, EMPLOYEE).items():
+            index.signed_by[names[source]] = self._labels(targets)
+        for source, targets in self._rows(WORKS_IN).items():
+            if self.kind[source] == EMPLOYEE:
+                for target in targets:
+                    index.add_employee(names[source], names[target], objects.get(names[source]))
+        index.fingerprint = len(names)
+        return index
+
+    def _graph_stats(self, index: DocumentFlowIndex) -> GraphStats:
+        """GraphStats, равная GraphStats.from_graph(self.to_networkx(objects), index)."""
+        names = self.names
+        stats = GraphStats()
+        # Типы узлов - в порядке первого появления, как при обходе графа
+        codes, first = np.unique(self.kind, return_index=True)
+        counts = np.bincount(self.kind, minlength=len(NODE_KINDS))
+        for code in codes[np.argsort(first)].tolist():
+            stats.node_types[NODE_KINDS[code]] = int(counts[code])
+        for relation, adjacency in self.adjacency.items():
+            if len(adjacency):
+                stats.edge_relations[relation] = len(adjacency)
+        stats.degree_sum = 2 * self.number_of_edges()
+
+        departments = self._rows(CREATED_IN)
+        statuses = self._column_values('status')
+        for node in np.flatnonzero(self.kind == DOCUMENT).tolist():
+            name = names[node]
+            department = departments.get(node)
+            outstanding = len(index.approval_chain_for(name)) - len(index.signed_by.get(name, ()))
+            stats.add_document(DocumentFacts(
+                statuses[node],
+                names[department[0]] if department else None,
+                max(0, outstanding)
+            ))
+        stats.fingerprint = len(names)
+        return stats
+
+
+    # --- ДОСТУП К ДАННЫМ ---
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.ids
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def number_of_edges(self) -> int:
+        return sum(len(adjacency) for adjacency in self.adjacency.values())
+
+    def attribute(self, node: int, column: str):
+        """Значение атрибута узла в виде обычного Python-объекта."""
+        value = self.columns[column][node]
+        if column in STRING_COLUMNS:
+            return None if value == NO_STRING else self.strings[value]
+        return value.item()
+
+    def _column_values(self, column: str) -> list:
+        """Столбец целиком в виде списка Python-объектов (как attribute)."""
+        values = self.columns[column].tolist()
+        if column in STRING_COLUMNS:
+            strings = self.strings
+            return [None if value == NO_STRING else strings[value] for value in values]
+        return values
+
+    def incoming(self, relation: str) -> Adjacency:
+        """Обратная смежность связи (строится при первом обращении)."""
+        adjacency = self._incoming.get(relation)
+        if adjacency is None:
+            adjacency = self._incoming[relation] = self.adjacency[relation].transpose()
+        return adjacency
+
+    def _neighbors(self, adjacency: Adjacency, node: int, kind: int) -> np.ndarray:
+        row = adjacency.row(node)
+        return row[self.kind[row] == kind]
+
+    def _labels(self, nodes: Iterable[int]) -> List[str]:
+        names = self.names
+        return [names[node] for node in nodes]
+
+    # ========================================
+    # ЗАПРОСЫ (те же, что в knowledge_graph.py)
+    # ========================================
+
+    def find_related_entities(self, start_node: str) -> List[str]:
+        """Все узлы, связанные с start_node входящими или исходящими ребрами."""
+        node = self.ids.get(start_node)
+        if node is None:
+            return []
+        related = set()
+        for relation, adjacency in self.adjacency.items():
+            related.update(adjacency.row(node).tolist())
+            related.update(self.incoming(relation).row(node).tolist())
+        return self._labels(related)
+
+    def _approval_chain(self, node: int) -> np.ndarray:
+        types = self._neighbors(self.adjacency[IS_TYPE], node, DOCUMENT_TYPE)
+        if not len(types):
+            return types
+        return self._neighbors(self.adjacency[APPROVAL_REQUIRED], types[0], DEPARTMENT)
+
+    def _who_can_sign(self, node: int, chain: np.ndarray) -> List[str]:
+        amount = self.columns['amount'][node]
+        if np.isnan(amount) or not len(chain):
+            return []
+        works_in = self.incoming(WORKS_IN)
+        candidates = np.concatenate([self._neighbors(works_in, dept, EMPLOYEE) for dept in chain])
+        limits = self.columns['max_amount'][candidates]
+        eligible = self.columns['can_sign'][candidates] & ((limits == 0) | (amount <= limits))
+        return list(dict.fromkeys(self._labels(candidates[eligible])))
+
+    def find_approval_chain(self, document_number: str) -> List[str]:
+        """Отделы, через которые должен пройти документ."""
+        node = self.ids.get(document_number)
+        if node is None:
+            return []
+        return self._labels(self._approval_chain(node))
+
+    def find_who_can_sign(self, document_number: str) -> List[str]:
+        """Сотрудники цепочки согласования, которые могут подписать документ."""
+        node = self.ids.get(document_number)
+        if node is None:
+            return []
+        return self._who_can_sign(node, self._approval_chain(node))
+
+    def find_documents_by_department(self, department_name: str) -> List[str]:
+        """Документы, созданные в отделе."""
+        node = self.ids.get(department_name)
+        if node is None:
+            return []
+        return self._labels(self._neighbors(self.incoming(CREATED_IN), node, DOCUMENT))
+
+    def find_employees_in_department(self, department_name: str) -> List[str]:
+        """Сотрудники отдела."""
+        node = self.ids.get(department_name)
+        if node is None:
+            return []
+        return self._labels(self._neighbors(self.incoming(WORKS_IN), node, EMPLOYEE))
+
+    def find_signature_route(self, document_number: str) -> Dict:
+        """Маршрут подписания документа в формате knowledge_graph.find_signature_route."""
+        node = self.ids.get(document_number)
+        if node is None:
+            return {}
+
+        chain = self._approval_chain(node)
+        signed_by = self._labels(self._neighbors(self.adjacency[SIGNED_BY], node, EMPLOYEE))
+        can_sign = self._who_can_sign(node, chain)
+        signed = set(signed_by)
+
+        return {
+            'document': document_number,
+            'approval_chain': self._labels(chain),
+            'already_signed': signed_by,
+            'can_sign': can_sign,
+            'next_step': [s for s in can_sign if s not in signed],
+            'is_complete': len(signed_by) >= len(chain)
+        }
+
+    def compute_signature_routes(self, document_numbers: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+        """Маршруты подписания для набора документов (None - все документы)."""
+        if document_numbers is None:
+            document_numbers = self._labels(np.flatnonzero(self.kind == DOCUMENT))
+        return {
+            number: self.find_signature_route(number)
+            for number in document_numbers
+            if number in self.ids
+        }
+
+    def get_graph_statistics(self) -> Dict:
+        """Статистика графа в формате knowledge_graph.get_graph_statistics."""
+        node_count = len(self.names)
+        counts = np.bincount(self.kind, minlength=len(NODE_KINDS))
+        edge_count = self.number_of_edges()
+        return {
+            'total_nodes': node_count,
+            'total_edges': edge_count,
+            'node_types': {NODE_KINDS[code]: int(count) for code, count in enumerate(counts) if count},
+            'average_degree': 2 * edge_count / node_count if node_count > 0 else 0
+        }
+
+
+# ========================================
+# ОБЪЕКТЫ МОДЕЛЕЙ
+# ========================================
+
+def node_objects(
+    departments: List[Department],
+    employees: List[Employee],
+    documents: List[Document],
+    doc_types: List[DocumentType]
+) -> Dict[str, object]:
+    """Объекты моделей по именам узлов графа (атрибут data для to_networkx)."""
+    objects: Dict[str, object] = {}
+    objects.update((dept.name, dept) for dept in departments)
+    objects.update((emp.name, emp) for emp in employees)
+    objects.update((doc.document_number, doc) for doc in documents)
+    objects.update((type_node_name(dt.name), dt) for dt in doc_types)
+    return objects
@@ -13,11 +13,100 @@ Knowledge Graph - Граф знаний системы документообо
 - Документ --(создан в)--> Отдел
 - Отдел --(может подписать)--> Тип документа
 - Документ --(должен пройти через)--> Отдел
+
+Для запросов по цепочкам согласования рядом с графом строится
+DocumentFlowIndex (см. graph_index.py).
+
+Готовый граф меняется инкрементально (add_document, add_signature,
+update_status, remove_document, move_employee): обновляются только затронутые
+узлы, ребра и записи индекса, а подписчики (subscribe) получают GraphChange
+со списком узлов, чьи связи изменились.
+
+QueryCache (get_query_cache) запоминает результаты поисковых функций и по
+этим событиям сбрасывает только записи, зависящие от затронутых узлов.
 """
 
+import copy
+import threading
 import networkx as nx
-from typing import List, Dict, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, FrozenSet, Iterable, List, Dict, Optional, Set, Tuple
 from models import Department, Employee, Document, DocumentType
+from graph_stats import get_graph_stats, document_facts, GraphStats, STATS_KEY
+from graph_index import (
+    DocumentFlowIndex,
+    get_flow_index,
+    type_node_name,
+    INDEX_KEY,
+    WORKS_IN,
+    CREATED_IN,
+    SIGNED_BY,
+    IS_TYPE
+)
+
+
+# ========================================
+# СОБЫТИЯ ИЗМЕНЕНИЯ ГРАФА
+# ========================================
+
+# Ключ списка подписчиков в graph.graph
+LISTENERS_KEY = "listeners"
+
+# Ключ счетчика изменений (версии) графа в graph.graph
+VERSION_KEY = "version"
+
+# Виды изменений
+DOCUMENT_ADDED = "document_added"
+DOCUMENT_REMOVED = "document_removed"
+SIGNATURE_ADDED = "signature_added"
+STATUS_UPDATED = "status_updated"
+EMPLOYEE_MOVED = "employee_moved"
+
+
+@dataclass(frozen=True)
+class GraphChange:
+    """
+    Изменение графа, о котором уведомляются подписчики.
+
+    Атрибуты:
+        kind: Вид изменения (DOCUMENT_ADDED, SIGNATURE_ADDED, ...)
+        node: Узел, к которому относится изменение
+        affected: Все узлы, чьи атрибуты или связи изменились (включая node)
+    """
+    kind: str
+    node: str
+    affected: FrozenSet[str]
+
+
+GraphListener = Callable[[GraphChange], None]
+
+
+def subscribe(graph: nx.DiGraph, listener: GraphListener) -> None:
+    """Подписывает listener на изменения графа."""
+    graph.graph.setdefault(LISTENERS_KEY, []).append(listener)
+
+
+def unsubscribe(graph: nx.DiGraph, listener: GraphListener) -> None:
+    listeners = graph.graph.get(LISTENERS_KEY, [])
+    if listener in listeners:
+        listeners.remove(listener)
+
+
+def graph_version(graph: nx.DiGraph) -> int:
+    """
+    Версия графа: увеличивается при каждом изменении через API обновлений.
+    Подходит как часть ключа кэшей, производных от графа.
+    """
+    return graph.graph.get(VERSION_KEY, 0)
+
+
+def _notify(graph: nx.DiGraph, kind: str, node: str, affected) -> GraphChange:
+    graph.graph[VERSION_KEY] = graph_version(graph) + 1
+    change = GraphChange(kind, node, frozenset(affected) | {node})
+    for listener in list(graph.graph.get(LISTENERS_KEY, ())):
+        listener(change)
+    return change
 
 
 # ========================================
@@ -160,9 +249,212 @@ def create_document_flow_graph(
                 relation="managed_by"
             )
     
+    # --- 3. ИНДЕКС ДЛЯ ЗАПРОСОВ ---
+    
+    G.graph[INDEX_KEY] = DocumentFlowIndex.from_graph(G)
+    G.graph[STATS_KEY] = GraphStats.from_graph(G, G.graph[INDEX_KEY])
+    
     return G
 
 
+# ========================================
+# ИНКРЕМЕНТАЛЬНЫЕ ОБНОВЛЕНИЯ
+# ========================================
+
+def add_document(graph: nx.DiGraph, doc: Document) -> GraphChange:
+    """
+    Добавляет документ со связями created_in, signed_by и is_type.
+    
+    Args:
+        graph: Граф
+        doc: Новый документ
+        
+    Returns:
+        GraphChange (DOCUMENT_ADDED)
+        
+    Raises:
+        ValueError: Если документ с таким номером уже есть в графе
+    """
+    number = doc.document_number
+    if number in graph:
+        raise ValueError(f"Документ {number} уже есть в графе")
+    
+    index = get_flow_index(graph)
+    stats = get_graph_stats(graph)
+    graph.add_node(
+        number,
+        type="document",
+        doc_type=doc.document_type,
+        status=doc.current_status,
+        amount=doc.total_amount,
+        data=doc
+    )
+    
+    affected = set()
+    if doc.department in graph:
+        graph.add_edge(number, doc.department, relation=CREATED_IN)
+        affected.add(doc.department)
+    for signer in doc.signed_by:
+        if signer in graph and not graph.has_edge(number, signer):
+            graph.add_edge(number, signer, relation=SIGNED_BY)
+            affected.add(signer)
+            if graph.nodes[signer]['type'] == 'employee':
+                index.add_signature(number, signer)
+    
+    type_node = type_node_name(doc.document_type)
+    if type_node in graph:
+        graph.add_edge(number, type_node, relation=IS_TYPE)
+        affected.add(type_node)
+    else:
+        type_node = None
+    
+    index.add_document(number, type_node, doc.total_amount)
+    index.sync(graph)
+    
+    stats.add_node('document')
+    for _, _, relation in graph.edges(number, data='relation'):
+        stats.add_edge(relation)
+    stats.add_document(document_facts(graph, index, number))
+    stats.sync(graph)
+    return _notify(graph, DOCUMENT_ADDED, number, affected)
+
+
+def add_signature(graph: nx.DiGraph, document_number: str, employee_name: str) -> Optional[GraphChange]:
+    """
+    Добавляет подпись сотрудника под документом.
+    
+    Args:
+        graph: Граф
+        document_number: Номер документа
+        employee_name: ФИО подписавшего
+        
+    Returns:
+        GraphChange (SIGNATURE_ADDED) или None, если подпись уже есть
+        
+    Raises:
+        KeyError: Если документа или сотрудника нет в графе
+    """
+    _require(graph, document_number, 'document')
+    _require(graph, employee_name, 'employee')
+    
+    if graph.has_edge(document_number, employee_name):
+        return None
+    
+    index = get_flow_index(graph)
+    stats = get_graph_stats(graph)
+    before = document_facts(graph, index, document_number)
+    graph.add_edge(document_number, employee_name, relation=SIGNED_BY)
+    index.add_signature(document_number, employee_name)
+    doc = graph.nodes[document_number].get('data')
+    if doc:
+        doc.add_signature(employee_name)
+    
+    index.sync(graph)
+    stats.add_edge(SIGNED_BY)
+    stats.replace_document(before, document_facts(graph, index, document_number))
+    return _notify(graph, SIGNATURE_ADDED, document_number, {employee_name})
+
+
+def update_status(graph: nx.DiGraph, document_number: str, status: str) -> Optional[GraphChange]:
+    """
+    Меняет статус документа (draft, pending, approved, rejected).
+    
+    Returns:
+        GraphChange (STATUS_UPDATED) или None, если статус не изменился
+        
+    Raises:
+        KeyError: Если документа нет в графе
+    """
+    _require(graph, document_number, 'document')
+    
+    node = graph.nodes[document_number]
+    if node.get('status') == status:
+        return None
+    
+    index = get_flow_index(graph)
+    stats = get_graph_stats(graph)
+    before = document_facts(graph, index, document_number)
+    node['status'] = status
+    if node.get('data'):
+        node['data'].current_status = status
+    
+    stats.replace_document(before, document_facts(graph, index, document_number))
+    return _notify(graph, STATUS_UPDATED, document_number, ())
+
+
+def remove_document(graph: nx.DiGraph, document_number: str) -> GraphChange:
+    """
+    Удаляет документ вместе со всеми его связями.
+    
+    Returns:
+        GraphChange (DOCUMENT_REMOVED)
+        
+    Raises:
+        KeyError: Если документа нет в графе
+    """
+    _require(graph, document_number, 'document')
+    
+    index = get_flow_index(graph)
+    stats = get_graph_stats(graph)
+    stats.remove_document(document_facts(graph, index, document_number))
+    stats.remove_node('document')
+    for _, _, relation in graph.in_edges(document_number, data='relation'):
+        stats.remove_edge(relation)
+    for _, _, relation in graph.out_edges(document_number, data='relation'):
+        stats.remove_edge(relation)
+    
+    affected = set(graph.successors(document_number)) | set(graph.predecessors(document_number))
+    graph.remove_node(document_number)
+    
+    index.remove_document(document_number)
+    index.sync(graph)
+    stats.sync(graph)
+    return _notify(graph, DOCUMENT_REMOVED, document_number, affected)
+
+
+def move_employee(graph: nx.DiGraph, employee_name: str, department_name: str) -> Optional[GraphChange]:
+    """
+    Переводит сотрудника в другой отдел (перевешивает связь works_in).
+    
+    Returns:
+        GraphChange (EMPLOYEE_MOVED) или None, если сотрудник уже в этом отделе
+        
+    Raises:
+        KeyError: Если сотрудника или отдела нет в графе
+    """
+    _require(graph, employee_name, 'employee')
+    _require(graph, department_name, 'department')
+    
+    old_departments = [
+        dept for dept, relation in graph.adj[employee_name].items()
+        if relation.get('relation') == WORKS_IN
+    ]
+    if old_departments == [department_name]:
+        return None
+    
+    index = get_flow_index(graph)
+    stats = get_graph_stats(graph)
+    emp = graph.nodes[employee_name].get('data')
+    for dept in old_departments:
+        graph.remove_edge(employee_name, dept)
+        index.remove_employee(employee_name, dept)
+        stats.remove_edge(WORKS_IN)
+    
+    graph.add_edge(employee_name, department_name, relation=WORKS_IN)
+    stats.add_edge(WORKS_IN)
+    if emp:
+        emp.department = department_name
+    index.add_employee(employee_name, department_name, emp)
+    
+    index.sync(graph)
+    return _notify(graph, EMPLOYEE_MOVED, employee_name, set(old_departments) | {department_name})
+
+
+def _require(graph: nx.DiGraph, node: str, node_type: str) -> None:
+    if node not in graph or graph.nodes[node].get('type') != node_type:
+        raise KeyError(f"Узел {node!r} типа {node_type} не найден в графе")
+
+
 # ========================================
 # ПОИСКОВЫЕ ФУНКЦИИ (QUERIES)
 # ========================================
@@ -202,26 +494,8 @@ def find_approval_chain(graph: nx.DiGraph, document_number: str) -> List[str]:
     if document_number not in graph:
         return []
     
-    # Находим тип документа
-    doc_type_node = None
-    for neighbor in graph.successors(document_number):
-        if graph.nodes[neighbor]['type'] == 'document_type':
-            doc_type_node = neighbor
-            break
-    
-    if not doc_type_node:
-        return []
-    
-    # Находим все отделы, через которые должен пройти этот тип документа
-    approval_chain = []
-    for dept in graph.successors(doc_type_node):
-        if graph.nodes[dept]['type'] == 'department':
-            # Проверяем, что это связь "approval_required"
-            edge_data = graph.get_edge_data(doc_type_node, dept)
-            if edge_data and edge_data.get('relation') == 'approval_required':
-                approval_chain.append(dept)
-    
-    return approval_chain
+    # Документ -> тип -> отделы: два обращения к словарям индекса
+    return get_flow_index(graph).approval_chain_for(document_number)
 
 
 def find_who_can_sign(graph: nx.DiGraph, document_number: str) -> List[str]:
@@ -238,27 +512,8 @@ def find_who_can_sign(graph: nx.DiGraph, document_number: str) -> List[str]:
     if document_number not in graph:
         return []
     
-    # Получаем данные документа
-    doc_data = graph.nodes[document_number].get('data')
-    if not doc_data:
-        return []
-    
-    amount = doc_data.total_amount
-    
-    # Находим цепочку согласования
-    approval_depts = find_approval_chain(graph, document_number)
-    
-    # Находим начальников этих отделов, которые могут подписать
-    signers = []
-    for dept_name in approval_depts:
-        # Находим начальника отдела
-        for employee in graph.predecessors(dept_name):
-            if graph.nodes[employee]['type'] == 'employee':
-                emp_data = graph.nodes[employee].get('data')
-                if emp_data and emp_data.can_sign_document(amount):
-                    signers.append(employee)
-    
-    return list(set(signers))
+    # Таблица допуска типа документа: бинарный поиск диапазона по сумме
+    return get_flow_index(graph).who_can_sign(document_number)
 
 
 def find_documents_by_department(graph: nx.DiGraph, department_name: str) -> List[str]:
@@ -322,54 +577,255 @@ def find_signature_route(graph: nx.DiGraph, document_number: str) -> Dict:
     Returns:
         Словарь с информацией о маршруте
     """
-    if document_number not in graph:
-        return {}
-    
-    # Получаем цепочку согласования
-    approval_chain = find_approval_chain(graph, document_number)
+    return compute_signature_routes(graph, [document_number]).get(document_number, {})
+
+
+def compute_signature_routes(
+    graph: nx.DiGraph,
+    document_numbers: Optional[Iterable[str]] = None
+) -> Dict[str, Dict]:
+    """
+    Строит маршруты подписания сразу для набора документов.
     
-    # Получаем уже подписавших
-    signed_by = []
-    for signer in graph.successors(document_number):
-        if graph.nodes[signer]['type'] == 'employee':
-            edge_data = graph.get_edge_data(document_number, signer)
-            if edge_data and edge_data.get('relation') == 'signed_by':
-                signed_by.append(signer)
+    Подписанты берутся из таблиц допуска индекса: для каждого типа и
+    диапазона сумм они вычислены один раз, а по каждому документу остаются
+    бинарный поиск по сумме и чтение списка подписавших из индекса.
     
-    # Получаем тех, кто может подписать
-    can_sign = find_who_can_sign(graph, document_number)
+    Args:
+        graph: Граф
+        document_numbers: Номера документов (None - все документы графа)
+        
+    Returns:
+        Номер документа -> маршрут в формате find_signature_route.
+        Документы, которых нет в графе, пропускаются.
+    """
+    if document_numbers is None:
+        document_numbers = [n for n, t in graph.nodes(data='type') if t == 'document']
     
-    # Определяем следующий шаг
-    next_signers = [s for s in can_sign if s not in signed_by]
+    index = get_flow_index(graph)
     
-    return {
-        'document': document_number,
-        'approval_chain': approval_chain,
-        'already_signed': signed_by,
-        'can_sign': can_sign,
-        'next_step': next_signers,
-        'is_complete': len(signed_by) >= len(approval_chain)
-    }
+    routes = {}
+    for number in document_numbers:
+        if number not in graph:
+            continue
+        
+        type_node = index.doc_type.get(number)
+        approval_chain = index.approval_chain.get(type_node, []) if type_node else []
+        
+        # Подписанты общие для всех документов типа в одном диапазоне сумм
+        amount = index.doc_amount.get(number)
+        can_sign = () if amount is None else index.eligibility_for(type_node).lookup(amount)
+        
+        signed_by = list(index.signed_by.get(number, ()))
+        if signed_by:
+            signed = set(signed_by)
+            next_step = [s for s in can_sign if s not in signed]
+        else:
+            next_step = list(can_sign)
+        
+        routes[number] = {
+            'document': number,
+            'approval_chain': list(approval_chain),
+            'already_signed': signed_by,
+            'can_sign': list(can_sign),
+            'next_step': next_step,
+            'is_complete': len(signed_by) >= len(approval_chain)
+        }
+    
+    return routes
 
 
 def get_graph_statistics(graph: nx.DiGraph) -> Dict:
     """
     Возвращает статистику по графу.
     
+    Счетчики поддерживаются при построении и обновлениях графа,
+    поэтому граф не обходится.
+    
     Args:
         graph: Граф
         
     Returns:
         Словарь со статистикой
     """
-    node_types = {}
-    for node, data in graph.nodes(data=True):
-        node_type = data.get('type', 'unknown')
-        node_types[node_type] = node_types.get(node_type, 0) + 1
+    stats = get_graph_stats(graph)
+    return {
+        'total_nodes': stats.node_count,
+        'total_edges': stats.edge_count,
+        'node_types': dict(stats.node_types),
+        'average_degree': stats.average_degree
+    }
+
+
+def get_document_statistics(graph: nx.DiGraph) -> Dict:
+    """
+    Операционные показатели документооборота.
     
+    Args:
+        graph: Граф
+        
+    Returns:
+        Словарь: документы по статусам, документы на согласовании по отделам,
+        среднее число недостающих подписей у документов на согласовании
+    """
+    stats = get_graph_stats(graph)
     return {
-        'total_nodes': graph.number_of_nodes(),
-        'total_edges': graph.number_of_edges(),
-        'node_types': node_types,
-        'average_degree': sum(dict(graph.degree()).values()) / graph.number_of_nodes() if graph.number_of_nodes() > 0 else 0
+        'documents_by_status': dict(stats.documents_by_status),
+        'pending_by_department': dict(stats.pending_by_department),
+        'average_outstanding_signatures': stats.average_outstanding_signatures,
+        'edges_by_relation': dict(stats.edge_relations)
+    }
+
+
+# ========================================
+# КЭШ ЗАПРОСОВ
+# ========================================
+
+# Ключ кэша запросов в graph.graph
+QUERY_CACHE_KEY = "query_cache"
+
+DEFAULT_QUERY_CACHE_SIZE = 10_000
+
+
+class QueryCache:
+    """
+    Кэш результатов поисковых функций с инвалидацией по зависимостям.
+    
+    Для каждого результата запоминаются узлы, от которых он зависит.
+    Кэш подписан на изменения графа: GraphChange сбрасывает только записи,
+    зависящие от затронутых узлов. Изменения в обход API обновлений
+    (меняется число узлов) сбрасывают кэш целиком; прямые изменения одних
+    ребер или атрибутов через networkx кэш не замечает - см. get_query_cache.
+    
+    Возвращаются копии результатов - их можно свободно изменять.
+    """
+    
+    QUERIES = {
+        'find_related_entities': find_related_entities,
+        'find_approval_chain': find_approval_chain,
+        'find_who_can_sign': find_who_can_sign,
+        'find_documents_by_department': find_documents_by_department,
+        'find_employees_in_department': find_employees_in_department,
+        'find_signature_route': find_signature_route
     }
+    
+    def __init__(self, graph: nx.DiGraph, maxsize: int = DEFAULT_QUERY_CACHE_SIZE):
+        if maxsize <= 0:
+            raise ValueError(f"Cache size must be positive, got: {maxsize}")
+        self.graph = graph
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[object, FrozenSet[str]]]" = OrderedDict()
+        self._dependents: Dict[str, Set[Tuple[str, str]]] = {}
+        self._lock = threading.Lock()
+        self._fingerprint = graph.number_of_nodes()
+        self.hits = 0
+        self.misses = 0
+        subscribe(graph, self._on_change)
+    
+    # --- ЗАПРОСЫ ---
+    
+    def find_related_entities(self, start_node: str) -> List[str]:
+        return self._get('find_related_entities', start_node)
+    
+    def find_approval_chain(self, document_number: str) -> List[str]:
+        return self._get('find_approval_chain', document_number)
+    
+    def find_who_can_sign(self, document_number: str) -> List[str]:
+        return self._get('find_who_can_sign', document_number)
+    
+    def find_documents_by_department(self, department_name: str) -> List[str]:
+        return self._get('find_documents_by_department', department_name)
+    
+    def find_employees_in_department(self, department_name: str) -> List[str]:
+        return self._get('find_employees_in_department', department_name)
+    
+    def find_signature_route(self, document_number: str) -> Dict:
+        return self._get('find_signature_route', document_number)
+    
+    # --- МЕХАНИКА ---
+    
+    def _dependencies(self, query: str, node: str) -> FrozenSet[str]:
+        """
+        Узлы, изменение которых может поменять результат запроса.
+        
+        Связи узла меняются только вместе с ним самим (GraphChange.affected
+        содержит оба конца ребра), поэтому запросам по соседям достаточно
+        самого узла. Запросам по документу нужны еще тип документа и отделы
+        цепочки согласования (их сотрудники и лимиты).
+        """
+        if query in ('find_approval_chain', 'find_who_can_sign', 'find_signature_route'):
+            index = get_flow_index(self.graph)
+            type_node = index.doc_type.get(node)
+            if type_node is not None:
+                return frozenset([node, type_node, *index.approval_chain.get(type_node, ())])
+        return frozenset([node])
+    
+    def _get(self, query: str, node: str):
+        with self._lock:
+            if self._fingerprint != self.graph.number_of_nodes():
+                self._clear()
+            key = (query, node)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[0])
+            self.misses += 1
+            
+            value = self.QUERIES[query](self.graph, node)
+            dependencies = self._dependencies(query, node)
+            self._entries[key] = (value, dependencies)
+            for dependency in dependencies:
+                self._dependents.setdefault(dependency, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+            return copy.deepcopy(value)
+    
+    def _drop(self, key: Tuple[str, str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for dependency in entry[1]:
+            keys = self._dependents.get(dependency)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._dependents[dependency]
+    
+    def _on_change(self, change: GraphChange) -> None:
+        with self._lock:
+            for node in change.affected:
+                for key in list(self._dependents.get(node, ())):
+                    self._drop(key)
+            self._fingerprint = self.graph.number_of_nodes()
+    
+    def _clear(self) -> None:
+        self._entries.clear()
+        self._dependents.clear()
+        self._fingerprint = self.graph.number_of_nodes()
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._clear()
+    
+    def close(self) -> None:
+        """Отписывается от изменений графа."""
+        unsubscribe(self.graph, self._on_change)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def get_query_cache(graph: nx.DiGraph) -> QueryCache:
+    """
+    Кэш запросов графа (создается при первом обращении).
+
+    Как и get_flow_index, сверяет только число узлов: ребра и атрибуты,
+    измененные напрямую через networkx (например, graph.add_edge), событий
+    не порождают, и кэш продолжит отдавать прежние результаты. После таких
+    изменений нужно вызвать rebuild_flow_index и get_query_cache(graph).clear().
+    """
+    cache: Optional[QueryCache] = graph.graph.get(QUERY_CACHE_KEY)
+    if cache is None:
+        cache = graph.graph[QUERY_CACHE_KEY] = QueryCache(graph)
+    return cache
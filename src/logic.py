@@ -9,10 +9,17 @@ Inference Engine - Ядро продукционной системы.
 4. Формирование вердикта
 """
 
+import copy
+import hashlib
 import json
 import os
-from typing import Dict, Tuple
+import threading
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from enum import IntEnum
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple, Union
 from document_validators import (
+    parse_date,
     validate_date_format,
     validate_date_not_past,
     validate_expiry_date,
@@ -31,6 +38,223 @@ from document_validators import (
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 RULES_PATH = os.path.join(BASE_DIR, 'data', 'raw', 'rules.json')
 
+# Ограничение на число кэшируемых планов (защита от мусорных типов в пакетах)
+MAX_CACHED_PLANS = 256
+
+
+# ========================================
+# СКОМПИЛИРОВАННАЯ БАЗА ЗНАНИЙ (RULE SET)
+# ========================================
+
+@dataclass(frozen=True)
+class RuleSet:
+    """
+    База знаний, загруженная один раз и приведенная к удобным для проверок типам.
+    
+    Атрибуты:
+        version: SHA-256 содержимого rules.json (меняется вместе с файлом);
+            для правил, собранных в памяти, - SHA-256 их канонического JSON
+        must_be_signed, must_have_inn, expiry_date_must_be_future: Критические правила
+        allowed_types: Разрешенные типы документов (frozenset для проверки вхождения)
+        allowed_types_order: Те же типы в порядке из JSON (для текстов сообщений)
+        blacklisted_types: Запрещенные типы документов
+        required_fields: Обязательные поля по типам документов (в порядке из JSON)
+        inn_lengths: Допустимые длины ИНН
+        inn_lengths_order: Те же длины в порядке из JSON (для текстов сообщений)
+        min_amount, max_amount: Допустимый диапазон сумм
+        expiry_warning_days: За сколько дней предупреждать об истечении срока
+        large_amount_threshold: Доля от max_amount для предупреждения о сумме
+        messages: Тексты вердиктов (validation_messages)
+        raw: Исходный словарь правил
+    """
+    version: str
+    must_be_signed: bool
+    must_have_inn: bool
+    expiry_date_must_be_future: bool
+    allowed_types: FrozenSet[str]
+    allowed_types_order: Tuple[str, ...]
+    blacklisted_types: FrozenSet[str]
+    required_fields: Dict[str, Tuple[str, ...]]
+    inn_lengths: FrozenSet[int]
+    inn_lengths_order: Tuple[int, ...]
+    min_amount: float
+    max_amount: float
+    expiry_warning_days: int
+    large_amount_threshold: float
+    messages: Dict[str, str]
+    raw: Dict
+    _plans: Dict = field(default_factory=dict, compare=False, repr=False)
+
+    @classmethod
+    def from_dict(cls, rules: Dict, version: str = "") -> "RuleSet":
+        """
+        Строит RuleSet из словаря правил (формат rules.json).
+        Без version версией становится хэш самих правил (rules_version):
+        разные наборы правил не получают одинаковую версию.
+        """
+        critical = rules['critical_rules']
+        thresholds = rules['thresholds']
+        return cls(
+            version=version or rules_version(rules),
+            must_be_signed=bool(critical['must_be_signed']),
+            must_have_inn=bool(critical['must_have_inn']),
+            expiry_date_must_be_future=bool(critical['expiry_date_must_be_future']),
+            allowed_types=frozenset(rules['document_types']['allowed']),
+            allowed_types_order=tuple(rules['document_types']['allowed']),
+            blacklisted_types=frozenset(rules['document_types']['blacklisted']),
+            required_fields={
+                doc_type: tuple(fields)
+                for doc_type, fields in rules['required_fields'].items()
+            },
+            inn_lengths=frozenset(int(n) for n in rules['inn_validation']['allowed_lengths']),
+            inn_lengths_order=tuple(int(n) for n in rules['inn_validation']['allowed_lengths']),
+            min_amount=float(thresholds['min_amount']),
+            max_amount=float(thresholds['max_amount']),
+            expiry_warning_days=int(thresholds['expiry_warning_days']),
+            large_amount_threshold=float(thresholds.get('large_amount_threshold_percent', 0.8)),
+            messages=dict(rules['validation_messages']),
+            raw=rules
+        )
+
+    def required_fields_for(self, doc_type: str) -> Tuple[str, ...]:
+        """Обязательные поля для типа документа (пустой кортеж для неизвестных типов)."""
+        return self.required_fields.get(doc_type, ())
+
+    def __reduce__(self):
+        # Планы содержат замыкания и не сериализуются: в другой процесс
+        # передаем исходные правила, планы компилируются там при первом обращении
+        return (RuleSet.from_dict, (self.raw, self.version))
+
+    def plan_for(self, doc_type: str) -> "ValidationPlan":
+        """
+        Возвращает скомпилированный план проверок для типа документа.
+        Планы известных типов компилируются один раз и кэшируются в RuleSet.
+        """
+        plan = self._plans.get(doc_type)
+        if plan is None:
+            plan = compile_plan(self, doc_type)
+            if len(self._plans) < MAX_CACHED_PLANS:
+                self._plans[doc_type] = plan
+        return plan
+
+
+def rules_version(rules: Dict) -> str:
+    """SHA-256 канонического JSON правил (ключи отсортированы)."""
+    canonical = json.dumps(rules, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+# Кэш: путь -> (mtime_ns, size, RuleSet)
+_rule_set_cache: Dict[str, Tuple[int, int, RuleSet]] = {}
+_rule_set_lock = threading.Lock()
+
+
+def _read_rules_file(path: str) -> bytes:
+    """Читает rules.json с теми же сообщениями об ошибках, что и load_rules."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Rules file not found at: {path}")
+
+
+def get_rule_set(path: Optional[str] = None) -> RuleSet:
+    """
+    Возвращает общий скомпилированный RuleSet.
+    
+    Файл правил читается только при первом вызове и при изменении его mtime/размера;
+    если после изменения mtime содержимое (SHA-256) осталось прежним, используется
+    уже скомпилированный объект. Один и тот же RuleSet разделяют страницы Streamlit,
+    пакетная валидация и библиотечные вызовы.
+    
+    Args:
+        path: Путь к rules.json (по умолчанию RULES_PATH)
+        
+    Returns:
+        RuleSet
+        
+    Raises:
+        FileNotFoundError: Если файл правил не найден
+        json.JSONDecodeError: Если JSON некорректен
+    """
+    path = path or RULES_PATH
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Rules file not found at: {path}")
+    
+    cached = _rule_set_cache.get(path)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+    
+    with _rule_set_lock:
+        raw_bytes = _read_rules_file(path)
+        version = hashlib.sha256(raw_bytes).hexdigest()
+        
+        if cached and cached[2].version == version:
+            rule_set = cached[2]
+        else:
+            try:
+                rules = json.loads(raw_bytes.decode('utf-8'))
+            except json.JSONDecodeError as e:
+                raise json.JSONDecodeError(f"Invalid JSON in rules file: {str(e)}", e.doc, e.pos)
+            rule_set = RuleSet.from_dict(rules, version)
+        
+        _rule_set_cache[path] = (stat.st_mtime_ns, stat.st_size, rule_set)
+        return rule_set
+
+
+def invalidate_rule_set_cache() -> None:
+    """Сбрасывает кэш RuleSet (следующий вызов перечитает файл)."""
+    with _rule_set_lock:
+        _rule_set_cache.clear()
+
+
+# ========================================
+# КОНТЕКСТ ПРОГОНА ВАЛИДАЦИИ
+# ========================================
+
+@dataclass(frozen=True)
+class ValidationContext:
+    """
+    Параметры одного прогона валидации, общие для всех документов.
+    
+    Атрибуты:
+        reference_date: "Сегодня" для всех проверок дат в прогоне
+        expiry_warning_days: За сколько дней предупреждать об истечении срока
+        expiry_warning_cutoff: reference_date + expiry_warning_days (считается один раз)
+    """
+    reference_date: date
+    expiry_warning_days: int
+    expiry_warning_cutoff: date
+    
+    @classmethod
+    def create(
+        cls,
+        as_of: Union[date, str, None] = None,
+        rule_set: Optional[RuleSet] = None
+    ) -> "ValidationContext":
+        """
+        Создает контекст на дату as_of (по умолчанию - сегодня).
+        
+        Args:
+            as_of: Опорная дата (date или строка YYYY-MM-DD) - например,
+                для повторной проверки исторического пакета "на дату"
+            rule_set: Правила, из которых берется expiry_warning_days
+        """
+        rules = rule_set or get_rule_set()
+        if as_of is None:
+            reference_date = date.today()
+        elif isinstance(as_of, str):
+            reference_date = parse_date(as_of)
+        else:
+            reference_date = as_of
+        return cls(
+            reference_date=reference_date,
+            expiry_warning_days=rules.expiry_warning_days,
+            expiry_warning_cutoff=reference_date + timedelta(days=rules.expiry_warning_days)
+        )
+
 
 # ========================================
 # ЗАГРУЗКА БАЗЫ ЗНАНИЙ
@@ -40,6 +264,9 @@ def load_rules() -> Dict:
     """
     Загружает правила валидации из JSON файла.
     
+    Возвращает независимую копию словаря из общего RuleSet,
+    поэтому повторные вызовы не читают файл с диска.
+    
     Returns:
         Dict с правилами и настройками системы
         
@@ -47,24 +274,362 @@ def load_rules() -> Dict:
         FileNotFoundError: Если файл правил не найден
         json.JSONDecodeError: Если JSON некорректен
     """
-    try:
-        with open(RULES_PATH, 'r', encoding='utf-8') as f:
-            rules = json.load(f)
-        return rules
-    except FileNotFoundError:
-        raise FileNotFoundError(f"Rules file not found at: {RULES_PATH}")
-    except json.JSONDecodeError as e:
-        raise json.JSONDecodeError(f"Invalid JSON in rules file: {str(e)}", e.doc, e.pos)
+    return copy.deepcopy(get_rule_set().raw)
+
+
+# ========================================
+# ВЕРДИКТЫ
+# ========================================
+
+class Severity(IntEnum):
+    """Уровень вердикта; значения упорядочены по тяжести и годятся как коды."""
+    OK = 0
+    WARNING = 1
+    ERROR = 2
+    
+    @property
+    def label(self) -> str:
+        """Префикс текстового вердикта без скобок: OK / WARNING / ERROR."""
+        return self.name
+
+
+class Verdict:
+    """
+    Структурированный вердикт check_rules.
+    
+    Текст не собирается при создании: хранятся шаблоны и детали
+    проваленных проверок, строка формируется только в str().
+    
+    Атрибуты:
+        severity: Severity
+        rule_id: Идентификатор решающего правила ('ok' для успешной проверки,
+            первое предупреждение - если предупреждений несколько)
+        parts: Кортеж пар (template, detail), по одной на строку вердикта
+    """
+    __slots__ = ('severity', 'rule_id', 'parts')
+    
+    def __init__(self, severity: Severity, rule_id: str, parts: Tuple[Tuple[str, str], ...]):
+        self.severity = severity
+        self.rule_id = rule_id
+        self.parts = parts
+    
+    @property
+    def is_error(self) -> bool:
+        return self.severity is Severity.ERROR
+    
+    @property
+    def is_warning(self) -> bool:
+        return self.severity is Severity.WARNING
+    
+    @property
+    def is_ok(self) -> bool:
+        return self.severity is Severity.OK
+    
+    def lines(self) -> List[str]:
+        """Строки вердикта (для предупреждений - по одной на проверку)."""
+        return [template.replace('{detail}', detail) for template, detail in self.parts]
+    
+    def __str__(self) -> str:
+        return "\n".join(self.lines())
+    
+    def __repr__(self) -> str:
+        return f"Verdict({self.severity.name}, {self.rule_id!r}, {len(self.parts)} part(s))"
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Verdict):
+            return (self.severity, self.rule_id, self.parts) == (other.severity, other.rule_id, other.parts)
+        return NotImplemented
+    
+    def __hash__(self) -> int:
+        return hash((self.severity, self.rule_id, self.parts))
+
+
+# ========================================
+# КОМПИЛЯЦИЯ ПРАВИЛ В ПЛАН ПРОВЕРОК
+# ========================================
+
+@dataclass(frozen=True)
+class CheckNode:
+    """
+    Один узел плана проверок.
+    
+    Атрибуты:
+        check_id: Идентификатор правила (например, 'inn', 'expiry_not_past')
+        severity: Severity.ERROR или Severity.WARNING
+        run: Функция (document, context) -> (passed, detail)
+        template: Текст вердикта при провале, '{detail}' заменяется на detail
+        requires: Поле, без которого узел не применяется (None - применяется всегда)
+        in_verdict: Участвует ли узел в вердикте check_rules
+        summary_key: Ключ в get_validation_summary()['checks'] (None - не показывается)
+    """
+    check_id: str
+    severity: Severity
+    run: Callable[[Dict, ValidationContext], Tuple[bool, str]]
+    template: str
+    requires: Optional[str] = None
+    in_verdict: bool = True
+    summary_key: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ValidationPlan:
+    """
+    Упорядоченный план проверок для одного типа документа.
+    
+    Атрибуты:
+        doc_type: Тип документа, для которого скомпилирован план
+        nodes: Узлы в порядке приоритета (критические -> обязательные -> предупреждения)
+        success_message: Готовый текст вердикта [OK]
+    """
+    doc_type: str
+    nodes: Tuple[CheckNode, ...]
+    success_message: str
+
+
+@dataclass
+class PlanResult:
+    """
+    Результат одного прохода плана.
+    
+    Атрибуты:
+        verdict: Вердикт как в check_rules (первая ошибка или все предупреждения)
+        checks: Детальные проверки для отчета (только в режиме collect_all)
+        errors: Все проваленные ошибки (в обычном режиме - не больше одной)
+        warnings: Все предупреждения (в обычном режиме - только если нет ошибок)
+    """
+    verdict: Verdict
+    checks: Dict[str, Dict[str, str]]
+    errors: Tuple[Verdict, ...] = ()
+    warnings: Tuple[Verdict, ...] = ()
+
+
+NodeFunction = Callable[[Dict, ValidationContext], Tuple[bool, str]]
+
+
+def _constant(result: Tuple[bool, str]) -> NodeFunction:
+    """Узел с результатом, вычисленным на этапе компиляции."""
+    return lambda document, context: result
+
+
+def _negate(check: NodeFunction) -> NodeFunction:
+    """Превращает check_*_warning (True = есть предупреждение) в узел (True = пройдено)."""
+    def run(document: Dict, context: ValidationContext) -> Tuple[bool, str]:
+        has_warning, msg = check(document, context)
+        return not has_warning, msg
+    return run
+
+
+def _check_signed(document: Dict, context: ValidationContext) -> Tuple[bool, str]:
+    if document.get('is_signed', False):
+        return True, 'Document is signed'
+    return False, 'Document is not signed'
+
+
+def compile_plan(rule_set: RuleSet, doc_type: str) -> ValidationPlan:
+    """
+    Компилирует правила из rules.json в план проверок для типа документа.
+    
+    Проверки, результат которых зависит только от типа (белый/черный список),
+    вычисляются здесь один раз; проверки, отключенные в critical_rules,
+    в план не попадают или не участвуют в вердикте.
+    
+    Args:
+        rule_set: Скомпилированные правила
+        doc_type: Тип документа
+        
+    Returns:
+        ValidationPlan
+    """
+    messages = rule_set.messages
+    required_fields = rule_set.required_fields_for(doc_type)
+    type_result = validate_document_type(
+        doc_type,
+        rule_set.allowed_types_order,
+        rule_set.blacklisted_types
+    )
+    
+    nodes: List[CheckNode] = [
+        # 1. CRITICAL FILTERS
+        CheckNode(
+            'is_signed', Severity.ERROR, _check_signed,
+            messages['error_not_signed'],
+            in_verdict=rule_set.must_be_signed,
+            summary_key='is_signed'
+        ),
+        CheckNode(
+            'document_type', Severity.ERROR, _constant(type_result),
+            messages['error_invalid_type'] + " ({detail})",
+            summary_key='document_type'
+        ),
+        CheckNode(
+            'required_fields', Severity.ERROR,
+            lambda document, context: validate_required_fields(document, required_fields),
+            messages['error_missing_fields'] + " ({detail})",
+            summary_key='required_fields'
+        ),
+        # 2. HARD VALIDATION
+        CheckNode(
+            'issue_date', Severity.ERROR,
+            lambda document, context: validate_date_format(document.get('issue_date', '')),
+            messages['error_invalid_date'] + " ({detail})",
+            summary_key='issue_date'
+        ),
+        CheckNode(
+            'expiry_date', Severity.ERROR,
+            lambda document, context: validate_date_format(document.get('expiry_date', '')),
+            messages['error_invalid_date'] + " ({detail})",
+            requires='expiry_date'
+        ),
+        CheckNode(
+            'expiry_after_issue', Severity.ERROR,
+            lambda document, context: validate_expiry_date(
+                document.get('issue_date', ''), document.get('expiry_date', '')
+            ),
+            "[ERROR] {detail}",
+            requires='expiry_date'
+        ),
+    ]
+    
+    if rule_set.expiry_date_must_be_future:
+        nodes.append(CheckNode(
+            'expiry_not_past', Severity.ERROR,
+            lambda document, context: validate_date_not_past(
+                document.get('expiry_date', ''), context.reference_date
+            ),
+            messages['error_expired'] + " ({detail})",
+            requires='expiry_date'
+        ))
+    
+    nodes += [
+        CheckNode(
+            'inn', Severity.ERROR,
+            lambda document, context: validate_inn(document.get('inn', ''), rule_set.inn_lengths_order),
+            messages['error_invalid_inn'] + " ({detail})",
+            requires='inn',
+            in_verdict=rule_set.must_have_inn,
+            summary_key='inn'
+        ),
+        CheckNode(
+            'amount', Severity.ERROR,
+            lambda document, context: validate_amount(
+                document.get('total_amount', 0), rule_set.min_amount, rule_set.max_amount
+            ),
+            messages['error_amount_range'] + " ({detail})",
+            requires='total_amount',
+            summary_key='amount'
+        ),
+        # 3. SOFT VALIDATION
+        CheckNode(
+            'expiring_soon', Severity.WARNING,
+            _negate(lambda document, context: check_expiry_warning(
+                document.get('expiry_date', ''),
+                context.expiry_warning_days,
+                context.reference_date,
+                context.expiry_warning_cutoff
+            )),
+            messages['warning_expiring_soon'] + " ({detail})",
+            requires='expiry_date'
+        ),
+        CheckNode(
+            'large_amount', Severity.WARNING,
+            _negate(lambda document, context: check_large_amount_warning(
+                document.get('total_amount', 0),
+                rule_set.max_amount,
+                rule_set.large_amount_threshold
+            )),
+            messages['warning_large_amount'] + " ({detail})",
+            requires='total_amount'
+        ),
+    ]
+    
+    return ValidationPlan(
+        doc_type=doc_type,
+        nodes=tuple(nodes),
+        success_message=messages['success'] + f" for '{doc_type}' document"
+    )
+
+
+def run_plan(
+    document: Dict,
+    plan: ValidationPlan,
+    context: ValidationContext,
+    collect_all: bool = False
+) -> PlanResult:
+    """
+    Выполняет план проверок за один проход.
+    
+    В обычном режиме выполнение останавливается на первой ошибке (как в
+    check_rules). В режиме collect_all выполняются все применимые узлы:
+    собираются все ошибки, все предупреждения и детальные проверки отчета.
+    Каждый узел выполняется не больше одного раза, поэтому стоимость прохода
+    не превышает стоимости check_rules для документа без ошибок.
+    
+    Args:
+        document: Словарь с данными документа
+        plan: Скомпилированный план
+        context: Контекст прогона (опорная дата)
+        collect_all: Не останавливаться на первой ошибке
+        
+    Returns:
+        PlanResult
+    """
+    errors: List[Verdict] = []
+    warnings: List[Verdict] = []
+    checks: Dict[str, Dict[str, str]] = {}
+    
+    for node in plan.nodes:
+        if node.requires is not None and node.requires not in document:
+            continue
+        
+        in_summary = collect_all and node.summary_key is not None
+        if not (node.in_verdict or in_summary):
+            continue
+        
+        passed, detail = node.run(document, context)
+        
+        if in_summary:
+            checks[node.summary_key] = {
+                'status': 'PASS' if passed else 'FAIL',
+                'message': detail
+            }
+        
+        if passed or not node.in_verdict:
+            continue
+        
+        failed = Verdict(node.severity, node.check_id, ((node.template, detail),))
+        if node.severity is Severity.ERROR:
+            errors.append(failed)
+            if not collect_all:
+                break
+        else:
+            warnings.append(failed)
+    
+    if errors:
+        verdict = errors[0]
+    elif warnings:
+        verdict = Verdict(
+            Severity.WARNING,
+            warnings[0].rule_id,
+            tuple(part for warning in warnings for part in warning.parts)
+        )
+    else:
+        verdict = Verdict(Severity.OK, 'ok', ((plan.success_message, ''),))
+    
+    return PlanResult(verdict=verdict, checks=checks, errors=tuple(errors), warnings=tuple(warnings))
 
 
 # ========================================
 # МАШИНА ВЫВОДА (INFERENCE ENGINE)
 # ========================================
 
-def check_rules(document: Dict) -> str:
+def check_rules(
+    document: Dict,
+    rule_set: Optional[RuleSet] = None,
+    context: Optional[ValidationContext] = None
+) -> str:
     """
     Основная функция валидации документа.
-    Применяет все правила последовательно и возвращает вердикт.
+    Применяет скомпилированный план проверок и возвращает вердикт.
     
     Порядок проверок:
     1. Critical Filters (останавливают выполнение при ошибке)
@@ -74,6 +639,8 @@ def check_rules(document: Dict) -> str:
     
     Args:
         document: Словарь с данными документа
+        rule_set: Скомпилированные правила (по умолчанию общий get_rule_set())
+        context: Контекст прогона (по умолчанию - на сегодня)
         
     Returns:
         Строковый вердикт с префиксом:
@@ -81,206 +648,136 @@ def check_rules(document: Dict) -> str:
         - [WARNING] - предупреждение
         - [OK] - успешная валидация
     """
+    return str(check_rules_verdict(document, rule_set, context))
+
+
+def check_rules_verdict(
+    document: Dict,
+    rule_set: Optional[RuleSet] = None,
+    context: Optional[ValidationContext] = None
+) -> Verdict:
+    """
+    То же, что check_rules, но без сборки строки.
+    Пакетная обработка и интерфейс работают с severity и rule_id напрямую.
     
-    # Загружаем правила
-    rules = load_rules()
-    
-    # ========================================
-    # 1. CRITICAL FILTERS (Жесткие фильтры)
-    # ========================================
-    
-    # Правило 1.1: Документ должен быть подписан
-    if rules['critical_rules']['must_be_signed']:
-        if not document.get('is_signed', False):
-            return rules['validation_messages']['error_not_signed']
-    
-    # Правило 1.2: Тип документа должен быть разрешен
-    doc_type = document.get('document_type', '')
-    is_valid, error_msg = validate_document_type(
-        doc_type,
-        rules['document_types']['allowed'],
-        rules['document_types']['blacklisted']
-    )
-    if not is_valid:
-        return rules['validation_messages']['error_invalid_type'] + f" ({error_msg})"
-    
-    # Правило 1.3: Все обязательные поля должны быть заполнены
-    required_fields = rules['required_fields'].get(doc_type, [])
-    is_valid, error_msg = validate_required_fields(document, required_fields)
-    if not is_valid:
-        return rules['validation_messages']['error_missing_fields'] + f" ({error_msg})"
-    
-    # ========================================
-    # 2. HARD VALIDATION (Обязательные проверки)
-    # ========================================
-    
-    # Правило 2.1: Валидация даты выдачи
-    issue_date = document.get('issue_date', '')
-    is_valid, error_msg = validate_date_format(issue_date)
-    if not is_valid:
-        return rules['validation_messages']['error_invalid_date'] + f" ({error_msg})"
-    
-    # Правило 2.2: Валидация срока действия (если есть)
-    if 'expiry_date' in document:
-        expiry_date = document.get('expiry_date', '')
-        
-        # Проверка формата
-        is_valid, error_msg = validate_date_format(expiry_date)
-        if not is_valid:
-            return rules['validation_messages']['error_invalid_date'] + f" ({error_msg})"
-        
-        # Проверка, что срок действия > даты выдачи
-        is_valid, error_msg = validate_expiry_date(issue_date, expiry_date)
-        if not is_valid:
-            return f"[ERROR] {error_msg}"
+    Args:
+        document: Словарь с данными документа
+        rule_set: Скомпилированные правила (по умолчанию общий get_rule_set())
+        context: Контекст прогона (по умолчанию - на сегодня)
         
-        # Проверка, что документ не просрочен
-        if rules['critical_rules']['expiry_date_must_be_future']:
-            is_valid, error_msg = validate_date_not_past(expiry_date)
-            if not is_valid:
-                return rules['validation_messages']['error_expired'] + f" ({error_msg})"
-    
-    # Правило 2.3: Валидация ИНН (если требуется)
-    if rules['critical_rules']['must_have_inn'] and 'inn' in document:
-        inn = document.get('inn', '')
-        is_valid, error_msg = validate_inn(
-            inn,
-            rules['inn_validation']['allowed_lengths']
-        )
-        if not is_valid:
-            return rules['validation_messages']['error_invalid_inn'] + f" ({error_msg})"
-    
-    # Правило 2.4: Валидация суммы
-    if 'total_amount' in document:
-        amount = document.get('total_amount', 0)
-        is_valid, error_msg = validate_amount(
-            amount,
-            rules['thresholds']['min_amount'],
-            rules['thresholds']['max_amount']
-        )
-        if not is_valid:
-            return rules['validation_messages']['error_amount_range'] + f" ({error_msg})"
-    
-    # ========================================
-    # 3. SOFT VALIDATION (Предупреждения)
-    # ========================================
+    Returns:
+        Verdict
+    """
+    rules = rule_set or get_rule_set()
+    context = context or ValidationContext.create(rule_set=rules)
+    plan = rules.plan_for(document.get('document_type', ''))
+    return run_plan(document, plan, context).verdict
+
+
+@dataclass
+class ValidationReport:
+    """
+    Полный результат проверки документа (режим "собрать все ошибки").
     
-    warnings = []
+    Атрибуты:
+        verdict: Вердикт как в check_rules
+        errors: Все ошибки в порядке плана
+        warnings: Все предупреждения в порядке плана
+        summary: Отчет в формате get_validation_summary
+    """
+    verdict: Verdict
+    errors: Tuple[Verdict, ...]
+    warnings: Tuple[Verdict, ...]
+    summary: Dict
     
-    # Предупреждение 3.1: Срок истекает скоро
-    if 'expiry_date' in document:
-        expiry_date = document.get('expiry_date', '')
-        has_warning, warning_msg = check_expiry_warning(
-            expiry_date,
-            rules['thresholds']['expiry_warning_days']
-        )
-        if has_warning:
-            warnings.append(f"{rules['validation_messages']['warning_expiring_soon']} ({warning_msg})")
-    
-    # Предупреждение 3.2: Подозрительно большая сумма
-    if 'total_amount' in document:
-        amount = document.get('total_amount', 0)
-        has_warning, warning_msg = check_large_amount_warning(
-            amount,
-            rules['thresholds']['max_amount']
-        )
-        if has_warning:
-            warnings.append(f"{rules['validation_messages']['warning_large_amount']} ({warning_msg})")
+    @property
+    def severity(self) -> Severity:
+        return self.verdict.severity
     
-    # ========================================
-    # 4. ФОРМИРОВАНИЕ ИТОГОВОГО ВЕРДИКТА
-    # ========================================
+    def messages(self) -> List[str]:
+        """Тексты всех ошибок, затем всех предупреждений."""
+        return [str(v) for v in self.errors + self.warnings]
+
+
+def evaluate_document(
+    document: Dict,
+    rule_set: Optional[RuleSet] = None,
+    context: Optional[ValidationContext] = None
+) -> ValidationReport:
+    """
+    Проверяет документ всеми применимыми правилами за один проход.
+    В отличие от check_rules не останавливается на первой ошибке,
+    поэтому оператор видит все проблемы документа сразу.
     
-    # Если есть предупреждения, возвращаем их
-    if warnings:
-        return "\n".join(warnings)
+    Args:
+        document: Словарь с данными документа
+        rule_set: Скомпилированные правила (по умолчанию общий get_rule_set())
+        context: Контекст прогона (по умолчанию - на сегодня)
+        
+    Returns:
+        ValidationReport
+    """
+    rules = rule_set or get_rule_set()
+    context = context or ValidationContext.create(rule_set=rules)
+    plan = rules.plan_for(document.get('document_type', ''))
+    result = run_plan(document, plan, context, collect_all=True)
+    return ValidationReport(
+        verdict=result.verdict,
+        errors=result.errors,
+        warnings=result.warnings,
+        summary=_build_summary(document, result.checks)
+    )
+
+
+def validate_document(
+    document: Dict,
+    rule_set: Optional[RuleSet] = None,
+    context: Optional[ValidationContext] = None
+) -> Tuple[Verdict, Dict]:
+    """
+    Вердикт и детальный отчет за один проход плана (через evaluate_document).
     
-    # Все проверки пройдены успешно
-    return rules['validation_messages']['success'] + f" for '{doc_type}' document"
+    Args:
+        document: Словарь с данными документа
+        rule_set: Скомпилированные правила (по умолчанию общий get_rule_set())
+        context: Контекст прогона (по умолчанию - на сегодня)
+        
+    Returns:
+        (Verdict - str() дает текст check_rules, отчет как в get_validation_summary)
+    """
+    report = evaluate_document(document, rule_set, context)
+    return report.verdict, report.summary
 
 
 # ========================================
 # ДОПОЛНИТЕЛЬНЫЕ ФУНКЦИИ
 # ========================================
 
-def get_validation_summary(document: Dict) -> Dict:
+def _build_summary(document: Dict, checks: Dict[str, Dict[str, str]]) -> Dict:
+    """Оформляет детальные проверки в формат get_validation_summary."""
+    all_passed = all(check['status'] == 'PASS' for check in checks.values())
+    return {
+        'document_type': document.get('document_type', 'unknown'),
+        'document_number': document.get('document_number', 'N/A'),
+        'checks': checks,
+        'overall_status': 'PASS' if all_passed else 'FAIL'
+    }
+
+
+def get_validation_summary(
+    document: Dict,
+    rule_set: Optional[RuleSet] = None,
+    context: Optional[ValidationContext] = None
+) -> Dict:
     """
     Возвращает детальную информацию о валидации документа.
     
     Args:
         document: Словарь с данными документа
+        rule_set: Скомпилированные правила (по умолчанию общий get_rule_set())
+        context: Контекст прогона (по умолчанию - на сегодня)
         
     Returns:
         Dict с результатами каждой проверки
     """
-    rules = load_rules()
-    summary = {
-        'document_type': document.get('document_type', 'unknown'),
-        'document_number': document.get('document_number', 'N/A'),
-        'checks': {},
-        'overall_status': 'UNKNOWN'
-    }
-    
-    # Проверяем каждое правило и сохраняем результат
-    doc_type = document.get('document_type', '')
-    
-    # Проверка подписи
-    summary['checks']['is_signed'] = {
-        'status': 'PASS' if document.get('is_signed', False) else 'FAIL',
-        'message': 'Document is signed' if document.get('is_signed', False) else 'Document is not signed'
-    }
-    
-    # Проверка типа документа
-    is_valid, msg = validate_document_type(
-        doc_type,
-        rules['document_types']['allowed'],
-        rules['document_types']['blacklisted']
-    )
-    summary['checks']['document_type'] = {
-        'status': 'PASS' if is_valid else 'FAIL',
-        'message': msg
-    }
-    
-    # Проверка обязательных полей
-    required_fields = rules['required_fields'].get(doc_type, [])
-    is_valid, msg = validate_required_fields(document, required_fields)
-    summary['checks']['required_fields'] = {
-        'status': 'PASS' if is_valid else 'FAIL',
-        'message': msg
-    }
-    
-    # Проверка даты
-    issue_date = document.get('issue_date', '')
-    is_valid, msg = validate_date_format(issue_date)
-    summary['checks']['issue_date'] = {
-        'status': 'PASS' if is_valid else 'FAIL',
-        'message': msg
-    }
-    
-    # Проверка ИНН
-    if 'inn' in document:
-        inn = document.get('inn', '')
-        is_valid, msg = validate_inn(inn, rules['inn_validation']['allowed_lengths'])
-        summary['checks']['inn'] = {
-            'status': 'PASS' if is_valid else 'FAIL',
-            'message': msg
-        }
-    
-    # Проверка суммы
-    if 'total_amount' in document:
-        amount = document.get('total_amount', 0)
-        is_valid, msg = validate_amount(
-            amount,
-            rules['thresholds']['min_amount'],
-            rules['thresholds']['max_amount']
-        )
-        summary['checks']['amount'] = {
-            'status': 'PASS' if is_valid else 'FAIL',
-            'message': msg
-        }
-    
-    # Определяем общий статус
-    all_passed = all(check['status'] == 'PASS' for check in summary['checks'].values())
-    summary['overall_status'] = 'PASS' if all_passed else 'FAIL'
-    
-    return summary
+    return evaluate_document(document, rule_set, context).summary
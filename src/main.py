@@ -11,7 +11,15 @@ Streamlit интерфейс для системы валидации докум
 import streamlit as st
 from datetime import datetime, timedelta
 from mock_data import default_document, all_test_cases
-from logic import check_rules, get_validation_summary, load_rules
+from logic import check_rules, load_rules, get_rule_set, Severity
+from validation_cache import get_validation_cache
+
+# Как показывать вердикт каждого уровня
+VERDICT_DISPLAY = {
+    Severity.ERROR: st.error,
+    Severity.WARNING: st.warning,
+    Severity.OK: st.success,
+}
 
 # ========================================
 # КОНФИГУРАЦИЯ СТРАНИЦЫ
@@ -136,31 +144,30 @@ if mode == "Custom Input":
             current_document["expiry_date"] = expiry_date.strftime("%Y-%m-%d")
         
         # Добавляем required_fields из правил
-        rules = load_rules()
-        current_document["required_fields"] = rules['required_fields'].get(document_type, [])
+        rule_set = get_rule_set()
+        current_document["required_fields"] = list(rule_set.required_fields_for(document_type))
         
         # Запускаем валидацию
         st.header("2. Validation Results")
         
-        # Получаем вердикт
-        result = check_rules(current_document)
+        # Все ошибки, предупреждения и детальный отчет за один проход правил
+        report = get_validation_cache().evaluate(current_document, rule_set)
+        summary = report.summary
         
         # Отображаем результат с правильным цветом
-        if "[ERROR]" in result:
-            st.error(result)
-        elif "[WARNING]" in result:
-            st.warning(result)
-        elif "[OK]" in result:
-            st.success(result)
-        else:
-            st.info(result)
+        VERDICT_DISPLAY[report.severity](str(report.verdict))
+        
+        # Остальные проблемы документа, чтобы исправить все за один раз
+        remaining = report.messages()[1:] if report.errors else []
+        if remaining:
+            st.markdown(f"**Also found ({len(remaining)}):**")
+            for message in remaining:
+                st.write(f"- {message}")
         
         # Показываем детальную информацию
         st.markdown("---")
         st.subheader("Detailed Validation Report")
         
-        summary = get_validation_summary(current_document)
-        
         col1, col2, col3 = st.columns(3)
         
         with col1:
@@ -220,14 +227,8 @@ elif mode == "Test Predefined Cases":
             
             with col2:
                 if st.button(f"Run Test", key=f"test_{test_name}"):
-                    result = check_rules(test_document)
-                    
-                    if "[ERROR]" in result:
-                        st.error(result)
-                    elif "[WARNING]" in result:
-                        st.warning(result)
-                    elif "[OK]" in result:
-                        st.success(result)
+                    verdict = get_validation_cache().check(test_document)
+                    VERDICT_DISPLAY[verdict.severity](str(verdict))
 
 # ========================================
 # РЕЖИМ 3: BATCH VALIDATION
@@ -259,6 +260,12 @@ if st.sidebar.checkbox("Show Current Rules"):
     rules = load_rules()
     st.sidebar.json(rules)
 
+if st.sidebar.checkbox("Show Cache Metrics"):
+    cache_stats = get_validation_cache().stats()
+    st.sidebar.metric("Cache Hit Rate", f"{cache_stats.hit_rate:.0%}")
+    st.sidebar.write(f"Entries: {cache_stats.size} / {cache_stats.maxsize}")
+    st.sidebar.write(f"Hits: {cache_stats.hits}, misses: {cache_stats.misses}")
+
 st.sidebar.markdown("---")
 st.sidebar.info("""
 **Document Flow Bot v1.0**
@@ -4,9 +4,9 @@ Streamlit интерфейс для Лабораторной работы №3:
 """
 
 import streamlit as st
-import networkx as nx
-import matplotlib.pyplot as plt
 import matplotlib
+import graph_store
+import models
 from models import (
     create_sample_departments,
     create_sample_employees,
@@ -14,15 +14,15 @@ from models import (
     Document
 )
 from knowledge_graph import (
-    create_document_flow_graph,
-    find_related_entities,
-    find_approval_chain,
-    find_who_can_sign,
-    find_documents_by_department,
-    find_employees_in_department,
-    find_signature_route,
-    get_graph_statistics
+    get_graph_statistics,
+    get_document_statistics,
+    get_query_cache,
+    graph_version
 )
+from graph_store import CompactGraph, node_objects
+from graph_snapshot import DEFAULT_SNAPSHOT_PATH, file_source_key, load_or_build
+from graph_layout import LayoutCache, effective_layout, layout_key
+from graph_render import RenderCache, FAST_PATH_THRESHOLD
 
 # Настройка для корректного отображения русских букв в графах
 matplotlib.rcParams['font.family'] = 'DejaVu Sans'
@@ -101,11 +101,35 @@ departments, employees, doc_types, documents = initialize_data()
 
 @st.cache_resource
 def create_graph():
-    """Создает граф знаний"""
-    return create_document_flow_graph(departments, employees, documents, doc_types)
+    """
+    Создает граф знаний. Структура графа загружается из снимка CompactGraph
+    (пересобирается, когда меняются models.py, graph_store.py или эта
+    страница), а nx-граф с объектами моделей, индексом и счетчиками
+    статистики восстанавливается из него через to_networkx.
+    """
+    source_key = file_source_key(models.__file__, graph_store.__file__, __file__)
+    store = load_or_build(
+        DEFAULT_SNAPSHOT_PATH,
+        source_key,
+        lambda: CompactGraph.from_objects(departments, employees, documents, doc_types)
+    )
+    return store.to_networkx(node_objects(departments, employees, documents, doc_types))
 
 G = create_graph()
 
+# Результаты запросов кэшируются и сбрасываются при изменении графа
+queries = get_query_cache(G)
+
+@st.cache_resource
+def get_layout_cache():
+    """Кэш раскладок графа, общий для всех сессий"""
+    return LayoutCache()
+
+@st.cache_resource
+def get_render_cache():
+    """Кэш готовых изображений графа, общий для всех сессий"""
+    return RenderCache()
+
 # ========================================
 # ЗАГОЛОВОК
 # ========================================
@@ -129,6 +153,15 @@ st.sidebar.markdown("**Типы узлов:**")
 for node_type, count in stats['node_types'].items():
     st.sidebar.write(f"- {node_type}: {count}")
 
+doc_stats = get_document_statistics(G)
+st.sidebar.markdown("**Документы по статусам:**")
+for status, count in doc_stats['documents_by_status'].items():
+    st.sidebar.write(f"- {status}: {count}")
+st.sidebar.metric(
+    "Недостает подписей (в среднем)",
+    f"{doc_stats['average_outstanding_signatures']:.1f}"
+)
+
 st.sidebar.markdown("---")
 
 # ========================================
@@ -168,7 +201,7 @@ with tab1:
     
     # Кнопка поиска
     if st.button("🔍 Найти связи", type="primary", use_container_width=True):
-        results = find_related_entities(G, selected_node)
+        results = queries.find_related_entities(selected_node)
         
         if results:
             st.success(f"Найдено связей: {len(results)}")
@@ -215,7 +248,7 @@ with tab2:
     )
     
     if st.button("📋 Построить маршрут", type="primary", use_container_width=True):
-        route = find_signature_route(G, selected_doc)
+        route = queries.find_signature_route(selected_doc)
         
         if route:
             # Информация о документе
@@ -306,85 +339,30 @@ with tab3:
     with col2:
         st.subheader("Граф")
         
-        # Создаем подграф с выбранными узлами
-        nodes_to_show = []
-        for node, data in G.nodes(data=True):
-            node_type = data.get('type')
-            if (node_type == 'employee' and show_employees) or \
-               (node_type == 'department' and show_departments) or \
-               (node_type == 'document' and show_documents) or \
-               (node_type == 'document_type' and show_doc_types):
-                nodes_to_show.append(node)
-        
-        subgraph = G.subgraph(nodes_to_show)
-        
-        # Рисуем граф
-        fig, ax = plt.subplots(figsize=(14, 10))
-        
-        # Выбираем раскладку
-        if layout_type == "spring":
-            pos = nx.spring_layout(subgraph, k=1, iterations=50)
-        elif layout_type == "circular":
-            pos = nx.circular_layout(subgraph)
-        elif layout_type == "kamada_kawai":
-            pos = nx.kamada_kawai_layout(subgraph)
-        else:
-            pos = nx.shell_layout(subgraph)
-        
-        # Цвета для разных типов узлов
-        color_map = {
-            'employee': '#FFB6C1',      # Розовый
-            'department': '#87CEEB',    # Голубой
-            'document': '#90EE90',      # Светло-зеленый
-            'document_type': '#FFD700'  # Золотой
+        # Видимые узлы (в большом графе документы свернуты по типам)
+        node_types = {
+            node_type for node_type, shown in (
+                ('employee', show_employees),
+                ('department', show_departments),
+                ('document', show_documents),
+                ('document_type', show_doc_types)
+            ) if shown
         }
+        # Граф для отрисовки собирается один раз на (версия графа, фильтр),
+        # раскладка - один раз на (версия графа, фильтр, алгоритм)
+        layouts = get_layout_cache()
+        version = graph_version(G)
+        subgraph = layouts.display_graph(G, version, node_types)
+        key = layout_key(version, node_types, layout_type)
+        pos = layouts.layout(subgraph, version, node_types, layout_type)
+        if effective_layout(layout_type, subgraph.number_of_nodes()) != layout_type:
+            st.caption(f"Граф слишком большой для {layout_type} - использована раскладка spring")
         
-        node_colors = [
-            color_map.get(subgraph.nodes[node].get('type'), '#CCCCCC')
-            for node in subgraph.nodes()
-        ]
-        
-        # Рисуем узлы
-        nx.draw_networkx_nodes(
-            subgraph, pos,
-            node_color=node_colors,
-            node_size=node_size,
-            alpha=0.8,
-            ax=ax
-        )
-        
-        # Рисуем ребра
-        nx.draw_networkx_edges(
-            subgraph, pos,
-            edge_color='gray',
-            alpha=0.5,
-            arrows=True,
-            arrowsize=20,
-            ax=ax
-        )
-        
-        # Рисуем подписи
-        if show_labels:
-            # Сокращаем длинные названия
-            labels = {}
-            for node in subgraph.nodes():
-                if len(node) > 20:
-                    labels[node] = node[:17] + "..."
-                else:
-                    labels[node] = node
-            
-            nx.draw_networkx_labels(
-                subgraph, pos,
-                labels=labels,
-                font_size=8,
-                font_weight='bold',
-                ax=ax
-            )
-        
-        ax.set_title("Граф знаний системы документооборота", fontsize=16, fontweight='bold')
-        ax.axis('off')
-        
-        st.pyplot(fig)
+        # Картинка рисуется один раз на (раскладка, размер узлов, подписи)
+        image = get_render_cache().render(key, subgraph, pos, node_size, show_labels)
+        if subgraph.number_of_nodes() > FAST_PATH_THRESHOLD:
+            st.caption("Большой граф: подписи и стрелки не отображаются")
+        st.image(image, use_column_width=True)
         
         # Легенда
         st.markdown("**Легенда:**")
@@ -439,7 +417,7 @@ with tab4:
                     st.write(f"- Может подписывать: {', '.join(dept.can_sign_types) if dept.can_sign_types else 'Все типы'}")
                     
                     # Сотрудники отдела
-                    dept_employees = find_employees_in_department(G, dept_name)
+                    dept_employees = queries.find_employees_in_department(dept_name)
                     st.write(f"- Сотрудников: {len(dept_employees)}")
                     st.markdown("---")
     
@@ -0,0 +1,321 @@
+"""
+Number Registry - Реестр ранее принятых номеров документов.
+
+Номер документа уникален в паре (тип документа, ИНН контрагента). Реестр
+хранит все принятые номера на диске (SQLite в data/processed), а перед ним
+стоит фильтр Блума в памяти: для номера, которого в реестре точно нет
+(обычный случай), проверка стоит нескольких хэш-зондов без обращения к
+диску. Точный поиск в SQLite выполняется только при срабатывании фильтра.
+
+Фильтр рассчитывается по числу номеров в базе с запасом (CAPACITY_HEADROOM,
+не меньше MIN_CAPACITY) с долей ложных срабатываний error_rate - около
+1,2 байта на номер при 1%. Когда номеров становится больше расчетного,
+фильтр перестраивается из базы с новым запасом.
+
+Фильтр сохраняется рядом с базой (файл .bloom) только если изменился, и
+при открытии перестраивается из базы, если не совпадает с ней по числу
+номеров.
+
+Фильтр процесса не знает о номерах, которые после его открытия добавили
+другие процессы (другие сессии Streamlit), и может ответить "точно нет"
+на уже принятый номер. Поэтому при приеме номера решает сама база:
+try_add_many возвращает, какие номера действительно добавлены, а
+отклоненная вставка означает, что номер уже принят.
+
+    with NumberRegistry() as registry:
+        seen = registry.contains_many(keys)     # до приема пакета
+        added = registry.try_add_many(accepted_keys)  # после приема пакета
+"""
+
+import hashlib
+import math
+import os
+import sqlite3
+import struct
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from duplicates import normalize_number
+from logic import BASE_DIR
+
+
+# ========================================
+# КОНСТАНТЫ
+# ========================================
+
+DEFAULT_REGISTRY_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'document_numbers.sqlite')
+
+# Емкость фильтра: номеров в базе * CAPACITY_HEADROOM, но не меньше MIN_CAPACITY
+MIN_CAPACITY = 100_000
+CAPACITY_HEADROOM = 2
+DEFAULT_ERROR_RATE = 0.01
+
+# Сколько строк базы читается за раз при перестройке фильтра
+REBUILD_BATCH_SIZE = 100_000
+
+# Колонка результата batch-валидации
+REGISTERED_COLUMN = "Ранее принят"
+
+# Вердикт документа без замечаний, номер которого уже принят
+REGISTERED_MESSAGE = "[WARNING] Document number has already been accepted"
+
+BLOOM_MAGIC = b"DFBLOOM2"
+_BLOOM_HEADER = struct.Struct("<8sQQQQ")
+
+
+class NumberKey(NamedTuple):
+    """Уникальный ключ номера: тип документа, ИНН, нормализованный номер."""
+    document_type: str
+    inn: str
+    number: str
+
+
+def number_key(document_type, inn, number) -> NumberKey:
+    """Ключ номера (номер без регистра и разделителей, как в duplicates)."""
+    return NumberKey(
+        str(document_type or "").strip(),
+        str(inn or "").strip(),
+        normalize_number(number)
+    )
+
+
+def frame_keys(df: pd.DataFrame) -> List[NumberKey]:
+    """Ключи номеров для строк чанка batch-валидации (пропуски - пустые строки)."""
+    def column(name):
+        if name not in df.columns:
+            return [None] * len(df)
+        return df[name].astype(object).where(df[name].notna(), None).to_numpy()
+
+    return [
+        number_key(doc_type, inn, number)
+        for doc_type, inn, number in zip(column("document_type"), column("inn"), column("document_number"))
+    ]
+
+
+# ========================================
+# ФИЛЬТР БЛУМА
+# ========================================
+
+class BloomFilter:
+    """
+    Фильтр Блума на битовом массиве numpy.
+
+    Позиции считаются двойным хэшированием: h1 + i * h2 (mod size) для
+    i = 0..hashes-1, где h1 и h2 - половины 128-битного BLAKE2b ключа.
+    capacity - на сколько ключей рассчитан фильтр.
+    """
+
+    def __init__(self, size: int, hashes: int, capacity: int, bits: Optional[np.ndarray] = None):
+        if size <= 0 or hashes <= 0:
+            raise ValueError(f"Invalid Bloom filter parameters: size={size}, hashes={hashes}")
+        self.size = size
+        self.hashes = hashes
+        self.capacity = capacity
+        self.bits = bits if bits is not None else np.zeros((size + 7) // 8, dtype=np.uint8)
+        self._steps = np.arange(hashes, dtype=np.uint64)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float) -> "BloomFilter":
+        """Оптимальные размер и число хэшей для capacity ключей и доли error_rate."""
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError(f"Invalid Bloom filter capacity {capacity} or error rate {error_rate}")
+        size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        hashes = max(1, round(size / capacity * math.log(2)))
+        return cls(size, hashes, capacity)
+
+    def _positions(self, keys: List[NumberKey]) -> np.ndarray:
+        digests = b"".join(
+            hashlib.blake2b("\0".join(key).encode("utf-8"), digest_size=16).digest()
+            for key in keys
+        )
+        halves = np.frombuffer(digests, dtype="<u8").reshape(-1, 2)
+        # Переполнение uint64 здесь допустимо - нужна только равномерность
+        with np.errstate(over="ignore"):
+            positions = halves[:, :1] + self._steps[None, :] * halves[:, 1:]
+        return positions % np.uint64(self.size)
+
+    def add_many(self, keys: List[NumberKey]) -> None:
+        if not keys:
+            return
+        positions = self._positions(keys).ravel()
+        masks = (1 << (positions & np.uint64(7))).astype(np.uint8)
+        np.bitwise_or.at(self.bits, positions >> np.uint64(3), masks)
+
+    def contains_many(self, keys: List[NumberKey]) -> np.ndarray:
+        """Маска "возможно есть" (False - ключа точно нет)."""
+        if not keys:
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(keys)
+        masks = (1 << (positions & np.uint64(7))).astype(np.uint8)
+        return (self.bits[positions >> np.uint64(3)] & masks).all(axis=1)
+
+    def save(self, path: str, count: int) -> None:
+        """Записывает фильтр вместе с числом ключей базы, по которой он построен."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_BLOOM_HEADER.pack(BLOOM_MAGIC, self.size, self.hashes, self.capacity, count))
+            f.write(self.bits.tobytes())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Tuple["BloomFilter", int]:
+        """
+        Читает фильтр.
+
+        Returns:
+            (фильтр, число ключей базы при сохранении)
+
+        Raises:
+            ValueError: Если файл поврежден
+        """
+        with open(path, "rb") as f:
+            header = f.read(_BLOOM_HEADER.size)
+            if len(header) < _BLOOM_HEADER.size:
+                raise ValueError(f"Bloom filter is truncated: {path}")
+            magic, size, hashes, capacity, count = _BLOOM_HEADER.unpack(header)
+            if magic != BLOOM_MAGIC:
+                raise ValueError(f"Not a Bloom filter: {path}")
+            bits = np.fromfile(f, dtype=np.uint8)
+        if len(bits) != (size + 7) // 8:
+            raise ValueError(f"Bloom filter size mismatch: {path}")
+        return cls(size, hashes, capacity, bits), count
+
+
+# ========================================
+# РЕЕСТР
+# ========================================
+
+class NumberRegistry:
+    """
+    Реестр принятых номеров документов: SQLite на диске и фильтр Блума в памяти.
+
+    Атрибуты:
+        path: Путь к базе SQLite
+        bloom: Фильтр Блума
+        disk_lookups: Сколько раз фильтр сработал и понадобился поиск в базе
+
+    capacity - минимальная емкость фильтра (по умолчанию MIN_CAPACITY).
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_REGISTRY_PATH,
+        capacity: int = MIN_CAPACITY,
+        error_rate: float = DEFAULT_ERROR_RATE
+    ):
+        self.path = path
+        self.bloom_path = f"{os.path.splitext(path)[0]}.bloom"
+        self.disk_lookups = 0
+        self.min_capacity = capacity
+        self.error_rate = error_rate
+        # Фильтр отличается от сохраненного в .bloom и должен быть записан при close()
+        self._dirty = False
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # check_same_thread=False: Streamlit может обращаться к реестру из разных потоков
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        # WAL: массовая вставка не блокирует чтение, fsync только на контрольных точках
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS numbers ("
+            " document_type TEXT NOT NULL, inn TEXT NOT NULL, number TEXT NOT NULL,"
+            " PRIMARY KEY (document_type, inn, number)"
+            ") WITHOUT ROWID"
+        )
+        self._db.commit()
+        self._count = self._db.execute("SELECT COUNT(*) FROM numbers").fetchone()[0]
+        self.bloom = self._open_bloom()
+
+    def _open_bloom(self) -> BloomFilter:
+        try:
+            bloom, count = BloomFilter.load(self.bloom_path)
+            if count == self._count and self._count <= bloom.capacity and bloom.capacity >= self.min_capacity:
+                return bloom
+        except (OSError, ValueError):
+            pass
+        # Фильтра нет, он отстал от базы или переполнен
+        return self._rebuild_bloom()
+
+    def _rebuild_bloom(self) -> BloomFilter:
+        """Строит фильтр по базе порциями с запасом по емкости."""
+        self._count = self._db.execute("SELECT COUNT(*) FROM numbers").fetchone()[0]
+        capacity = max(self.min_capacity, self._count * CAPACITY_HEADROOM)
+        bloom = BloomFilter.for_capacity(capacity, self.error_rate)
+        cursor = self._db.execute("SELECT document_type, inn, number FROM numbers")
+        while True:
+            rows = cursor.fetchmany(REBUILD_BATCH_SIZE)
+            if not rows:
+                break
+            bloom.add_many([NumberKey(*row) for row in rows])
+        self._dirty = True
+        return bloom
+
+    def __len__(self) -> int:
+        return self._count
+
+    def contains(self, key: NumberKey) -> bool:
+        return bool(self.contains_many([key])[0])
+
+    def contains_many(self, keys: Iterable[NumberKey]) -> np.ndarray:
+        """Маска ключей, которые уже есть в реестре (ответ точный)."""
+        keys = list(keys)
+        found = self.bloom.contains_many(keys)
+        for i in np.flatnonzero(found):
+            self.disk_lookups += 1
+            found[i] = self._db.execute(
+                "SELECT 1 FROM numbers WHERE document_type = ? AND inn = ? AND number = ?",
+                keys[i]
+            ).fetchone() is not None
+        return found
+
+    def try_add_many(self, keys: Iterable[NumberKey]) -> np.ndarray:
+        """
+        Добавляет номера одной транзакцией.
+
+        Returns:
+            Маска добавленных номеров: False - номер уже был в базе (в том
+            числе добавлен другим процессом после открытия реестра) или
+            повторяется выше в keys. Ответ точный независимо от фильтра
+        """
+        keys = list(keys)
+        added = np.zeros(len(keys), dtype=bool)
+        with self._db:
+            for i, key in enumerate(keys):
+                added[i] = self._db.execute("INSERT OR IGNORE INTO numbers VALUES (?, ?, ?)", key).rowcount == 1
+        self._count += int(added.sum())
+        if self._count > self.bloom.capacity:
+            # Фильтр переполнен - строим заново по базе (с новыми номерами)
+            self.bloom = self._rebuild_bloom()
+        elif keys:
+            self.bloom.add_many(keys)
+            self._dirty = True
+        return added
+
+    def add_many(self, keys: Iterable[NumberKey]) -> int:
+        """
+        Добавляет номера одной транзакцией (повторы игнорируются).
+
+        Returns:
+            Сколько номеров добавлено
+        """
+        return int(self.try_add_many(keys).sum())
+
+    def close(self) -> None:
+        """Сохраняет фильтр, если он изменился, и закрывает базу."""
+        if self._dirty:
+            try:
+                self.bloom.save(self.bloom_path, self._count)
+                self._dirty = False
+            except OSError:
+                # Нет прав на запись - при следующем открытии фильтр перестроится
+                pass
+        self._db.close()
+
+    def __enter__(self) -> "NumberRegistry":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
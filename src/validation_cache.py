@@ -0,0 +1,391 @@
+"""
+Validation Cache - Кэш результатов валидации по содержимому документа.
+
+Один и тот же документ проверяется много раз (повторные загрузки,
+перезапуски скрипта Streamlit на каждое действие пользователя). Результат
+проверки зависит только от содержимого документа, версии правил и опорной
+даты, поэтому ключ кэша - хэш этих трех составляющих.
+
+    cache = ValidationCache(maxsize=10_000, path=DEFAULT_CACHE_PATH)
+    report = cache.evaluate(document, rule_set, context)
+    cache.stats().hit_rate
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Optional
+
+from logic import (
+    BASE_DIR,
+    RuleSet,
+    Severity,
+    ValidationContext,
+    ValidationReport,
+    Verdict,
+    check_rules_verdict,
+    evaluate_document,
+    get_rule_set
+)
+
+
+# ========================================
+# КОНСТАНТЫ
+# ========================================
+
+DEFAULT_CACHE_SIZE = 10_000
+
+# Предельное число записей в дисковом хранилище (старые записи удаляются первыми)
+DEFAULT_DISK_SIZE = 1_000_000
+
+# Файл постоянного хранилища (используется, только если передан явно)
+DEFAULT_CACHE_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'validation_cache.sqlite')
+
+# Пространства ключей: короткий вердикт и полный отчет кэшируются отдельно
+KIND_VERDICT = "verdict"
+KIND_REPORT = "report"
+
+
+# ========================================
+# КЛЮЧ КЭША
+# ========================================
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    return repr(value)
+
+
+def normalize_document(document: Dict) -> str:
+    """
+    Каноническое представление документа: ключи отсортированы, кортежи
+    становятся списками, даты - ISO-строками.
+
+    Типы значений сохраняются: 15000 и 15000.0 дают разные тексты вердикта,
+    поэтому и ключи у них разные.
+    """
+    return json.dumps(
+        document,
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(',', ':'),
+        default=_json_default
+    )
+
+
+def document_key(
+    document: Dict,
+    rule_set: RuleSet,
+    context: ValidationContext,
+    kind: str = KIND_VERDICT
+) -> str:
+    """
+    Ключ кэша: SHA-1 от вида результата, версии правил, контекста и документа.
+
+    Args:
+        document: Словарь с данными документа
+        rule_set: Правила (учитывается их version)
+        context: Контекст прогона (опорная дата и порог предупреждения)
+        kind: KIND_VERDICT или KIND_REPORT
+
+    Returns:
+        Шестнадцатеричная строка хэша
+    """
+    digest = hashlib.sha1()
+    for part in (
+        kind,
+        rule_set.version,
+        context.reference_date.isoformat(),
+        context.expiry_warning_cutoff.isoformat(),
+        normalize_document(document),
+    ):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+# ========================================
+# СЕРИАЛИЗАЦИЯ (ДЛЯ ДИСКОВОГО ХРАНИЛИЩА)
+# ========================================
+
+def _verdict_to_json(verdict: Verdict) -> list:
+    return [int(verdict.severity), verdict.rule_id, [list(part) for part in verdict.parts]]
+
+
+def _verdict_from_json(data: list) -> Verdict:
+    severity, rule_id, parts = data
+    return Verdict(Severity(severity), rule_id, tuple(tuple(part) for part in parts))
+
+
+def _encode(kind: str, value: Any) -> str:
+    if kind == KIND_VERDICT:
+        return json.dumps(_verdict_to_json(value), ensure_ascii=False)
+    return json.dumps({
+        'verdict': _verdict_to_json(value.verdict),
+        'errors': [_verdict_to_json(v) for v in value.errors],
+        'warnings': [_verdict_to_json(v) for v in value.warnings],
+        'summary': value.summary,
+    }, ensure_ascii=False)
+
+
+def _decode(kind: str, text: str) -> Any:
+    data = json.loads(text)
+    if kind == KIND_VERDICT:
+        return _verdict_from_json(data)
+    return ValidationReport(
+        verdict=_verdict_from_json(data['verdict']),
+        errors=tuple(_verdict_from_json(v) for v in data['errors']),
+        warnings=tuple(_verdict_from_json(v) for v in data['warnings']),
+        summary=data['summary']
+    )
+
+
+# ========================================
+# КОПИИ РЕЗУЛЬТАТОВ
+# ========================================
+
+def _copy_json(value: Any) -> Any:
+    """Копия JSON-подобной структуры (словари и списки копируются, скаляры - нет)."""
+    if isinstance(value, dict):
+        return {key: _copy_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_json(item) for item in value]
+    return value
+
+
+def _copy_verdict(verdict: Verdict) -> Verdict:
+    # parts - кортеж кортежей строк, его можно разделять
+    return Verdict(verdict.severity, verdict.rule_id, verdict.parts)
+
+
+def copy_result(kind: str, value: Any) -> Any:
+    """
+    Копия результата для вызывающего кода: изменения копии не портят кэш.
+    Дешевле copy.deepcopy (который медленнее самой валидации).
+    """
+    if kind == KIND_VERDICT:
+        return _copy_verdict(value)
+    return ValidationReport(
+        verdict=_copy_verdict(value.verdict),
+        errors=tuple(_copy_verdict(v) for v in value.errors),
+        warnings=tuple(_copy_verdict(v) for v in value.warnings),
+        summary=_copy_json(value.summary)
+    )
+
+
+# ========================================
+# КЭШ
+# ========================================
+
+@dataclass(frozen=True)
+class CacheStats:
+    """
+    Метрики кэша.
+
+    Атрибуты:
+        hits: Попадания в памяти
+        disk_hits: Попадания в дисковом хранилище (промах в памяти)
+        misses: Промахи (результат вычислен заново)
+        evictions: Вытеснения из памяти по LRU
+        size: Записей в памяти
+        maxsize: Предельный размер в памяти
+        disk_size: Записей на диске (0, если хранилище не подключено)
+    """
+    hits: int
+    disk_hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+    disk_size: int
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.disk_hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        """Доля запросов, обслуженных без повторной валидации."""
+        return (self.hits + self.disk_hits) / self.lookups if self.lookups else 0.0
+
+
+class ValidationCache:
+    """
+    LRU-кэш результатов валидации с необязательным хранилищем в SQLite.
+
+    Потокобезопасен: Streamlit выполняет сессии в разных потоках.
+    Вызывающий код получает копии результатов (copy_result) - их можно
+    свободно изменять.
+    Хранилище на диске переживает перезапуск приложения. Записи прошлых
+    версий правил и дат по ключу больше не находятся, поэтому хранилище
+    ограничено max_disk_size записями: сверх лимита удаляются самые давно
+    записанные (FIFO по rowid).
+    """
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_CACHE_SIZE,
+        path: Optional[str] = None,
+        max_disk_size: int = DEFAULT_DISK_SIZE
+    ):
+        if maxsize <= 0:
+            raise ValueError(f"Cache size must be positive, got: {maxsize}")
+        if max_disk_size <= 0:
+            raise ValueError(f"Disk cache size must be positive, got: {max_disk_size}")
+        self.maxsize = maxsize
+        self.max_disk_size = max_disk_size
+        self.path = path
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk_size = 0
+        if path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, kind TEXT NOT NULL, value TEXT NOT NULL)"
+            )
+            self._disk_size = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            self._trim_disk()
+            self._db.commit()
+
+    # --- ОСНОВНОЙ ДОСТУП ---
+
+    def get_or_compute(self, key: str, kind: str, compute: Callable[[], Any]) -> Any:
+        """
+        Возвращает результат по ключу, вычисляя его через compute при промахе.
+
+        Вычисление выполняется вне блокировки: два потока могут одновременно
+        посчитать один и тот же документ, но результат у них одинаковый.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return copy_result(kind, self._entries[key])
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value = _decode(kind, row[0])
+                    self._disk_hits += 1
+                    self._store(key, value)
+                    return copy_result(kind, value)
+
+            self._misses += 1
+
+        value = compute()
+
+        with self._lock:
+            self._store(key, value)
+            if self._db is not None:
+                inserted = self._db.execute(
+                    "INSERT OR IGNORE INTO results (key, kind, value) VALUES (?, ?, ?)",
+                    (key, kind, _encode(kind, value))
+                ).rowcount
+                self._disk_size += inserted
+                self._trim_disk()
+                self._db.commit()
+        return copy_result(kind, value)
+
+    def _trim_disk(self) -> None:
+        """Удаляет самые старые записи хранилища сверх max_disk_size (под блокировкой)."""
+        excess = self._disk_size - self.max_disk_size
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM results WHERE rowid IN (SELECT rowid FROM results ORDER BY rowid LIMIT ?)",
+                (excess,)
+            )
+            self._disk_size -= excess
+
+    def _store(self, key: str, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def check(
+        self,
+        document: Dict,
+        rule_set: Optional[RuleSet] = None,
+        context: Optional[ValidationContext] = None
+    ) -> Verdict:
+        """Кэшированный check_rules_verdict."""
+        rules = rule_set or get_rule_set()
+        context = context or ValidationContext.create(rule_set=rules)
+        key = document_key(document, rules, context, KIND_VERDICT)
+        return self.get_or_compute(key, KIND_VERDICT, lambda: check_rules_verdict(document, rules, context))
+
+    def evaluate(
+        self,
+        document: Dict,
+        rule_set: Optional[RuleSet] = None,
+        context: Optional[ValidationContext] = None
+    ) -> ValidationReport:
+        """Кэшированный evaluate_document."""
+        rules = rule_set or get_rule_set()
+        context = context or ValidationContext.create(rule_set=rules)
+        key = document_key(document, rules, context, KIND_REPORT)
+        return self.get_or_compute(key, KIND_REPORT, lambda: evaluate_document(document, rules, context))
+
+    # --- МЕТРИКИ И ОБСЛУЖИВАНИЕ ---
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                disk_hits=self._disk_hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._entries),
+                maxsize=self.maxsize,
+                disk_size=self._disk_size
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self, disk: bool = False) -> None:
+        """Очищает кэш в памяти (и на диске, если disk=True) и сбрасывает метрики."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._disk_hits = self._misses = self._evictions = 0
+            if disk and self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+                self._disk_size = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+# ========================================
+# ОБЩИЙ КЭШ ПРОЦЕССА
+# ========================================
+
+_default_cache: Optional[ValidationCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_validation_cache() -> ValidationCache:
+    """Общий кэш в памяти (создается при первом обращении)."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ValidationCache()
+        return _default_cache
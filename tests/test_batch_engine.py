@@ -0,0 +1,215 @@
+"""
+Тесты для пакетной валидации (batch_engine).
+Проверяют, что векторизованный движок совпадает с построчным check_rules.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import io
+import pytest
+import pandas as pd
+from datetime import datetime, timedelta
+from mock_data import ALL_DOCUMENTS
+from batch_engine import (
+    validate_frame,
+    validate_rows,
+    row_to_document,
+    iter_csv_chunks,
+    validate_csv_stream,
+    validate_csv_parallel,
+    plan_byte_ranges,
+    main as batch_main
+)
+from logic import check_rules, Severity, ValidationContext
+
+
+# ========================================
+# ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ
+# ========================================
+
+CSV_COLUMNS = [
+    "document_type", "document_number", "issue_date", "expiry_date",
+    "total_amount", "inn", "is_signed"
+]
+
+
+def mock_documents_frame() -> pd.DataFrame:
+    """DataFrame из mock_data в формате CSV (через запись и чтение CSV)."""
+    rows = [
+        {column: document.get(column) for column in CSV_COLUMNS}
+        for document in ALL_DOCUMENTS.values()
+    ]
+    today = datetime.now()
+    soon = (today + timedelta(days=10)).strftime("%Y-%m-%d")
+    later = (today + timedelta(days=200)).strftime("%Y-%m-%d")
+    rows += [
+        # Актуальные даты: OK и предупреждения
+        {"document_type": "invoice", "document_number": "INV-1", "issue_date": today.strftime("%Y-%m-%d"),
+         "expiry_date": later, "total_amount": 100.0, "inn": "7743013902", "is_signed": True},
+        {"document_type": "contract", "document_number": "DOG-1", "issue_date": today.strftime("%Y-%m-%d"),
+         "expiry_date": soon, "total_amount": 9500000.0, "inn": "526317984689", "is_signed": True},
+        # Пограничные случаи
+        {"document_type": " act ", "document_number": "", "issue_date": "2024-02-30",
+         "expiry_date": later, "total_amount": 10.0, "inn": "12AB", "is_signed": "yes"},
+        {"document_type": "receipt", "document_number": "RCP-1", "issue_date": later,
+         "expiry_date": soon, "total_amount": 10.0, "inn": "", "is_signed": "1"},
+        {"document_type": "invoice", "document_number": "INV-2", "issue_date": today.strftime("%Y-%m-%d"),
+         "expiry_date": later, "total_amount": 20000000.0, "inn": "1234567890", "is_signed": "no"},
+        {"document_type": "unknown", "document_number": "X-1", "issue_date": "04-02-2024",
+         "expiry_date": "", "total_amount": 0.0, "inn": "123", "is_signed": True},
+    ]
+    csv = pd.DataFrame(rows, columns=CSV_COLUMNS).to_csv(index=False)
+    return pd.read_csv(io.StringIO(csv))
+
+
+# ========================================
+# ТЕСТЫ ВЕКТОРИЗОВАННОГО ДВИЖКА
+# ========================================
+
+class TestValidateFrame:
+    """Тесты для validate_frame"""
+    
+    def test_matches_row_by_row_check_rules(self):
+        """Тест что вердикты совпадают с построчным путем на mock_data"""
+        df = mock_documents_frame()
+        expected = validate_rows(df)
+        actual = validate_frame(df)
+        assert actual["result"].tolist() == expected["result"].tolist()
+        assert actual["severity"].tolist() == expected["severity"].tolist()
+    
+    def test_row_path_uses_check_rules(self):
+        """Тест что эталонный путь - это row_to_document + check_rules"""
+        df = mock_documents_frame()
+        expected = [check_rules(row_to_document(row)) for _, row in df.iterrows()]
+        assert validate_rows(df)["result"].tolist() == expected
+    
+    def test_matches_row_path_as_of_date(self):
+        """Тест совпадения с построчным путем при явной опорной дате"""
+        df = mock_documents_frame()
+        context = ValidationContext.create("2024-02-04")
+        expected = validate_rows(df, context=context)
+        actual = validate_frame(df, context=context)
+        assert actual["result"].tolist() == expected["result"].tolist()
+        assert Severity.WARNING in set(actual["severity"])
+    
+    def test_all_statuses_present(self):
+        """Тест что в наборе есть ошибки, предупреждения и успешные документы"""
+        severities = set(validate_frame(mock_documents_frame())["severity"])
+        assert severities == {Severity.ERROR, Severity.WARNING, Severity.OK}
+    
+    def test_missing_columns_use_defaults(self):
+        """Тест что отсутствующие колонки заполняются как в row_to_document"""
+        df = pd.DataFrame({"document_number": ["INV-1"], "issue_date": ["2024-01-01"]})
+        assert validate_frame(df)["result"].tolist() == validate_rows(df)["result"].tolist()
+    
+    def test_custom_string_rules_get_severity(self):
+        """Тест что строковые вердикты пользовательской функции получают severity"""
+        df = mock_documents_frame()
+        result = validate_rows(df, lambda document: check_rules(document))
+        assert result["severity"].tolist() == validate_rows(df)["severity"].tolist()
+    
+    def test_empty_frame(self):
+        """Тест пустого пакета"""
+        result = validate_frame(pd.DataFrame(columns=CSV_COLUMNS))
+        assert len(result) == 0
+        assert list(result.columns) == ["result", "severity"]
+    
+    def test_preserves_index(self):
+        """Тест что индекс результата совпадает с индексом входа"""
+        df = mock_documents_frame()
+        df.index = df.index + 100
+        assert (validate_frame(df).index == df.index).all()
+
+
+class TestStreamingValidation:
+    """Тесты для потоковой валидации CSV"""
+    
+    def _write_csv(self, tmp_path, copies=5):
+        df = pd.concat([mock_documents_frame()] * copies, ignore_index=True)
+        path = tmp_path / "documents.csv"
+        df.to_csv(path, index=False)
+        return str(path), df
+    
+    def test_chunked_results_match_whole_file(self, tmp_path):
+        """Тест что чанковая обработка дает те же вердикты, что и весь файл сразу"""
+        path, _ = self._write_csv(tmp_path)
+        output = str(tmp_path / "results.csv")
+        stats = validate_csv_stream(path, output, chunk_size=7)
+        
+        expected = validate_frame(pd.read_csv(path, dtype=str))
+        written = pd.read_csv(output, encoding="utf-8-sig")
+        assert written["Результат"].tolist() == expected["result"].tolist()
+        assert stats.chunks == -(-len(expected) // 7)
+    
+    def test_counters(self, tmp_path):
+        """Тест что счетчики совпадают со статусами"""
+        path, _ = self._write_csv(tmp_path)
+        stats = validate_csv_stream(path, str(tmp_path / "results.csv"), chunk_size=10)
+        counts = validate_frame(pd.read_csv(path, dtype=str))["severity"].value_counts()
+        assert stats.total == counts.sum()
+        assert (stats.ok, stats.warnings, stats.errors) == (
+            counts.get(Severity.OK, 0), counts.get(Severity.WARNING, 0), counts.get(Severity.ERROR, 0)
+        )
+    
+    def test_preview_and_error_samples_are_bounded(self, tmp_path):
+        """Тест что в памяти остаются только ограниченные выборки"""
+        path, _ = self._write_csv(tmp_path, copies=20)
+        stats = validate_csv_stream(
+            path, str(tmp_path / "results.csv"), chunk_size=13, preview_limit=5, error_limit=3
+        )
+        assert len(stats.preview_frame()) == 5
+        assert len(stats.error_samples) == 3
+    
+    def test_inn_keeps_leading_zeros(self, tmp_path):
+        """Тест что ИНН читается как строка"""
+        path = tmp_path / "documents.csv"
+        path.write_text("document_type,inn\nact,0774301390\n", encoding="utf-8")
+        chunk = next(iter_csv_chunks(str(path)))
+        assert chunk["inn"].iloc[0] == "0774301390"
+    
+    def test_cli(self, tmp_path, capsys):
+        """Тест запуска из командной строки"""
+        path, _ = self._write_csv(tmp_path, copies=1)
+        output = tmp_path / "results.csv"
+        exit_code = batch_main([path, "-o", str(output), "--chunk-size", "4"])
+        assert exit_code == 1  # в наборе есть ошибки
+        assert output.exists()
+        assert "Документов:" in capsys.readouterr().out
+
+
+class TestParallelValidation:
+    """Тесты для параллельной валидации на пуле процессов"""
+    
+    def _write_csv(self, tmp_path, copies=10):
+        df = pd.concat([mock_documents_frame()] * copies, ignore_index=True)
+        path = tmp_path / "documents.csv"
+        df.to_csv(path, index=False)
+        return str(path)
+    
+    def test_byte_ranges_cover_file(self, tmp_path):
+        """Тест что диапазоны идут подряд и покрывают все данные"""
+        path = self._write_csv(tmp_path)
+        columns, ranges = plan_byte_ranges(path, chunk_size=10)
+        assert columns[0] == "document_type"
+        assert len(ranges) > 1
+        assert all(prev[1] == cur[0] for prev, cur in zip(ranges, ranges[1:]))
+        assert ranges[-1][1] == os.path.getsize(path)
+    
+    def test_output_identical_to_streaming(self, tmp_path):
+        """Тест что параллельный режим сохраняет порядок и результат"""
+        path = self._write_csv(tmp_path)
+        stream_out = tmp_path / "stream.csv"
+        parallel_out = tmp_path / "parallel.csv"
+        stream_stats = validate_csv_stream(path, str(stream_out), chunk_size=25)
+        parallel_stats = validate_csv_parallel(path, str(parallel_out), workers=2, chunk_size=9)
+        assert parallel_out.read_bytes() == stream_out.read_bytes()
+        assert (parallel_stats.ok, parallel_stats.warnings, parallel_stats.errors) == (
+            stream_stats.ok, stream_stats.warnings, stream_stats.errors
+        )
+        assert parallel_stats.rows_per_second > 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,214 @@
+"""
+Тесты для поиска дубликатов (duplicates) и колонки "Дубликат" в batch_engine.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import io
+import random
+import pandas as pd
+from duplicates import (
+    DuplicateDetector,
+    find_duplicates,
+    edit_distance,
+    document_key,
+    is_near_duplicate,
+    normalize_number,
+    DUPLICATE_COLUMN,
+    EXACT,
+    NEAR
+)
+from batch_engine import validate_csv_stream, main as batch_main
+from models import Document
+
+
+# ========================================
+# ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ
+# ========================================
+
+def invoice(number="INV-2024-001", inn="7707083893", amount="15000.00", issued="2024-01-15"):
+    """Документ в формате словаря batch/check_rules."""
+    return {
+        "document_type": "invoice",
+        "document_number": number,
+        "inn": inn,
+        "total_amount": amount,
+        "issue_date": issued,
+    }
+
+
+def numbered_invoices(count, seed=0):
+    """Последовательно пронумерованные документы разных контрагентов и сумм."""
+    rnd = random.Random(seed)
+    return [
+        invoice(
+            number=f"INV-{i:07d}",
+            inn=str(7700000000 + rnd.randrange(20)),
+            amount=f"{rnd.uniform(100, 1_000_000):.2f}",
+        )
+        for i in range(count)
+    ]
+
+
+def scan_duplicates(documents):
+    """Эталон: попарное сравнение с каждым более ранним документом."""
+    keys = [document_key(d) for d in documents]
+    found = {}
+    for i, key in enumerate(keys):
+        for j in range(i):
+            if keys[j] == key:
+                found[i] = EXACT
+                break
+        else:
+            for j in range(i):
+                if is_near_duplicate(key, keys[j]):
+                    found[i] = NEAR
+                    break
+    return found
+
+
+# ========================================
+# СРАВНЕНИЕ
+# ========================================
+
+class TestComparison:
+    """Тесты для правил сравнения документов"""
+
+    def test_edit_distance(self):
+        """Тест расстояния Левенштейна с обрезкой"""
+        assert edit_distance("INV001", "INV001", 2) == 0
+        assert edit_distance("INV001", "INV002", 2) == 1
+        assert edit_distance("INV001", "IV001", 2) == 1
+        assert edit_distance("INV001", "XYZ999", 2) == 3
+
+    def test_normalize_number(self):
+        """Тест что регистр и разделители в номере не важны"""
+        assert normalize_number("inv-2024 / 001") == normalize_number("INV2024001")
+        assert normalize_number(None) == ""
+
+    def test_document_key_from_model(self):
+        """Тест что модель Document и словарь дают одинаковый ключ"""
+        model = Document(
+            document_number="INV-2024-001",
+            document_type="invoice",
+            author="Иванов И.И.",
+            department="Бухгалтерия",
+            issue_date="2024-01-15",
+            inn="7707083893",
+            total_amount=15000.0
+        )
+        assert document_key(model) == document_key(invoice())
+
+
+# ========================================
+# ДЕТЕКТОР
+# ========================================
+
+class TestDuplicateDetector:
+    """Тесты для DuplicateDetector"""
+
+    def test_exact_duplicate(self):
+        """Тест точного дубликата"""
+        detector = DuplicateDetector()
+        assert detector.add(invoice()) is None
+        match = detector.add(invoice())
+        assert match.kind == EXACT
+        assert match.duplicate_of == 0
+        assert str(match) == "Дубликат INV-2024-001"
+
+    def test_typo_in_number(self):
+        """Тест почти-дубликата с опечаткой в номере"""
+        detector = DuplicateDetector()
+        detector.add(invoice())
+        match = detector.add(invoice(number="INV-2O24-001"))
+        assert match.kind == NEAR
+        assert str(match) == "Возможный дубликат INV-2024-001"
+
+    def test_shifted_date_and_rounded_amount(self):
+        """Тест почти-дубликата со сдвинутой датой и округленной суммой"""
+        detector = DuplicateDetector()
+        detector.add(invoice())
+        assert detector.add(invoice(amount="15100", issued="2024-01-20")).kind == NEAR
+
+    def test_limits(self):
+        """Тест что слишком далекие документы дубликатами не считаются"""
+        detector = DuplicateDetector()
+        detector.add(invoice())
+        assert detector.add(invoice(inn="7707083894")) is None
+        assert detector.add(invoice(amount="16000")) is None
+        assert detector.add(invoice(issued="2024-02-15")) is None
+        assert detector.add(invoice(number="INV-2099-999")) is None
+
+    def test_without_inn_only_exact(self):
+        """Тест что без ИНН ищутся только точные дубликаты"""
+        detector = DuplicateDetector()
+        detector.add(invoice(inn=""))
+        assert detector.add(invoice(inn="", number="INV-2024-002")) is None
+        assert detector.add(invoice(inn="")).kind == EXACT
+
+    def test_empty_numbers_not_near(self):
+        """Тест что документы без номера не считаются почти-дубликатами"""
+        assert not is_near_duplicate(document_key(invoice(number="")), document_key(invoice(number="--")))
+        detector = DuplicateDetector()
+        detector.add(invoice(number=""))
+        assert detector.add(invoice(number=" ", amount="15100")) is None
+        assert detector.add(invoice(number="")).kind == EXACT
+
+    def test_agrees_with_pairwise_scan(self):
+        """
+        Тест на случайных данных: все найденные совпадения подтверждаются
+        попарным сравнением, а внесенные копии и опечатки находятся все
+        """
+        documents = numbered_invoices(1500, seed=3)
+        rnd = random.Random(4)
+        planted = {}
+        for source in rnd.sample(documents, 60):
+            typo = dict(source, document_number=source["document_number"][:-1] + "X")
+            planted[len(documents)] = NEAR
+            documents.append(typo)
+            planted[len(documents)] = EXACT
+            documents.append(dict(source))
+
+        expected = scan_duplicates(documents)
+        actual = {match.index: match.kind for match in find_duplicates(documents)}
+        assert all(expected.get(index) == kind for index, kind in actual.items())
+        assert all(actual.get(index) == kind for index, kind in planted.items())
+
+
+# ========================================
+# ИНТЕГРАЦИЯ С BATCH
+# ========================================
+
+class TestBatchDuplicates:
+    """Тесты колонки "Дубликат" в потоковой валидации"""
+
+    def csv(self, documents):
+        return pd.DataFrame(documents).to_csv(index=False)
+
+    def test_duplicates_across_chunks(self, tmp_path):
+        """Тест что дубликаты находятся между чанками"""
+        documents = [invoice(), invoice(number="INV-2024-777", inn="1234567890"), invoice()]
+        output = tmp_path / "out.csv"
+        stats = validate_csv_stream(
+            io.StringIO(self.csv(documents)), str(output), chunk_size=1,
+            duplicates=DuplicateDetector()
+        )
+        results = pd.read_csv(output, keep_default_na=False)
+        assert results[DUPLICATE_COLUMN].tolist() == ["", "", "Дубликат INV-2024-001"]
+        assert stats.duplicates == 1
+
+    def test_column_absent_by_default(self, tmp_path):
+        """Тест что без детектора выгрузка не меняется"""
+        output = tmp_path / "out.csv"
+        validate_csv_stream(io.StringIO(self.csv([invoice(), invoice()])), str(output))
+        assert DUPLICATE_COLUMN not in pd.read_csv(output).columns
+
+    def test_cli(self, tmp_path, capsys):
+        """Тест флага --duplicates в CLI"""
+        source = tmp_path / "in.csv"
+        source.write_text(self.csv([invoice(), invoice()]), encoding="utf-8")
+        output = tmp_path / "out.csv"
+        batch_main([str(source), "-o", str(output), "--duplicates", "--workers", "4"])
+        assert "Дубликаты:       1" in capsys.readouterr().out
@@ -0,0 +1,185 @@
+"""
+Тесты для извлечения сущностей из текстов (entity_extraction).
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import io
+import json
+import re
+import pytest
+from entity_extraction import (
+    EntityMatcher,
+    extract_document,
+    extract_files,
+    iter_text_files,
+    sample_text,
+    trie_pattern,
+    main as extraction_main
+)
+from logic import RuleSet, ValidationContext, check_rules, get_rule_set
+from models import create_sample_employees
+
+
+# ========================================
+# ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ
+# ========================================
+
+INVOICE_TEXT = """\
+Счет-фактура № INV-2024-0001 от 04.02.2024
+Продавец: ООО "Ромашка", ИНН 7743013902
+Итого: 15 000,50 руб.
+Счет действителен до 2099-03-20.
+Подписано ЭЦП: Иванова М.П.
+"""
+
+
+def write_texts(directory, count):
+    """Записывает count синтетических документов в directory."""
+    employees = create_sample_employees()
+    for i in range(count):
+        (directory / f"doc_{i:03d}.txt").write_text(sample_text(i, employees), encoding="utf-8")
+
+
+# ========================================
+# ИЗВЛЕЧЕНИЕ
+# ========================================
+
+class TestExtractDocument:
+    """Тесты для extract_document"""
+
+    def test_invoice(self):
+        """Тест извлечения всех полей счета"""
+        document = extract_document(INVOICE_TEXT)
+        assert document["document_type"] == "invoice"
+        assert document["document_number"] == "INV-2024-0001"
+        assert document["issue_date"] == "2024-02-04"
+        assert document["expiry_date"] == "2099-03-20"
+        assert document["total_amount"] == 15000.50
+        assert document["inn"] == "7743013902"
+        assert document["is_signed"] is True
+        assert document["signed_by"] == ["Иванова Мария Петровна"]
+
+    def test_compatible_with_check_rules(self):
+        """Тест что результат проходит check_rules"""
+        assert check_rules(extract_document(INVOICE_TEXT)).startswith("[OK]")
+
+    def test_without_expiry_passes_check_rules(self):
+        """Тест что документ без срока действия не получает ошибку пустой даты"""
+        document = extract_document(INVOICE_TEXT.replace("Счет действителен до 2099-03-20.\n", ""))
+        assert "expiry_date" not in document
+        assert check_rules(document).startswith("[OK]")
+
+    def test_optional_fields_absent(self):
+        """Тест что ненайденные необязательные поля не попадают в словарь"""
+        document = extract_document("Акт № A-1 от 2024-04-01")
+        assert not {"expiry_date", "total_amount", "inn"} & set(document)
+
+    def test_date_formats(self):
+        """Тест дат в форматах YYYY-MM-DD, DD.MM.YYYY и "1 апреля 2024" """
+        assert extract_document("Акт от 2024-04-01")["issue_date"] == "2024-04-01"
+        assert extract_document("Акт от 01.04.2024")["issue_date"] == "2024-04-01"
+        assert extract_document("Акт от 1 апреля 2024 г.")["issue_date"] == "2024-04-01"
+
+    def test_inn_lengths(self):
+        """Тест ИНН из 10 и 12 цифр и отказа для других длин"""
+        assert extract_document("ИНН: 526317984689")["inn"] == "526317984689"
+        assert extract_document("ИНН 7743013902")["inn"] == "7743013902"
+        assert "inn" not in extract_document("ИНН 77430139021")
+
+    def test_not_signed(self):
+        """Тест отметки "не подписан" """
+        document = extract_document("Договор № 15/А. Не подписан. Петров С.И.")
+        assert document["is_signed"] is False
+        assert document["persons"] == ["Петров Сергей Иванович"]
+        assert document["signed_by"] == []
+
+    def test_type_keyword_not_inside_word(self):
+        """Тест что "акт" не находится внутри слова "актуальный" """
+        assert extract_document("Актуальный перечень. Договор № 1")["document_type"] == "contract"
+
+    def test_empty_text(self):
+        """Тест пустого текста"""
+        document = extract_document("")
+        assert document["document_number"] == ""
+        assert document["is_signed"] is False
+
+
+# ========================================
+# СЛОВАРЬ ИМЕН
+# ========================================
+
+class TestEntityMatcher:
+    """Тесты для EntityMatcher и trie_pattern"""
+
+    def test_trie_pattern_prefers_longest(self):
+        """Тест что из слов с общим префиксом выбирается самое длинное"""
+        pattern = re.compile(trie_pattern(["акт", "акты", "договор"]))
+        assert pattern.fullmatch("акты")
+        assert pattern.match("актыы").group() == "акты"
+        assert pattern.fullmatch("договор")
+        assert not pattern.fullmatch("ак")
+
+    def test_name_variants(self):
+        """Тест полного ФИО и сокращений"""
+        matcher = EntityMatcher(["Иванова Мария Петровна"])
+        text = "Иванова Мария Петровна, Иванова М.П., М. П. Иванова, Иванов"
+        assert [name for _, name in matcher.find_names(text)] == ["Иванова Мария Петровна"] * 3
+
+    def test_empty_dictionary(self):
+        """Тест пустого словаря"""
+        assert EntityMatcher().find_names("Иванова М.П.") == []
+
+
+# ========================================
+# КОНВЕЙЕР
+# ========================================
+
+class TestExtractFiles:
+    """Тесты для extract_files"""
+
+    def test_stream_output(self, tmp_path):
+        """Тест что каждый файл дает строку JSON Lines в исходном порядке"""
+        write_texts(tmp_path, 10)
+        out = io.StringIO()
+        stats = extract_files(iter_text_files([str(tmp_path)]), out, files_per_task=3, validate=True)
+        documents = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert stats.files == 10
+        assert stats.bytes == sum(os.path.getsize(d["source"]) for d in documents)
+        assert [os.path.basename(d["source"]) for d in documents] == [f"doc_{i:03d}.txt" for i in range(10)]
+        assert all("verdict" in d for d in documents)
+
+    def test_parallel_matches_single_process(self, tmp_path):
+        """Тест что пул процессов дает тот же результат"""
+        write_texts(tmp_path, 20)
+        paths = list(iter_text_files([str(tmp_path)]))
+        single, parallel = io.StringIO(), io.StringIO()
+        extract_files(paths, single, files_per_task=3)
+        stats = extract_files(paths, parallel, workers=2, files_per_task=3)
+        assert parallel.getvalue() == single.getvalue()
+        assert stats.mb_per_second_per_core == pytest.approx(stats.mb_per_second / 2)
+
+    def test_rule_set_and_context_in_workers(self, tmp_path):
+        """Тест что rule_set и context доходят до рабочих процессов"""
+        write_texts(tmp_path, 6)
+        paths = list(iter_text_files([str(tmp_path)]))
+        raw = dict(get_rule_set().raw, document_types={"allowed": [], "blacklisted": []})
+        rules = RuleSet.from_dict(raw)
+        context = ValidationContext.create("2024-02-04", rule_set=rules)
+        single, parallel = io.StringIO(), io.StringIO()
+        extract_files(paths, single, validate=True, rule_set=rules, context=context, files_per_task=2)
+        extract_files(paths, parallel, workers=2, validate=True, rule_set=rules, context=context, files_per_task=2)
+        assert parallel.getvalue() == single.getvalue()
+        documents = [json.loads(line) for line in parallel.getvalue().splitlines()]
+        assert all(d["verdict"] == check_rules(d, rules, context) for d in documents)
+        assert any(d["verdict"].startswith(rules.messages["error_invalid_type"]) for d in documents)
+
+    def test_cli(self, tmp_path, capsys):
+        """Тест CLI"""
+        write_texts(tmp_path, 3)
+        output = tmp_path / "out.jsonl"
+        assert extraction_main([str(tmp_path), "-o", str(output)]) == 0
+        assert len(output.read_text(encoding="utf-8").splitlines()) == 3
+        assert "МБ/с на процесс" in capsys.readouterr().out
@@ -0,0 +1,110 @@
+"""
+Тесты для выгрузки результатов пакетной валидации в Excel (excel_export).
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import io
+import pandas as pd
+from openpyxl import load_workbook
+from batch_engine import validate_csv_stream, main as batch_main, RESULT_COLUMNS
+from duplicates import DuplicateDetector, DUPLICATE_COLUMN
+from excel_export import export_results_excel, main as export_main
+
+
+# ========================================
+# ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ
+# ========================================
+
+def documents_csv(count=9):
+    """CSV пакета: по трети документов с ошибками, предупреждениями и без замечаний."""
+    rows = []
+    for i in range(count):
+        kind = i % 3
+        rows.append({
+            "document_type": "draft" if kind == 0 else "invoice",
+            "document_number": f"INV-{i}",
+            "issue_date": "2024-01-15",
+            "expiry_date": "2099-01-15",
+            "total_amount": 9_500_000.0 if kind == 1 else 1000.5,
+            "inn": "7707083893",
+            "is_signed": "True",
+        })
+    return pd.DataFrame(rows).to_csv(index=False)
+
+
+def validated(tmp_path, count=9, **kwargs):
+    """Путь к CSV результатов валидации documents_csv(count)."""
+    output = tmp_path / "results.csv"
+    validate_csv_stream(io.StringIO(documents_csv(count)), str(output), **kwargs)
+    return str(output)
+
+
+def sheet_rows(path, title):
+    workbook = load_workbook(path, read_only=True)
+    return [list(row) for row in workbook[title].iter_rows(values_only=True)]
+
+
+# ========================================
+# ТЕСТЫ
+# ========================================
+
+class TestExcelExport:
+    """Тесты для export_results_excel"""
+
+    def test_sheets_by_status(self, tmp_path):
+        """Тест что строки разложены по листам статусов"""
+        xlsx = str(tmp_path / "results.xlsx")
+        summary = export_results_excel(validated(tmp_path), xlsx)
+
+        assert load_workbook(xlsx, read_only=True).sheetnames == ["Сводка", "Ошибки", "Предупреждения", "OK"]
+        assert (summary.total, summary.errors, summary.warnings, summary.ok) == (9, 3, 3, 3)
+        errors = sheet_rows(xlsx, "Ошибки")
+        assert errors[0] == RESULT_COLUMNS
+        assert [row[0] for row in errors[1:]] == ["INV-0", "INV-3", "INV-6"]
+        assert len(sheet_rows(xlsx, "OK")) == 4
+
+    def test_amount_is_numeric(self, tmp_path):
+        """Тест что сумма пишется числом"""
+        xlsx = str(tmp_path / "results.xlsx")
+        export_results_excel(validated(tmp_path), xlsx)
+        assert sheet_rows(xlsx, "OK")[1][3] == 1000.5
+
+    def test_summary_sheet(self, tmp_path):
+        """Тест сводки, включая колонку дубликатов"""
+        xlsx = str(tmp_path / "results.xlsx")
+        summary = export_results_excel(validated(tmp_path, duplicates=DuplicateDetector()), xlsx)
+        values = {row[0]: row[1] for row in sheet_rows(xlsx, "Сводка")[1:]}
+        assert values["Всего документов"] == 9
+        assert values["❌ Ошибки"] == 3
+        assert values[DUPLICATE_COLUMN] == summary.flagged[DUPLICATE_COLUMN]
+
+    def test_sheet_overflow(self, tmp_path):
+        """Тест переноса строк на следующий лист после лимита"""
+        xlsx = str(tmp_path / "results.xlsx")
+        export_results_excel(validated(tmp_path, count=30), xlsx, chunk_size=4, max_sheet_rows=4)
+        workbook = load_workbook(xlsx, read_only=True)
+        assert "Ошибки (3)" in workbook.sheetnames
+        assert sum(
+            len(sheet_rows(xlsx, title)) - 1 for title in workbook.sheetnames if title.startswith("Ошибки")
+        ) == 10
+
+    def test_empty_results(self, tmp_path):
+        """Тест пустого CSV результатов"""
+        source = tmp_path / "results.csv"
+        source.write_text(",".join(RESULT_COLUMNS) + "\n", encoding="utf-8-sig")
+        xlsx = str(tmp_path / "results.xlsx")
+        assert export_results_excel(str(source), xlsx).total == 0
+        assert sheet_rows(xlsx, "OK") == [RESULT_COLUMNS]
+
+    def test_cli(self, tmp_path, capsys):
+        """Тест CLI excel_export и флага --excel в batch_engine"""
+        source = tmp_path / "in.csv"
+        source.write_text(documents_csv(), encoding="utf-8")
+        xlsx = tmp_path / "batch.xlsx"
+        batch_main([str(source), "-o", str(tmp_path / "out.csv"), "--excel", str(xlsx)])
+        assert xlsx.exists()
+        assert export_main([str(tmp_path / "out.csv"), "-o", str(tmp_path / "again.xlsx")]) == 0
+        assert "Строк: 9" in capsys.readouterr().out
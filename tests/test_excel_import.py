@@ -0,0 +1,162 @@
+"""
+Тесты для потокового чтения документов из Excel (excel_import).
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import io
+from datetime import datetime
+import pandas as pd
+from openpyxl import Workbook
+from batch_engine import iter_csv_chunks, validate_csv_stream, main as batch_main
+from excel_import import cell_to_str, iter_xlsx_chunks, sheet_names, validate_xlsx_stream
+
+
+# ========================================
+# ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ
+# ========================================
+
+HEADER = [
+    "document_type", "document_number", "issue_date", "expiry_date",
+    "total_amount", "inn", "is_signed",
+]
+
+
+def document_row(i):
+    """Строка документа с типами ячеек, как в выгрузке бухгалтерии."""
+    return [
+        "draft" if i % 3 == 0 else "invoice",
+        f"INV-{i}",
+        datetime(2024, 1, 15),
+        "2099-01-15",
+        1000.5 if i % 3 != 1 else 9_500_000,
+        7707083893,
+        True,
+    ]
+
+
+def csv_row(i):
+    """Та же строка, как она выглядит в CSV."""
+    return [
+        "draft" if i % 3 == 0 else "invoice",
+        f"INV-{i}",
+        "2024-01-15",
+        "2099-01-15",
+        "1000.5" if i % 3 != 1 else "9500000",
+        "7707083893",
+        "True",
+    ]
+
+
+def write_workbook(path, sheets):
+    """Книга write_only: sheets - {имя листа: строки вместе с заголовком}."""
+    workbook = Workbook(write_only=True)
+    for title, rows in sheets.items():
+        sheet = workbook.create_sheet(title)
+        for row in rows:
+            sheet.append(row)
+    workbook.save(path)
+    return str(path)
+
+
+# ========================================
+# ЯЧЕЙКИ
+# ========================================
+
+class TestCellToStr:
+    """Тесты для cell_to_str"""
+
+    def test_values(self):
+        """Тест преобразования типов ячеек в строки CSV"""
+        assert cell_to_str(datetime(2024, 1, 15, 0, 0)) == "2024-01-15"
+        assert cell_to_str(7707083893.0) == "7707083893"
+        assert cell_to_str(1000.5) == "1000.5"
+        assert cell_to_str(True) == "True"
+        assert cell_to_str("0012345678") == "0012345678"
+
+    def test_empty(self):
+        """Тест пустых ячеек"""
+        assert cell_to_str(None) is None
+        assert cell_to_str("   ") is None
+
+
+# ========================================
+# ЧТЕНИЕ ЧАНКАМИ
+# ========================================
+
+class TestIterXlsxChunks:
+    """Тесты для iter_xlsx_chunks"""
+
+    def test_same_as_csv(self, tmp_path):
+        """Тест что чанки совпадают с чанками того же пакета из CSV"""
+        path = write_workbook(tmp_path / "docs.xlsx", {"Docs": [HEADER] + [document_row(i) for i in range(10)]})
+        csv = pd.DataFrame([csv_row(i) for i in range(10)], columns=HEADER).to_csv(index=False)
+
+        xlsx_chunks = list(iter_xlsx_chunks(path, chunk_size=4))
+        csv_chunks = list(iter_csv_chunks(io.StringIO(csv), chunk_size=4))
+        assert [len(c) for c in xlsx_chunks] == [4, 4, 2]
+        for xlsx_chunk, csv_chunk in zip(xlsx_chunks, csv_chunks):
+            pd.testing.assert_frame_equal(xlsx_chunk.reset_index(drop=True), csv_chunk.reset_index(drop=True))
+
+    def test_sheets(self, tmp_path):
+        """Тест чтения нескольких листов и пропуска листов без колонок документов"""
+        path = write_workbook(tmp_path / "docs.xlsx", {
+            "Январь": [HEADER] + [document_row(i) for i in range(3)],
+            "Комментарии": [["Комментарий"], ["сверено"]],
+            "Февраль": [HEADER] + [document_row(i) for i in range(3, 5)],
+        })
+        assert sheet_names(path) == ["Январь", "Комментарии", "Февраль"]
+        numbers = pd.concat(iter_xlsx_chunks(path))["document_number"].tolist()
+        assert numbers == [f"INV-{i}" for i in range(5)]
+        only = pd.concat(iter_xlsx_chunks(path, sheets=["Февраль"]))
+        assert only["document_number"].tolist() == ["INV-3", "INV-4"]
+
+    def test_empty_cells_and_rows(self, tmp_path):
+        """Тест пустых ячеек (NaN), пустых строк и колонок без заголовка"""
+        path = write_workbook(tmp_path / "docs.xlsx", {"Docs": [
+            HEADER[:2] + [None],
+            ["invoice", None, "мусор"],
+            [None, None, None],
+            ["act", "A-1"],
+        ]})
+        chunk = next(iter_xlsx_chunks(path))
+        assert list(chunk.columns) == HEADER[:2]
+        assert len(chunk) == 2
+        assert pd.isna(chunk.loc[0, "document_number"])
+        assert chunk.loc[1, "document_number"] == "A-1"
+
+
+# ========================================
+# ВАЛИДАЦИЯ
+# ========================================
+
+class TestValidateXlsxStream:
+    """Тесты для validate_xlsx_stream"""
+
+    def test_same_stats_as_csv(self, tmp_path):
+        """Тест что .xlsx и CSV того же пакета дают одинаковый результат"""
+        path = write_workbook(tmp_path / "docs.xlsx", {"Docs": [HEADER] + [document_row(i) for i in range(12)]})
+        csv = pd.DataFrame([csv_row(i) for i in range(12)], columns=HEADER).to_csv(index=False)
+
+        xlsx_stats = validate_xlsx_stream(path, str(tmp_path / "xlsx.csv"), chunk_size=5)
+        csv_stats = validate_csv_stream(io.StringIO(csv), str(tmp_path / "csv.csv"), chunk_size=5)
+        assert (xlsx_stats.total, xlsx_stats.ok, xlsx_stats.warnings, xlsx_stats.errors) == \
+            (csv_stats.total, csv_stats.ok, csv_stats.warnings, csv_stats.errors)
+        assert (tmp_path / "xlsx.csv").read_bytes() == (tmp_path / "csv.csv").read_bytes()
+
+    def test_file_object(self, tmp_path):
+        """Тест чтения из файлового объекта (загрузка Streamlit)"""
+        path = write_workbook(tmp_path / "docs.xlsx", {"Docs": [HEADER] + [document_row(i) for i in range(3)]})
+        with open(path, "rb") as f:
+            stats = validate_xlsx_stream(io.BytesIO(f.read()), str(tmp_path / "out.csv"))
+        assert stats.total == 3
+
+    def test_cli(self, tmp_path, capsys):
+        """Тест CLI batch_engine с .xlsx на входе (в одном процессе)"""
+        path = write_workbook(tmp_path / "docs.xlsx", {"Docs": [HEADER] + [document_row(i) for i in range(6)]})
+        batch_main([path, "-o", str(tmp_path / "out.csv"), "--workers", "2"])
+        out = capsys.readouterr().out
+        assert "Документов: 6" in out
+        assert "процессов: 1" in out
@@ -0,0 +1,131 @@
+"""
+Тесты для раскладок графа (graph_layout).
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+from unittest.mock import patch
+import graph_layout
+from graph_layout import (
+    LayoutCache,
+    aggregate_documents,
+    compute_layout,
+    display_graph,
+    visible_subgraph,
+    effective_layout,
+    DOCUMENT_GROUP,
+    EMPLOYEE_GROUP,
+    KAMADA_KAWAI_MAX_NODES
+)
+from knowledge_graph import create_document_flow_graph, graph_version, update_status
+from tests.test_knowledge_graph import random_org, sample_graph
+
+ALL_TYPES = {'employee', 'department', 'document', 'document_type'}
+
+
+class TestLayoutCache:
+    """Тесты для LayoutCache"""
+
+    def test_cached_per_key(self):
+        """Тест что повторный запрос не пересчитывает раскладку"""
+        graph = sample_graph()
+        cache = LayoutCache()
+        with patch.object(graph_layout, 'compute_layout', wraps=compute_layout) as compute:
+            first = cache.layout(graph, graph_version(graph), ALL_TYPES, "spring")
+            second = cache.layout(graph, graph_version(graph), set(ALL_TYPES), "spring")
+            assert compute.call_count == 1
+            assert first is second
+
+            cache.layout(graph, graph_version(graph), ALL_TYPES, "circular")
+            assert compute.call_count == 2
+
+    def test_version_changes_key(self):
+        """Тест что изменение графа дает новую раскладку"""
+        graph = sample_graph()
+        cache = LayoutCache()
+        cache.layout(graph, graph_version(graph), ALL_TYPES, "spring")
+        update_status(graph, "ACT-2024-032", "pending")
+        assert (graph_version(graph), frozenset(ALL_TYPES), "spring") not in cache
+        cache.layout(graph, graph_version(graph), ALL_TYPES, "spring")
+        assert len(cache) == 2
+
+    def test_filter_change_starts_from_previous(self):
+        """Тест что при смене фильтра расчет стартует с предыдущих позиций"""
+        graph = sample_graph()
+        cache = LayoutCache()
+        full = cache.layout(graph, 0, ALL_TYPES, "spring")
+        view = visible_subgraph(graph, {'employee', 'department'})
+        with patch.object(graph_layout, 'compute_layout', wraps=compute_layout) as compute:
+            pos = cache.layout(view, 0, {'employee', 'department'}, "spring")
+            assert compute.call_args.args[2] is full
+        assert set(pos) == set(view.nodes)
+
+    def test_lru_eviction(self):
+        """Тест вытеснения старых раскладок"""
+        graph = sample_graph()
+        cache = LayoutCache(maxsize=2)
+        for layout in ("circular", "shell", "spring"):
+            cache.layout(graph, 0, ALL_TYPES, layout)
+        assert len(cache) == 2
+        assert (0, frozenset(ALL_TYPES), "circular") not in cache
+
+    def test_display_graph_cached(self):
+        """Тест что граф для отрисовки собирается один раз на (версию, фильтр)"""
+        graph = create_document_flow_graph(*random_org(3, documents=600))
+        cache = LayoutCache()
+        with patch.object(graph_layout, 'display_graph', wraps=display_graph) as build:
+            first = cache.display_graph(graph, graph_version(graph), ALL_TYPES)
+            second = cache.display_graph(graph, graph_version(graph), set(ALL_TYPES))
+            assert build.call_count == 1
+            assert first is second
+            assert any(t == DOCUMENT_GROUP for _, t in first.nodes(data='type'))
+
+            cache.display_graph(graph, graph_version(graph), {'employee', 'department'})
+            assert build.call_count == 2
+            document = next(n for n, t in graph.nodes(data='type') if t == 'document')
+            update_status(graph, document, "approved")
+            cache.display_graph(graph, graph_version(graph), ALL_TYPES)
+            assert build.call_count == 3
+
+    def test_unknown_layout(self):
+        with pytest.raises(ValueError):
+            compute_layout(sample_graph(), "random")
+
+
+class TestLargeGraphs:
+    """Тесты свернутого вида для больших графов"""
+
+    def test_aggregate_documents(self):
+        """Тест свертки документов по типам"""
+        graph = create_document_flow_graph(*random_org(0, documents=400))
+        view = aggregate_documents(graph)
+        groups = [n for n, t in view.nodes(data='type') if t == DOCUMENT_GROUP]
+        assert not [n for n, t in view.nodes(data='type') if t == 'document']
+        assert sum(view.nodes[g]['count'] for g in groups) == 400
+        invoice = next(g for g in groups if view.nodes[g]['key'] == 'invoice')
+        assert view.has_edge(invoice, "type_invoice")
+
+    def test_display_graph_threshold(self):
+        """Тест что маленький граф не сворачивается, а большой - сворачивается"""
+        small = sample_graph()
+        assert set(display_graph(small, ALL_TYPES)) == set(small)
+        large = create_document_flow_graph(*random_org(0, documents=400))
+        view = display_graph(large, ALL_TYPES)
+        assert view.number_of_nodes() < 100
+        assert {t for _, t in view.nodes(data='type')} == {
+            DOCUMENT_GROUP, EMPLOYEE_GROUP, 'department', 'document_type'
+        }
+        assert display_graph(large, {'document', 'department'}).number_of_nodes() < 100
+
+    def test_kamada_kawai_fallback(self):
+        """Тест замены kamada_kawai на spring для большого графа"""
+        assert effective_layout("kamada_kawai", KAMADA_KAWAI_MAX_NODES + 1) == "spring"
+        assert effective_layout("kamada_kawai", 10) == "kamada_kawai"
+        assert effective_layout("circular", 10 ** 6) == "circular"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,108 @@
+"""
+Тесты для отрисовки графа (graph_render).
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+import networkx as nx
+from unittest.mock import patch
+import graph_render
+from graph_render import (
+    RenderCache,
+    render_graph,
+    short_label,
+    FAST_PATH_THRESHOLD,
+    LABEL_MAX_LENGTH
+)
+from graph_layout import compute_layout, layout_key
+from tests.test_knowledge_graph import sample_graph
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def large_graph():
+    graph = nx.gnm_random_graph(FAST_PATH_THRESHOLD + 100, 1200, seed=1, directed=True)
+    nx.set_node_attributes(graph, 'document', 'type')
+    return nx.relabel_nodes(graph, str)
+
+
+class TestRenderGraph:
+    """Тесты для render_graph"""
+
+    def test_png_and_svg(self):
+        """Тест форматов изображения"""
+        graph = sample_graph()
+        pos = compute_layout(graph, "circular")
+        assert render_graph(graph, pos, fmt="png").startswith(PNG_SIGNATURE)
+        assert b"<svg" in render_graph(graph, pos, fmt="svg")[:500]
+        with pytest.raises(ValueError):
+            render_graph(graph, pos, fmt="gif")
+
+    def test_fast_path_skips_labels_and_arrows(self):
+        """Тест что большой граф рисуется без подписей и стрелок"""
+        graph = large_graph()
+        pos = compute_layout(graph, "circular")
+        with patch.object(graph_render.nx, 'draw_networkx_labels') as labels, \
+                patch.object(graph_render.nx, 'draw_networkx_edges') as edges:
+            assert render_graph(graph, pos, show_labels=True).startswith(PNG_SIGNATURE)
+        labels.assert_not_called()
+        edges.assert_not_called()
+
+    def test_empty_graph(self):
+        assert render_graph(nx.DiGraph(), {}).startswith(PNG_SIGNATURE)
+
+    def test_figures_are_not_leaked(self):
+        """Тест что фигуры не остаются в реестре pyplot"""
+        import matplotlib.pyplot as plt
+        before = len(plt.get_fignums())
+        graph = sample_graph()
+        render_graph(graph, compute_layout(graph, "circular"))
+        assert len(plt.get_fignums()) == before
+
+    def test_short_label(self):
+        assert short_label("короткое") == "короткое"
+        assert len(short_label("очень длинное название отдела")) == LABEL_MAX_LENGTH
+
+
+class TestRenderCache:
+    """Тесты для RenderCache"""
+
+    def test_rendered_once_per_key(self):
+        """Тест что картинка рисуется один раз на набор настроек"""
+        graph = sample_graph()
+        pos = compute_layout(graph, "circular")
+        key = layout_key(0, {'document'}, "circular")
+        cache = RenderCache()
+
+        first = cache.render(key, graph, pos, 1500, True)
+        assert cache.render(key, graph, pos, 1500, True) is first
+        assert cache.renders == 1
+
+        cache.render(key, graph, pos, 1500, False)
+        cache.render(key, graph, pos, 800, True)
+        cache.render(layout_key(1, {'document'}, "circular"), graph, pos, 1500, True)
+        assert cache.renders == 4
+
+    def test_labels_setting_ignored_on_fast_path(self):
+        """Тест что для большого графа настройка подписей не дает новую картинку"""
+        graph = large_graph()
+        pos = compute_layout(graph, "circular")
+        cache = RenderCache()
+        cache.render("large", graph, pos, 1500, True)
+        cache.render("large", graph, pos, 1500, False)
+        assert cache.renders == 1
+
+    def test_lru_eviction(self):
+        graph = sample_graph()
+        pos = compute_layout(graph, "circular")
+        cache = RenderCache(maxsize=2)
+        for size in (100, 200, 300):
+            cache.render("layout", graph, pos, size, False)
+        assert len(cache) == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
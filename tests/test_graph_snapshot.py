@@ -0,0 +1,191 @@
+"""
+Тесты для двоичных снимков графа (graph_snapshot).
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import json
+import numpy as np
+import pytest
+import graph_snapshot
+from graph_index import SIGNED_BY
+from graph_store import Adjacency, CompactGraph
+from graph_snapshot import (
+    save_snapshot,
+    load_snapshot,
+    load_or_build,
+    read_header,
+    file_source_key,
+    MAGIC,
+    SNAPSHOT_VERSION,
+    _PREAMBLE
+)
+from tests.test_knowledge_graph import random_org
+
+
+@pytest.fixture
+def org():
+    return random_org(7, documents=300)
+
+
+@pytest.fixture
+def store(org):
+    return CompactGraph.from_objects(*org)
+
+
+class TestGraphSnapshot:
+    """Тесты для save_snapshot / load_snapshot / load_or_build"""
+
+    def test_roundtrip(self, store, tmp_path):
+        """Тест что загруженный снимок отвечает так же, как исходный граф"""
+        path = str(tmp_path / "graph.snapshot")
+        save_snapshot(store, path, "key")
+        loaded = load_snapshot(path, "key")
+
+        assert loaded.names == store.names
+        assert loaded.strings == store.strings
+        assert np.array_equal(loaded.kind, store.kind)
+        for column, values in store.columns.items():
+            assert np.array_equal(loaded.columns[column], values, equal_nan=values.dtype.kind == 'f')
+        assert loaded.get_graph_statistics() == store.get_graph_statistics()
+        assert loaded.compute_signature_routes() == store.compute_signature_routes()
+
+    def test_arrays_are_memory_mapped(self, store, tmp_path):
+        """Тест что массивы не копируются в память и доступны только для чтения"""
+        path = str(tmp_path / "graph.snapshot")
+        save_snapshot(store, path)
+        loaded = load_snapshot(path)
+        assert isinstance(loaded.kind.base, np.memmap) or isinstance(loaded.kind, np.memmap)
+        assert not loaded.kind.flags.writeable
+
+    def test_corruption_detected(self, store, tmp_path):
+        """Тест проверки контрольной суммы"""
+        path = str(tmp_path / "graph.snapshot")
+        save_snapshot(store, path)
+        with open(path, 'r+b') as f:
+            f.seek(-10, os.SEEK_END)
+            f.write(b"\xff")
+        with pytest.raises(ValueError, match="checksum"):
+            load_snapshot(path)
+
+    def test_header_in_checksum(self, store, tmp_path):
+        """Тест что изменение заголовка тоже ловится контрольной суммой"""
+        path = tmp_path / "graph.snapshot"
+        save_snapshot(store, str(path), "key1")
+        path.write_bytes(path.read_bytes().replace(b'"key1"', b'"key2"', 1))
+        with pytest.raises(ValueError, match="checksum"):
+            load_snapshot(str(path), "key2")
+
+    def test_missing_adjacency_part(self, store, tmp_path, monkeypatch):
+        """Тест что снимок без части смежности - ValueError, а не KeyError"""
+        arrays = graph_snapshot._arrays
+
+        def without_indices(graph):
+            parts = arrays(graph)
+            del parts[f'adjacency/{SIGNED_BY}/indices']
+            return parts
+
+        monkeypatch.setattr(graph_snapshot, '_arrays', without_indices)
+        path = str(tmp_path / "graph.snapshot")
+        save_snapshot(store, path)
+        with pytest.raises(ValueError, match="missing indices"):
+            load_snapshot(path)
+
+    def test_inconsistent_adjacency(self, store, tmp_path):
+        """Тест что смежность не по числу узлов или со ссылками на несуществующие узлы - ValueError"""
+        path = str(tmp_path / "graph.snapshot")
+        adjacency = store.adjacency[SIGNED_BY]
+
+        store.adjacency[SIGNED_BY] = Adjacency(adjacency.indptr[:-1], adjacency.indices)
+        save_snapshot(store, path)
+        with pytest.raises(ValueError, match="node count"):
+            load_snapshot(path)
+
+        indices = adjacency.indices.copy()
+        indices[0] = len(store)
+        store.adjacency[SIGNED_BY] = Adjacency(adjacency.indptr, indices)
+        save_snapshot(store, path)
+        with pytest.raises(ValueError, match="missing nodes"):
+            load_snapshot(path)
+        with pytest.raises(ValueError, match="missing nodes"):
+            load_snapshot(path, verify=False)
+
+    def test_truncated_and_foreign_files(self, store, tmp_path):
+        """Тест обрезанного файла и файла другого формата"""
+        path = str(tmp_path / "graph.snapshot")
+        save_snapshot(store, path)
+        with open(path, 'r+b') as f:
+            f.truncate(os.path.getsize(path) - 64)
+        with pytest.raises(ValueError):
+            load_snapshot(path)
+
+        other = tmp_path / "other.bin"
+        other.write_bytes(b"not a snapshot at all")
+        with pytest.raises(ValueError, match="Not a graph snapshot"):
+            read_header(str(other))
+
+    def test_stale_key(self, store, tmp_path):
+        """Тест что снимок с другим ключом считается устаревшим"""
+        path = str(tmp_path / "graph.snapshot")
+        save_snapshot(store, path, "old")
+        with pytest.raises(ValueError, match="stale"):
+            load_snapshot(path, "new")
+
+    def test_load_or_build(self, org, tmp_path):
+        """Тест загрузки с пересборкой при отсутствующем, устаревшем и поврежденном снимке"""
+        path = str(tmp_path / "graph.snapshot")
+        builds = []
+
+        def build():
+            builds.append(1)
+            return CompactGraph.from_objects(*org)
+
+        key = "key"
+        first = load_or_build(path, key, build)
+        second = load_or_build(path, key, build)
+        assert len(builds) == 1
+        assert second.names == first.names
+
+        load_or_build(path, key + "changed", build)
+        assert len(builds) == 2
+
+        with open(path, 'r+b') as f:
+            f.seek(-10, os.SEEK_END)
+            f.write(b"\xff")
+        load_or_build(path, key + "changed", build)
+        assert len(builds) == 3
+
+    def test_header_without_keys(self, org, tmp_path):
+        """Тест что заголовок без обязательных полей - ValueError, а load_or_build пересобирает граф"""
+        path = tmp_path / "graph.snapshot"
+        header = json.dumps({'source_key': "key"}).encode('utf-8')
+        path.write_bytes(_PREAMBLE.pack(MAGIC, SNAPSHOT_VERSION, len(header), 0) + header)
+        with pytest.raises(ValueError, match="missing"):
+            load_snapshot(str(path), "key")
+        store = load_or_build(str(path), "key", lambda: CompactGraph.from_objects(*org))
+        assert len(store) == len(CompactGraph.from_objects(*org))
+        assert load_snapshot(str(path), "key").names == store.names
+
+    def test_unsaveable_strings(self, org, tmp_path):
+        """Тест что строка с \\0 не роняет load_or_build: граф возвращается без снимка"""
+        org[1][0].position = "Бухгалтер\0"
+        path = tmp_path / "graph.snapshot"
+        store = load_or_build(str(path), "key", lambda: CompactGraph.from_objects(*org))
+        assert "Бухгалтер\0" in store.strings
+        assert not path.exists()
+
+    def test_file_source_key(self, tmp_path):
+        """Тест ключа по файлам: меняется вместе с файлом, отсутствующий файл - свой ключ"""
+        source = tmp_path / "data.py"
+        source.write_text("A = 1\n")
+        key = file_source_key(str(source))
+        assert key == file_source_key(str(source))
+        source.write_text("A = 22\n")
+        assert key != file_source_key(str(source))
+        assert file_source_key(str(tmp_path / "missing.py")) != file_source_key(str(source))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,112 @@
+"""
+Тесты для компактного хранилища графа (graph_store).
+Ответы CompactGraph сравниваются с запросами к nx.DiGraph.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+import knowledge_graph as kg
+from knowledge_graph import create_document_flow_graph
+from graph_index import INDEX_KEY
+from graph_stats import STATS_KEY
+from graph_store import CompactGraph, DOCUMENT, node_objects
+from tests.test_knowledge_graph import random_org, sample_graph, sample_documents
+from models import create_sample_departments, create_sample_employees, create_sample_document_types
+
+
+def sample_store():
+    return CompactGraph.from_objects(
+        create_sample_departments(),
+        create_sample_employees(),
+        sample_documents(),
+        create_sample_document_types()
+    )
+
+
+class TestCompactGraph:
+    """Тесты для CompactGraph"""
+
+    @pytest.mark.parametrize("seed", [0, 5])
+    def test_queries_match_networkx(self, seed):
+        """Тест что все запросы совпадают с knowledge_graph"""
+        org = random_org(seed, documents=500)
+        graph = create_document_flow_graph(*org)
+        store = CompactGraph.from_objects(*org)
+
+        assert len(store) == graph.number_of_nodes()
+        assert store.number_of_edges() == graph.number_of_edges()
+        assert store.get_graph_statistics() == kg.get_graph_statistics(graph)
+
+        for node, node_type in graph.nodes(data='type'):
+            assert set(store.find_related_entities(node)) == set(kg.find_related_entities(graph, node))
+            if node_type == 'document':
+                assert store.find_approval_chain(node) == kg.find_approval_chain(graph, node)
+                assert set(store.find_who_can_sign(node)) == set(kg.find_who_can_sign(graph, node))
+                route = store.find_signature_route(node)
+                expected = kg.find_signature_route(graph, node)
+                assert set(route.pop('can_sign')) == set(expected.pop('can_sign'))
+                assert set(route.pop('next_step')) == set(expected.pop('next_step'))
+                assert route == expected
+            elif node_type == 'department':
+                assert store.find_documents_by_department(node) == kg.find_documents_by_department(graph, node)
+                assert store.find_employees_in_department(node) == kg.find_employees_in_department(graph, node)
+
+    def test_from_networkx(self):
+        """Тест упаковки готового nx-графа"""
+        graph = sample_graph()
+        store = CompactGraph.from_networkx(graph)
+        assert store.find_approval_chain("DOG-2024-015") == kg.find_approval_chain(graph, "DOG-2024-015")
+        assert set(store.find_who_can_sign("INV-2024-001")) == set(kg.find_who_can_sign(graph, "INV-2024-001"))
+        assert store.get_graph_statistics() == kg.get_graph_statistics(graph)
+
+    def test_to_networkx(self):
+        """Тест выгрузки для визуализации: те же узлы, ребра и атрибуты"""
+        graph = sample_graph()
+        exported = sample_store().to_networkx()
+        assert set(exported.edges(data='relation')) == set(graph.edges(data='relation'))
+        assert dict(exported.nodes(data='type')) == dict(graph.nodes(data='type'))
+        assert exported.nodes["INV-2024-001"]['amount'] == 250000.0
+        assert exported.nodes["INV-2024-001"]['status'] == "pending"
+        assert exported.nodes["Иванова Мария Петровна"]['max_amount'] == 500000.0
+
+    @pytest.mark.parametrize("seed", [0, 5])
+    def test_to_networkx_with_objects(self, seed):
+        """Тест что выгрузка с объектами моделей заменяет create_document_flow_graph"""
+        org = random_org(seed, documents=300)
+        graph = create_document_flow_graph(*org)
+        restored = CompactGraph.from_objects(*org).to_networkx(node_objects(*org))
+
+        assert dict(restored.nodes(data=True)) == dict(graph.nodes(data=True))
+        assert list(restored.edges(data='relation')) == list(graph.edges(data='relation'))
+        assert vars(restored.graph[INDEX_KEY]) == vars(graph.graph[INDEX_KEY])
+        assert vars(restored.graph[STATS_KEY]) == vars(graph.graph[STATS_KEY])
+        assert list(restored.graph[STATS_KEY].node_types) == list(graph.graph[STATS_KEY].node_types)
+        assert list(restored.graph[STATS_KEY].documents_by_status) == \
+            list(graph.graph[STATS_KEY].documents_by_status)
+        assert kg.get_graph_statistics(restored) == kg.get_graph_statistics(graph)
+        assert kg.get_document_statistics(restored) == kg.get_document_statistics(graph)
+        assert kg.compute_signature_routes(restored) == kg.compute_signature_routes(graph)
+        for node in graph.nodes:
+            assert kg.find_related_entities(restored, node) == kg.find_related_entities(graph, node)
+
+    def test_missing_nodes(self):
+        """Тест запросов по несуществующим узлам"""
+        store = sample_store()
+        assert store.find_approval_chain("missing") == []
+        assert store.find_who_can_sign("missing") == []
+        assert store.find_signature_route("missing") == {}
+        assert store.find_employees_in_department("missing") == []
+
+    def test_compute_signature_routes(self):
+        """Тест пакетных маршрутов"""
+        store = sample_store()
+        routes = store.compute_signature_routes()
+        assert len(routes) == int((store.kind == DOCUMENT).sum())
+        assert routes["DOG-2024-015"] == store.find_signature_route("DOG-2024-015")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
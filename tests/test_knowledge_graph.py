@@ -0,0 +1,553 @@
+"""
+Тесты для графа знаний (knowledge_graph) и его индексов.
+Индексированные запросы сравниваются с прямым обходом графа.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import random
+import pytest
+from models import (
+    Department,
+    Employee,
+    Document,
+    DocumentType,
+    create_sample_departments,
+    create_sample_employees,
+    create_sample_document_types
+)
+from knowledge_graph import (
+    create_document_flow_graph,
+    find_approval_chain,
+    find_who_can_sign,
+    find_signature_route,
+    compute_signature_routes,
+    get_graph_statistics,
+    get_document_statistics,
+    get_query_cache,
+    QueryCache,
+    find_related_entities,
+    find_documents_by_department,
+    find_employees_in_department,
+    add_document,
+    add_signature,
+    update_status,
+    remove_document,
+    move_employee,
+    subscribe,
+    unsubscribe,
+    DOCUMENT_ADDED,
+    SIGNATURE_ADDED,
+    EMPLOYEE_MOVED
+)
+from graph_index import get_flow_index, rebuild_flow_index, INDEX_KEY
+from graph_stats import GraphStats, get_graph_stats
+
+
+# ========================================
+# ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ
+# ========================================
+
+def sample_documents():
+    """Документы со страницы main_lab3.py"""
+    return [
+        Document("INV-2024-001", "invoice", "Козлов Дмитрий Андреевич", "Финансовый отдел",
+                 "2024-02-01", 250000.0, ["Иванова Мария Петровна"], "pending"),
+        Document("DOG-2024-015", "contract", "Новикова Елена Сергеевна", "Отдел закупок",
+                 "2024-02-05", 850000.0, ["Петров Сергей Иванович", "Сидорова Анна Васильевна"], "pending"),
+        Document("ACT-2024-032", "act", "Козлов Дмитрий Андреевич", "Финансовый отдел",
+                 "2024-02-08", 120000.0, [], "draft"),
+        Document("RCP-2024-099", "receipt", "Козлов Дмитрий Андреевич", "Финансовый отдел",
+                 "2024-02-09", 15000.0, ["Иванова Мария Петровна"], "approved"),
+    ]
+
+
+def sample_graph():
+    return create_document_flow_graph(
+        create_sample_departments(),
+        create_sample_employees(),
+        sample_documents(),
+        create_sample_document_types()
+    )
+
+
+def random_org(seed=0, departments=12, employees=300, documents=2000):
+    """Случайная организация: отделы, сотрудники с разными лимитами, документы."""
+    rng = random.Random(seed)
+    depts = [Department(f"Отдел {i}", f"Руководитель {i}", level=i % 3) for i in range(departments)]
+    emps = [
+        Employee(f"Руководитель {i}", f"Отдел {i}", "Руководитель", True, rng.choice([0.0, 1e6, 5e5]))
+        for i in range(departments)
+    ]
+    for i in range(employees):
+        emps.append(Employee(
+            f"Сотрудник {i}",
+            f"Отдел {rng.randrange(departments)}",
+            "Специалист",
+            can_sign=rng.random() < 0.5,
+            max_sign_amount=rng.choice([0.0, 1e4, 5e4, 1e5, 1e5, 3e5, 1e6])
+        ))
+    types = [
+        DocumentType(name, name, 2, rng.sample([d.name for d in depts], rng.randint(1, 4)))
+        for name in ("invoice", "contract", "act", "receipt")
+    ]
+    docs = []
+    for i in range(documents):
+        signers = rng.sample([e.name for e in emps], rng.randint(0, 3))
+        docs.append(Document(
+            f"DOC-{i}",
+            rng.choice(["invoice", "contract", "act", "receipt", "unknown"]),
+            rng.choice(emps).name,
+            f"Отдел {rng.randrange(departments)}",
+            "2024-01-01",
+            rng.choice([1000.0, 1e4, 5e4, 1e5, 2e5, 1e6, 5e6]),
+            signers,
+            rng.choice(["draft", "pending", "approved", "rejected"])
+        ))
+    return depts, emps, docs, types
+
+
+def scan_approval_chain(graph, document_number):
+    """Эталон: обход соседей, как до появления индекса."""
+    if document_number not in graph:
+        return []
+    type_node = next(
+        (n for n in graph.successors(document_number) if graph.nodes[n]['type'] == 'document_type'),
+        None
+    )
+    if type_node is None:
+        return []
+    return [
+        dept for dept in graph.successors(type_node)
+        if graph.nodes[dept]['type'] == 'department'
+        and graph.edges[type_node, dept].get('relation') == 'approval_required'
+    ]
+
+
+def scan_who_can_sign(graph, document_number):
+    if document_number not in graph:
+        return set()
+    amount = graph.nodes[document_number]['data'].total_amount
+    return {
+        emp
+        for dept in scan_approval_chain(graph, document_number)
+        for emp in graph.predecessors(dept)
+        if graph.nodes[emp]['type'] == 'employee' and graph.nodes[emp]['data'].can_sign_document(amount)
+    }
+
+
+def scan_approval_chain_of_type(graph, type_node):
+    return [
+        dept for dept in graph.successors(type_node)
+        if graph.edges[type_node, dept].get('relation') == 'approval_required'
+    ]
+
+
+# ========================================
+# ТЕСТЫ ИНДЕКСА
+# ========================================
+
+class TestDocumentFlowIndex:
+    """Тесты для индексированных запросов"""
+
+    def test_index_built_with_graph(self):
+        """Тест что индекс создается вместе с графом"""
+        assert INDEX_KEY in sample_graph().graph
+
+    def test_sample_approval_chain(self):
+        """Тест цепочки согласования на примере из main_lab3"""
+        graph = sample_graph()
+        assert find_approval_chain(graph, "DOG-2024-015") == [
+            "Юридический отдел", "Отдел закупок", "Генеральная дирекция"
+        ]
+        assert find_approval_chain(graph, "missing") == []
+
+    def test_sample_who_can_sign(self):
+        """Тест подписантов: лимит 500 000 отсекает Иванову для суммы 850 000"""
+        graph = sample_graph()
+        assert set(find_who_can_sign(graph, "INV-2024-001")) == {
+            "Иванова Мария Петровна", "Смирнов Александр Николаевич"
+        }
+        assert set(find_who_can_sign(graph, "DOG-2024-015")) == {
+            "Петров Сергей Иванович", "Смирнов Александр Николаевич"
+        }
+
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_matches_graph_scan(self, seed):
+        """Тест что индекс дает те же ответы, что и обход графа"""
+        graph = create_document_flow_graph(*random_org(seed, documents=600))
+        for document in (n for n, t in graph.nodes(data='type') if t == 'document'):
+            assert find_approval_chain(graph, document) == scan_approval_chain(graph, document)
+            assert set(find_who_can_sign(graph, document)) == scan_who_can_sign(graph, document)
+
+    def test_amount_boundary_is_inclusive(self):
+        """Тест что сумма, равная лимиту, может быть подписана"""
+        graph = sample_graph()
+        graph.nodes["INV-2024-001"]['data'].total_amount = 500000.0
+        graph.graph.pop(INDEX_KEY)
+        assert "Иванова Мария Петровна" in find_who_can_sign(graph, "INV-2024-001")
+
+    def test_rebuilt_after_direct_networkx_change(self):
+        """Тест что индекс перестраивается, если граф изменили в обход API"""
+        graph = sample_graph()
+        graph.add_node("type_memo", type="document_type")
+        graph.add_edge("type_memo", "Финансовый отдел", relation="approval_required")
+        graph.add_edge("INV-2024-001", "type_memo", relation="is_type")
+        graph.remove_edge("INV-2024-001", "type_invoice")
+        assert find_approval_chain(graph, "INV-2024-001") == ["Финансовый отдел"]
+
+    def test_explicit_rebuild_after_edge_change(self):
+        """Тест что изменения одних ребер подхватываются после rebuild_flow_index"""
+        graph = sample_graph()
+        graph.add_edge("INV-2024-001", "Смирнов Александр Николаевич", relation="signed_by")
+        rebuild_flow_index(graph)
+        assert "Смирнов Александр Николаевич" in find_signature_route(graph, "INV-2024-001")['already_signed']
+
+
+# ========================================
+# ТЕСТЫ ТАБЛИЦЫ ДОПУСКА
+# ========================================
+
+class TestEligibilityTable:
+    """Тесты для таблиц допуска к подписи по типу и сумме"""
+
+    @pytest.mark.parametrize("seed", [0, 6])
+    def test_lookup_matches_scan(self, seed):
+        """Тест что поиск по диапазонам совпадает с проверкой каждого сотрудника"""
+        depts, emps, docs, types = random_org(seed, documents=0)
+        graph = create_document_flow_graph(depts, emps, docs, types)
+        index = get_flow_index(graph)
+        amounts = [0.0, 1.0, 1e4, 1e4 + 1, 5e4, 1e5, 2e5, 3e5, 5e5, 1e6, 1e6 + 1, 1e9]
+        for dt in types:
+            type_node = f"type_{dt.name}"
+            chain = scan_approval_chain_of_type(graph, type_node)
+            for amount in amounts:
+                expected = {
+                    emp for dept in chain for emp in graph.predecessors(dept)
+                    if graph.nodes[emp]['type'] == 'employee'
+                    and graph.nodes[emp]['data'].can_sign_document(amount)
+                }
+                assert set(index.eligibility_for(type_node).lookup(amount)) == expected
+
+    def test_table_reused_until_employees_change(self):
+        """Тест что таблица не пересчитывается при работе с документами"""
+        graph = sample_graph()
+        index = get_flow_index(graph)
+        find_who_can_sign(graph, "INV-2024-001")
+        table = index.eligibility["type_invoice"]
+
+        add_document(graph, Document("INV-2", "invoice", "Козлов Дмитрий Андреевич",
+                                     "Финансовый отдел", "2024-03-01", 10.0))
+        add_signature(graph, "INV-2", "Иванова Мария Петровна")
+        find_who_can_sign(graph, "INV-2")
+        assert index.eligibility["type_invoice"] is table
+
+        move_employee(graph, "Иванова Мария Петровна", "Отдел закупок")
+        assert "type_invoice" not in index.eligibility
+        assert "Иванова Мария Петровна" not in find_who_can_sign(graph, "INV-2")
+
+
+# ========================================
+# ТЕСТЫ ИНКРЕМЕНТАЛЬНЫХ ОБНОВЛЕНИЙ
+# ========================================
+
+class TestIncrementalUpdates:
+    """Тесты для add_document, add_signature, update_status, remove_document, move_employee"""
+
+    def test_add_document_matches_rebuild(self):
+        """Тест что добавленный документ дает те же связи, что и полная сборка"""
+        depts, emps, docs, types = random_org(3, documents=200)
+        graph = create_document_flow_graph(depts, emps, docs[:100], types)
+        index = get_flow_index(graph)
+        for doc in docs[100:]:
+            add_document(graph, doc)
+        assert get_flow_index(graph) is index
+
+        rebuilt = create_document_flow_graph(depts, emps, docs, types)
+        assert set(graph.edges(data='relation')) == set(rebuilt.edges(data='relation'))
+        for doc in docs:
+            number = doc.document_number
+            assert find_approval_chain(graph, number) == find_approval_chain(rebuilt, number)
+            assert set(find_who_can_sign(graph, number)) == set(find_who_can_sign(rebuilt, number))
+
+    def test_add_document_duplicate(self):
+        """Тест что повторное добавление документа - ошибка"""
+        graph = sample_graph()
+        with pytest.raises(ValueError):
+            add_document(graph, sample_documents()[0])
+
+    def test_add_signature(self):
+        """Тест подписи: ребро, данные документа и маршрут"""
+        graph = sample_graph()
+        change = add_signature(graph, "ACT-2024-032", "Смирнов Александр Николаевич")
+        assert change.kind == SIGNATURE_ADDED
+        assert change.affected == {"ACT-2024-032", "Смирнов Александр Николаевич"}
+        assert graph.nodes["ACT-2024-032"]['data'].signed_by == ["Смирнов Александр Николаевич"]
+        route = find_signature_route(graph, "ACT-2024-032")
+        assert route['already_signed'] == ["Смирнов Александр Николаевич"]
+        assert add_signature(graph, "ACT-2024-032", "Смирнов Александр Николаевич") is None
+        with pytest.raises(KeyError):
+            add_signature(graph, "ACT-2024-032", "Финансовый отдел")
+
+    def test_update_status(self):
+        """Тест смены статуса"""
+        graph = sample_graph()
+        assert update_status(graph, "ACT-2024-032", "pending").affected == {"ACT-2024-032"}
+        assert graph.nodes["ACT-2024-032"]['status'] == "pending"
+        assert graph.nodes["ACT-2024-032"]['data'].current_status == "pending"
+        assert update_status(graph, "ACT-2024-032", "pending") is None
+
+    def test_remove_document(self):
+        """Тест удаления документа вместе со связями и записями индекса"""
+        graph = sample_graph()
+        change = remove_document(graph, "INV-2024-001")
+        assert "INV-2024-001" not in graph
+        assert {"Финансовый отдел", "type_invoice", "Иванова Мария Петровна"} <= change.affected
+        assert find_approval_chain(graph, "INV-2024-001") == []
+        assert "INV-2024-001" not in get_flow_index(graph).doc_type
+        with pytest.raises(KeyError):
+            remove_document(graph, "INV-2024-001")
+
+    def test_move_employee(self):
+        """Тест перевода сотрудника: меняются подписанты цепочки"""
+        graph = sample_graph()
+        index = get_flow_index(graph)
+        assert "Иванова Мария Петровна" in find_who_can_sign(graph, "INV-2024-001")
+
+        change = move_employee(graph, "Иванова Мария Петровна", "Отдел закупок")
+        assert change.kind == EMPLOYEE_MOVED
+        assert {"Финансовый отдел", "Отдел закупок"} <= change.affected
+        assert "Иванова Мария Петровна" not in find_who_can_sign(graph, "INV-2024-001")
+        assert graph.nodes["Иванова Мария Петровна"]['data'].department == "Отдел закупок"
+        assert get_flow_index(graph) is index
+        assert set(find_who_can_sign(graph, "INV-2024-001")) == scan_who_can_sign(graph, "INV-2024-001")
+        assert move_employee(graph, "Иванова Мария Петровна", "Отдел закупок") is None
+
+    def test_listeners(self):
+        """Тест уведомления подписчиков"""
+        graph = sample_graph()
+        changes = []
+        subscribe(graph, changes.append)
+        add_document(graph, Document("NEW-1", "receipt", "Козлов Дмитрий Андреевич",
+                                     "Финансовый отдел", "2024-03-01", 100.0))
+        update_status(graph, "NEW-1", "pending")
+        unsubscribe(graph, changes.append)
+        remove_document(graph, "NEW-1")
+        assert [c.kind for c in changes] == [DOCUMENT_ADDED, "status_updated"]
+
+
+# ========================================
+# ТЕСТЫ ПАКЕТНЫХ МАРШРУТОВ
+# ========================================
+
+class TestSignatureRoutes:
+    """Тесты для compute_signature_routes"""
+
+    @pytest.mark.parametrize("seed", [0, 4])
+    def test_matches_graph_scan(self, seed):
+        """Тест что групповые маршруты совпадают с обходом графа по документу"""
+        graph = create_document_flow_graph(*random_org(seed, documents=1500))
+        routes = compute_signature_routes(graph)
+        documents = [n for n, t in graph.nodes(data='type') if t == 'document']
+        assert set(routes) == set(documents)
+
+        for number in documents:
+            route = routes[number]
+            signed = [
+                s for s in graph.successors(number)
+                if graph.nodes[s]['type'] == 'employee'
+                and graph.edges[number, s]['relation'] == 'signed_by'
+            ]
+            chain = scan_approval_chain(graph, number)
+            assert route['approval_chain'] == chain
+            assert route['already_signed'] == signed
+            assert set(route['can_sign']) == scan_who_can_sign(graph, number)
+            assert set(route['next_step']) == scan_who_can_sign(graph, number) - set(signed)
+            assert route['is_complete'] == (len(signed) >= len(chain))
+
+    def test_single_route(self):
+        """Тест что find_signature_route совпадает с пакетным вариантом"""
+        graph = sample_graph()
+        route = find_signature_route(graph, "DOG-2024-015")
+        assert route == compute_signature_routes(graph, ["DOG-2024-015"])["DOG-2024-015"]
+        assert route['already_signed'] == ["Петров Сергей Иванович", "Сидорова Анна Васильевна"]
+        assert route['next_step'] == ["Смирнов Александр Николаевич"]
+        assert find_signature_route(graph, "missing") == {}
+
+    def test_missing_documents_skipped(self):
+        """Тест что неизвестные номера пропускаются"""
+        graph = sample_graph()
+        assert set(compute_signature_routes(graph, ["INV-2024-001", "missing"])) == {"INV-2024-001"}
+
+    def test_routes_are_independent(self):
+        """Тест что списки в маршрутах одной группы не разделяются"""
+        graph = sample_graph()
+        add_document(graph, Document("INV-2", "invoice", "Козлов Дмитрий Андреевич",
+                                     "Финансовый отдел", "2024-03-01", 250000.0))
+        routes = compute_signature_routes(graph, ["INV-2024-001", "INV-2"])
+        routes["INV-2"]['can_sign'].append("x")
+        assert "x" not in routes["INV-2024-001"]['can_sign']
+
+
+# ========================================
+# ТЕСТЫ СТАТИСТИКИ
+# ========================================
+
+def scan_statistics(graph):
+    """Эталон: статистика полным обходом графа, как до появления счетчиков."""
+    node_types = {}
+    for _, data in graph.nodes(data=True):
+        node_types[data.get('type', 'unknown')] = node_types.get(data.get('type', 'unknown'), 0) + 1
+    return {
+        'total_nodes': graph.number_of_nodes(),
+        'total_edges': graph.number_of_edges(),
+        'node_types': node_types,
+        'average_degree': sum(dict(graph.degree()).values()) / graph.number_of_nodes()
+    }
+
+
+def stats_counters(stats):
+    return (
+        stats.node_types, stats.edge_relations, stats.degree_sum,
+        stats.documents_by_status, stats.pending_by_department, stats.outstanding_signatures
+    )
+
+
+class TestGraphStatistics:
+    """Тесты для счетчиков статистики"""
+
+    def test_matches_scan(self):
+        """Тест что статистика совпадает с обходом графа"""
+        graph = create_document_flow_graph(*random_org(0, documents=300))
+        assert get_graph_statistics(graph) == scan_statistics(graph)
+
+    def test_document_statistics(self):
+        """Тест операционных показателей на примере из main_lab3"""
+        stats = get_document_statistics(sample_graph())
+        assert stats['documents_by_status'] == {'pending': 2, 'draft': 1, 'approved': 1}
+        assert stats['pending_by_department'] == {'Финансовый отдел': 1, 'Отдел закупок': 1}
+        # INV: цепочка 2, подписей 1; DOG: цепочка 3, подписей 2
+        assert stats['average_outstanding_signatures'] == 1.0
+        assert stats['edges_by_relation']['signed_by'] == 4
+
+    def test_counters_follow_updates(self):
+        """Тест что после серии обновлений счетчики равны пересчету с нуля"""
+        depts, emps, docs, types = random_org(8, documents=300)
+        graph = create_document_flow_graph(depts, emps, docs[:150], types)
+        stats = get_graph_stats(graph)
+        rng = random.Random(8)
+
+        for doc in docs[150:]:
+            add_document(graph, doc)
+        for doc in rng.sample(docs, 100):
+            update_status(graph, doc.document_number, rng.choice(["draft", "pending", "approved"]))
+        for doc in rng.sample(docs, 100):
+            add_signature(graph, doc.document_number, rng.choice(emps).name)
+        for doc in rng.sample(docs, 50):
+            remove_document(graph, doc.document_number)
+        for emp in rng.sample(emps, 30):
+            move_employee(graph, emp.name, rng.choice(depts).name)
+
+        assert get_graph_stats(graph) is stats
+        assert stats_counters(stats) == stats_counters(GraphStats.from_graph(graph))
+        assert get_graph_statistics(graph) == scan_statistics(graph)
+
+
+# ========================================
+# ТЕСТЫ КЭША ЗАПРОСОВ
+# ========================================
+
+class TestQueryCache:
+    """Тесты для QueryCache"""
+
+    def test_repeated_query_is_cached(self):
+        """Тест что повторный запрос берется из кэша, а результат - копия"""
+        graph = sample_graph()
+        cache = get_query_cache(graph)
+        assert get_query_cache(graph) is cache
+
+        route = cache.find_signature_route("DOG-2024-015")
+        route['next_step'].append("x")
+        assert cache.find_signature_route("DOG-2024-015") == find_signature_route(graph, "DOG-2024-015")
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_invalidates_only_dependents(self):
+        """Тест что подпись документа сбрасывает только записи, зависящие от него"""
+        graph = sample_graph()
+        cache = QueryCache(graph)
+        cache.find_signature_route("INV-2024-001")
+        cache.find_signature_route("DOG-2024-015")
+        cache.find_employees_in_department("Отдел закупок")
+
+        add_signature(graph, "INV-2024-001", "Смирнов Александр Николаевич")
+        assert len(cache) == 2
+        assert "Смирнов Александр Николаевич" in cache.find_signature_route("INV-2024-001")['already_signed']
+
+    def test_move_employee_invalidates_routes_through_department(self):
+        """Тест что перевод сотрудника сбрасывает маршруты через его отделы"""
+        graph = sample_graph()
+        cache = QueryCache(graph)
+        assert "Иванова Мария Петровна" in cache.find_who_can_sign("INV-2024-001")
+        cache.find_employees_in_department("Юридический отдел")
+
+        move_employee(graph, "Иванова Мария Петровна", "Отдел закупок")
+        assert "Иванова Мария Петровна" not in cache.find_who_can_sign("INV-2024-001")
+        assert cache.misses == 3
+        cache.find_employees_in_department("Юридический отдел")
+        assert cache.hits == 1
+
+    def test_new_document_becomes_visible(self):
+        """Тест что пустой результат по еще не добавленному документу сбрасывается"""
+        graph = sample_graph()
+        cache = QueryCache(graph)
+        assert cache.find_signature_route("NEW-1") == {}
+        assert "NEW-1" not in cache.find_documents_by_department("Финансовый отдел")
+        add_document(graph, Document("NEW-1", "receipt", "Козлов Дмитрий Андреевич",
+                                     "Финансовый отдел", "2024-03-01", 100.0))
+        assert cache.find_signature_route("NEW-1")['document'] == "NEW-1"
+        assert "NEW-1" in cache.find_documents_by_department("Финансовый отдел")
+
+    def test_matches_uncached_after_updates(self):
+        """Тест что после серии обновлений кэш отвечает так же, как прямые запросы"""
+        depts, emps, docs, types = random_org(9, documents=200)
+        graph = create_document_flow_graph(depts, emps, docs, types)
+        cache = QueryCache(graph, maxsize=500)
+        rng = random.Random(9)
+        queries = [
+            (cache.find_related_entities, find_related_entities, [e.name for e in emps[:20]]),
+            (cache.find_signature_route, find_signature_route, [d.document_number for d in docs[:50]]),
+            (cache.find_employees_in_department, find_employees_in_department, [d.name for d in depts]),
+            (cache.find_documents_by_department, find_documents_by_department, [d.name for d in depts]),
+        ]
+        for step in range(40):
+            action = step % 3
+            if action == 0:
+                add_signature(graph, rng.choice(docs[:50]).document_number, rng.choice(emps[:20]).name)
+            elif action == 1:
+                move_employee(graph, rng.choice(emps).name, rng.choice(depts).name)
+            else:
+                update_status(graph, rng.choice(docs).document_number, rng.choice(["draft", "pending"]))
+            for cached, direct, args in queries:
+                for arg in rng.sample(args, 5):
+                    result = cached(arg)
+                    expected = direct(graph, arg)
+                    if isinstance(result, list):
+                        assert sorted(result) == sorted(expected)
+                    else:
+                        assert result == expected
+        assert cache.hits > 0
+
+    def test_direct_networkx_change_clears_cache(self):
+        """Тест что изменение в обход API сбрасывает кэш"""
+        graph = sample_graph()
+        cache = QueryCache(graph)
+        cache.find_related_entities("Финансовый отдел")
+        graph.add_node("Новый сотрудник", type="employee")
+        graph.add_edge("Новый сотрудник", "Финансовый отдел", relation="works_in")
+        assert "Новый сотрудник" in cache.find_related_entities("Финансовый отдел")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
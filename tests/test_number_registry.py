@@ -0,0 +1,227 @@
+"""
+Тесты для реестра принятых номеров (number_registry) и колонки "Ранее принят".
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import io
+import pandas as pd
+import pytest
+from number_registry import (
+    BloomFilter,
+    MIN_CAPACITY,
+    NumberRegistry,
+    number_key,
+    REGISTERED_COLUMN,
+    REGISTERED_MESSAGE
+)
+from batch_engine import validate_csv_stream, main as batch_main
+
+
+# ========================================
+# ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ
+# ========================================
+
+def keys(count, prefix="INV", inn="7707083893"):
+    return [number_key("invoice", inn, f"{prefix}-{i}") for i in range(count)]
+
+
+def batch_csv(*numbers):
+    """CSV пакета счетов с заданными номерами (без ошибок валидации)."""
+    return pd.DataFrame({
+        "document_type": "invoice",
+        "document_number": list(numbers),
+        "issue_date": "2024-01-15",
+        "expiry_date": "2099-01-15",
+        "total_amount": 1000,
+        "inn": "7707083893",
+        "is_signed": "True",
+    }).to_csv(index=False)
+
+
+# ========================================
+# ФИЛЬТР БЛУМА
+# ========================================
+
+class TestBloomFilter:
+    """Тесты для BloomFilter"""
+
+    def test_no_false_negatives(self):
+        """Тест что добавленные ключи всегда найдены"""
+        bloom = BloomFilter.for_capacity(10_000, 0.01)
+        added = keys(10_000)
+        bloom.add_many(added)
+        assert bloom.contains_many(added).all()
+
+    def test_false_positive_rate(self):
+        """Тест что доля ложных срабатываний близка к расчетной"""
+        bloom = BloomFilter.for_capacity(10_000, 0.01)
+        bloom.add_many(keys(10_000))
+        assert bloom.contains_many(keys(10_000, prefix="ACT")).mean() < 0.02
+
+    def test_invalid_parameters(self):
+        """Тест некорректных параметров"""
+        with pytest.raises(ValueError):
+            BloomFilter.for_capacity(0, 0.01)
+        with pytest.raises(ValueError):
+            BloomFilter.for_capacity(100, 1.5)
+
+
+# ========================================
+# РЕЕСТР
+# ========================================
+
+class TestNumberRegistry:
+    """Тесты для NumberRegistry"""
+
+    def test_contains_is_exact(self, tmp_path):
+        """Тест что ответ точный, даже когда фильтр переполнен"""
+        with NumberRegistry(str(tmp_path / "numbers.sqlite"), capacity=10) as registry:
+            registry.add_many(keys(1000))
+            assert registry.contains_many(keys(1000)).all()
+            assert not registry.contains_many(keys(1000, prefix="ACT")).any()
+
+    def test_uniqueness_per_type_and_inn(self, tmp_path):
+        """Тест что номер уникален в паре (тип, ИНН), а не глобально"""
+        with NumberRegistry(str(tmp_path / "numbers.sqlite")) as registry:
+            registry.add_many([number_key("invoice", "7707083893", "INV-1")])
+            assert registry.contains(number_key("invoice", "7707083893", "inv 1"))
+            assert not registry.contains(number_key("act", "7707083893", "INV-1"))
+            assert not registry.contains(number_key("invoice", "1234567890", "INV-1"))
+
+    def test_bulk_insert_ignores_repeats(self, tmp_path):
+        """Тест что повторная вставка не увеличивает реестр"""
+        with NumberRegistry(str(tmp_path / "numbers.sqlite")) as registry:
+            assert registry.add_many(keys(100)) == 100
+            assert registry.add_many(keys(150)) == 50
+            assert len(registry) == 150
+
+    def test_never_seen_skips_disk(self, tmp_path):
+        """Тест что для новых номеров база почти не читается"""
+        with NumberRegistry(str(tmp_path / "numbers.sqlite"), capacity=10_000) as registry:
+            registry.add_many(keys(10_000))
+            registry.contains_many(keys(10_000, prefix="ACT"))
+            assert registry.disk_lookups < 200
+
+    def test_persistence(self, tmp_path):
+        """Тест что реестр и фильтр переживают перезапуск"""
+        path = str(tmp_path / "numbers.sqlite")
+        with NumberRegistry(path) as registry:
+            registry.add_many(keys(100))
+        with NumberRegistry(path) as registry:
+            assert len(registry) == 100
+            assert registry.contains_many(keys(100)).all()
+
+    def test_filter_sized_from_database(self, tmp_path):
+        """Тест что фильтр рассчитан по числу номеров в базе и растет вместе с ней"""
+        with NumberRegistry(str(tmp_path / "numbers.sqlite")) as registry:
+            assert registry.bloom.capacity == MIN_CAPACITY
+            assert registry.bloom.bits.nbytes < 200_000
+        with NumberRegistry(str(tmp_path / "small.sqlite"), capacity=10) as registry:
+            registry.add_many(keys(1000))
+            assert registry.bloom.capacity >= 1000
+            assert registry.contains_many(keys(1000)).all()
+
+    def test_unchanged_filter_not_rewritten(self, tmp_path):
+        """Тест что close() не перезаписывает неизменившийся фильтр"""
+        path = str(tmp_path / "numbers.sqlite")
+        with NumberRegistry(path) as registry:
+            registry.add_many(keys(10))
+        saved = os.stat(registry.bloom_path)
+        with NumberRegistry(path) as registry:
+            assert registry.contains_many(keys(10)).all()
+        stat = os.stat(registry.bloom_path)
+        assert (stat.st_ino, stat.st_mtime_ns) == (saved.st_ino, saved.st_mtime_ns)
+
+    def test_numbers_added_by_other_registry(self, tmp_path):
+        """Тест что номер, принятый другим процессом после открытия, не принимается повторно"""
+        path = str(tmp_path / "numbers.sqlite")
+        with NumberRegistry(path) as first, NumberRegistry(path) as second:
+            second.add_many(keys(5))
+            assert first.try_add_many(keys(6)).tolist() == [False] * 5 + [True]
+        with NumberRegistry(path) as registry:
+            assert len(registry) == 6
+
+    def test_stale_filter_is_rebuilt(self, tmp_path):
+        """Тест что фильтр, отставший от базы, перестраивается"""
+        path = str(tmp_path / "numbers.sqlite")
+        with NumberRegistry(path) as registry:
+            registry.add_many(keys(10))
+            registry.bloom.save(registry.bloom_path, 0)
+            registry._db.close()
+        with NumberRegistry(path) as registry:
+            assert registry.contains_many(keys(10)).all()
+
+
+# ========================================
+# ИНТЕГРАЦИЯ С BATCH
+# ========================================
+
+class TestBatchRegistry:
+    """Тесты колонки "Ранее принят" в потоковой валидации"""
+
+    def run(self, tmp_path, csv, **kwargs):
+        output = tmp_path / "out.csv"
+        with NumberRegistry(str(tmp_path / "numbers.sqlite")) as registry:
+            stats = validate_csv_stream(io.StringIO(csv), str(output), registry=registry, **kwargs)
+        return stats, pd.read_csv(output, keep_default_na=False)
+
+    def test_second_upload_is_flagged(self, tmp_path):
+        """Тест что номер из прошлого пакета отмечается в следующем"""
+        stats, results = self.run(tmp_path, batch_csv("INV-1", "INV-2"))
+        assert stats.registered == 0
+        stats, results = self.run(tmp_path, batch_csv("INV-3", "INV-2"))
+        assert results[REGISTERED_COLUMN].tolist() == ["", "Да"]
+        assert stats.registered == 1
+        assert results["Результат"].tolist()[1] == REGISTERED_MESSAGE
+        assert (stats.ok, stats.warnings) == (1, 1)
+
+    def test_rejected_documents_not_registered(self, tmp_path):
+        """Тест что документы с ошибками в реестр не попадают"""
+        csv = batch_csv("INV-1").replace("2024-01-15", "2024-02-30")
+        self.run(tmp_path, csv)
+        stats, _ = self.run(tmp_path, batch_csv("INV-1"))
+        assert stats.registered == 0
+
+    def test_repeat_within_batch(self, tmp_path):
+        """Тест что повтор в том же пакете отмечается и в следующих чанках, и в том же чанке"""
+        for chunk_size in (1, 10):
+            directory = tmp_path / str(chunk_size)
+            directory.mkdir()
+            stats, results = self.run(directory, batch_csv("INV-1", "inv 1", "INV-2"), chunk_size=chunk_size)
+            assert results[REGISTERED_COLUMN].tolist() == ["", "Да", ""]
+            assert results["Статус"].tolist() == ["✅", "⚠️", "✅"]
+            assert stats.registered == 1
+
+    def test_error_verdict_kept(self, tmp_path):
+        """Тест что ошибка у повтора не заменяется предупреждением"""
+        self.run(tmp_path, batch_csv("INV-1"))
+        csv = batch_csv("INV-1").replace("2024-01-15", "2024-02-30")
+        stats, results = self.run(tmp_path, csv)
+        assert results[REGISTERED_COLUMN].tolist() == ["Да"]
+        assert results["Результат"][0].startswith("[ERROR]")
+        assert stats.errors == 1
+
+    def test_accepted_by_other_session(self, tmp_path):
+        """Тест что номер, принятый в другой сессии после открытия реестра, отмечается"""
+        path = str(tmp_path / "numbers.sqlite")
+        with NumberRegistry(path) as registry, NumberRegistry(path) as other:
+            other.add_many([number_key("invoice", "7707083893", "INV-2")])
+            stats = validate_csv_stream(
+                io.StringIO(batch_csv("INV-1", "INV-2")), str(tmp_path / "out.csv"), registry=registry
+            )
+        results = pd.read_csv(tmp_path / "out.csv", keep_default_na=False)
+        assert results[REGISTERED_COLUMN].tolist() == ["", "Да"]
+        assert results["Результат"].tolist()[1] == REGISTERED_MESSAGE
+        assert stats.registered == 1
+
+    def test_cli(self, tmp_path, capsys):
+        """Тест флага --registry в CLI"""
+        source = tmp_path / "in.csv"
+        source.write_text(batch_csv("INV-1"), encoding="utf-8")
+        registry = str(tmp_path / "numbers.sqlite")
+        for _ in range(2):
+            batch_main([str(source), "-o", str(tmp_path / "out.csv"), "--registry", registry])
+        assert "Ранее приняты:   1" in capsys.readouterr().out
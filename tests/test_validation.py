@@ -5,11 +5,16 @@
 
 import sys
 import os
+import json
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 import pytest
+from dataclasses import replace
 from datetime import datetime, timedelta
 from document_validators import (
+    parse_date,
+    clear_date_cache,
+    date_cache_info,
     validate_date_format,
     validate_date_not_past,
     validate_expiry_date,
@@ -18,7 +23,21 @@ from document_validators import (
     validate_required_fields,
     validate_document_type
 )
-from logic import check_rules
+from logic import (
+    check_rules,
+    check_rules_verdict,
+    evaluate_document,
+    get_validation_summary,
+    validate_document,
+    get_rule_set,
+    load_rules,
+    ValidationContext,
+    Severity,
+    Verdict,
+    run_plan,
+    RULES_PATH
+)
+from mock_data import ALL_DOCUMENTS, get_all_test_cases
 
 
 # ========================================
@@ -68,6 +87,43 @@ class TestDateValidators:
         assert is_valid == False
 
 
+class TestDateParsing:
+    """Тесты для общего слоя разбора дат"""
+    
+    def test_fast_path(self):
+        """Тест канонической даты"""
+        assert parse_date("2024-02-04") == datetime(2024, 2, 4).date()
+    
+    def test_non_padded_date_still_accepted(self):
+        """Тест что формат, который принимал strptime, по-прежнему принимается"""
+        assert parse_date("2024-2-4") == datetime(2024, 2, 4).date()
+    
+    def test_error_text_matches_strptime(self):
+        """Тест что текст ошибки совпадает с datetime.strptime"""
+        for value in ["2024-02-30", "04-02-2024", "2024-13-01"]:
+            with pytest.raises(ValueError) as expected:
+                datetime.strptime(value, "%Y-%m-%d")
+            with pytest.raises(ValueError) as actual:
+                parse_date(value)
+            assert str(actual.value) == str(expected.value)
+    
+    def test_each_string_parsed_once(self):
+        """Тест что повторный разбор берется из кэша"""
+        clear_date_cache()
+        for _ in range(5):
+            validate_date_format("2030-01-01")
+            validate_expiry_date("2030-01-01", "2030-06-01")
+        info = date_cache_info()
+        assert info.misses == 2
+        assert info.currsize == 2
+    
+    def test_expiry_error_message_unchanged(self):
+        """Тест что сообщение об ошибке разбора не изменилось"""
+        is_valid, msg = validate_expiry_date("2024-02-30", "2024-03-01")
+        assert is_valid == False
+        assert msg == "Date parsing error: day is out of range for month"
+
+
 class TestINNValidator:
     """Тесты для валидатора ИНН"""
     
@@ -284,6 +340,222 @@ class TestInferenceEngine:
         assert "[WARNING]" in result
 
 
+class TestRuleSet:
+    """Тесты для скомпилированной базы знаний (RuleSet)"""
+    
+    def _copy_rules(self, tmp_path):
+        path = tmp_path / "rules.json"
+        with open(RULES_PATH, 'r', encoding='utf-8') as f:
+            path.write_text(f.read(), encoding='utf-8')
+        return str(path)
+    
+    def test_rule_set_types(self):
+        """Тест что списки и пороги приведены к типизированным полям"""
+        rule_set = get_rule_set()
+        assert isinstance(rule_set.allowed_types, frozenset)
+        assert isinstance(rule_set.blacklisted_types, frozenset)
+        assert "draft" in rule_set.blacklisted_types
+        assert rule_set.inn_lengths == frozenset({10, 12})
+        assert rule_set.max_amount == 10000000.0
+        assert rule_set.required_fields_for("unknown") == ()
+    
+    def test_rule_set_is_shared(self):
+        """Тест что повторные вызовы возвращают тот же объект"""
+        assert get_rule_set() is get_rule_set()
+    
+    def test_load_rules_returns_copy(self):
+        """Тест что load_rules отдает независимую копию"""
+        rules = load_rules()
+        rules['thresholds']['max_amount'] = 1
+        assert load_rules()['thresholds']['max_amount'] == 10000000.0
+    
+    def test_touch_without_changes_keeps_rule_set(self, tmp_path):
+        """Тест что изменение mtime без изменения содержимого не пересобирает правила"""
+        path = self._copy_rules(tmp_path)
+        first = get_rule_set(path)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert get_rule_set(path) is first
+    
+    def test_changed_file_invalidates_rule_set(self, tmp_path):
+        """Тест что изменение содержимого файла пересобирает правила"""
+        path = self._copy_rules(tmp_path)
+        first = get_rule_set(path)
+        rules = load_rules()
+        rules['thresholds']['max_amount'] = 5000.0
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(rules, f)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        second = get_rule_set(path)
+        assert second is not first
+        assert second.version != first.version
+        assert second.max_amount == 5000.0
+
+
+class TestValidationPlan:
+    """Тесты для скомпилированного плана проверок"""
+    
+    def test_plan_is_cached_per_type(self):
+        """Тест что план компилируется один раз на тип документа"""
+        rule_set = get_rule_set()
+        assert rule_set.plan_for("invoice") is rule_set.plan_for("invoice")
+        assert rule_set.plan_for("invoice") is not rule_set.plan_for("act")
+    
+    def test_plan_node_order(self):
+        """Тест порядка проверок: критические -> обязательные -> предупреждения"""
+        plan = get_rule_set().plan_for("contract")
+        ids = [node.check_id for node in plan.nodes]
+        assert ids[:3] == ["is_signed", "document_type", "required_fields"]
+        assert ids[-2:] == ["expiring_soon", "large_amount"]
+    
+    def test_validate_document_matches_separate_calls(self):
+        """Тест что один проход дает тот же вердикт и отчет, что и две функции"""
+        for name, document in ALL_DOCUMENTS.items():
+            verdict, summary = validate_document(document)
+            assert str(verdict) == check_rules(document), name
+            assert summary == get_validation_summary(document), name
+    
+    def test_summary_collects_checks_after_error(self):
+        """Тест что отчет содержит все проверки, даже если вердикт - ошибка"""
+        document = dict(ALL_DOCUMENTS["error_unsigned"])
+        verdict, summary = validate_document(document)
+        assert verdict.severity is Severity.ERROR
+        assert verdict.rule_id == "is_signed"
+        assert set(summary['checks']) == {
+            'is_signed', 'document_type', 'required_fields', 'issue_date', 'inn', 'amount'
+        }
+        assert summary['checks']['is_signed']['status'] == 'FAIL'
+        assert summary['overall_status'] == 'FAIL'
+
+
+class TestValidationContext:
+    """Тесты для контекста прогона (опорная дата)"""
+    
+    def test_cutoff_precomputed(self):
+        """Тест что дата отсечки предупреждения считается один раз при создании"""
+        context = ValidationContext.create("2024-02-04")
+        assert context.reference_date == datetime(2024, 2, 4).date()
+        assert context.expiry_warning_cutoff == datetime(2024, 3, 5).date()
+    
+    def test_mock_data_as_of_its_date(self):
+        """Тест что сценарии mock_data дают ожидаемые вердикты на дату их составления"""
+        context = ValidationContext.create("2024-02-04")
+        for category in get_all_test_cases().values():
+            for name, document in category["documents"].items():
+                result = check_rules(document, context=context)
+                assert category["expected_result"] in result, (name, result)
+    
+    def test_same_document_differs_by_reference_date(self):
+        """Тест что вердикт зависит только от опорной даты контекста"""
+        document = ALL_DOCUMENTS["warning_expiring_soon"]
+        assert "[WARNING]" in check_rules(document, context=ValidationContext.create("2024-02-04"))
+        assert "[ERROR]" in check_rules(document, context=ValidationContext.create("2024-03-01"))
+        assert "[OK]" in check_rules(document, context=ValidationContext.create("2023-06-01"))
+    
+    def test_summary_uses_context(self):
+        """Тест что отчет принимает тот же контекст"""
+        context = ValidationContext.create("2024-02-04")
+        verdict, summary = validate_document(ALL_DOCUMENTS["valid_invoice"], context=context)
+        assert verdict.is_ok
+        assert summary == get_validation_summary(ALL_DOCUMENTS["valid_invoice"], context=context)
+
+
+class TestVerdict:
+    """Тесты для структурированных вердиктов"""
+    
+    def test_text_matches_check_rules(self):
+        """Тест что str(Verdict) совпадает со строковым вердиктом"""
+        context = ValidationContext.create("2024-02-04")
+        for name, document in ALL_DOCUMENTS.items():
+            verdict = check_rules_verdict(document, context=context)
+            assert str(verdict) == check_rules(document, context=context), name
+    
+    def test_severity_matches_prefix(self):
+        """Тест что severity соответствует префиксу текста"""
+        context = ValidationContext.create("2024-02-04")
+        for category in get_all_test_cases().values():
+            for name, document in category["documents"].items():
+                verdict = check_rules_verdict(document, context=context)
+                assert f"[{verdict.severity.label}]" == category["expected_result"], name
+    
+    def test_rule_id_of_failed_check(self):
+        """Тест что вердикт знает, какое правило сработало"""
+        context = ValidationContext.create("2024-02-04")
+        verdict = check_rules_verdict(ALL_DOCUMENTS["error_unsigned"], context=context)
+        assert verdict.rule_id == "is_signed"
+        assert len(verdict.parts) == 1
+    
+    def test_warnings_are_separate_parts(self):
+        """Тест что каждое предупреждение - отдельная часть вердикта"""
+        verdict = Verdict(Severity.WARNING, "expiring_soon", (
+            ("[WARNING] {detail}", "first"),
+            ("[WARNING] {detail}", "second"),
+        ))
+        assert verdict.lines() == ["[WARNING] first", "[WARNING] second"]
+        assert str(verdict) == "[WARNING] first\n[WARNING] second"
+    
+    def test_severity_ordering(self):
+        """Тест что коды severity упорядочены по тяжести"""
+        assert Severity.OK < Severity.WARNING < Severity.ERROR
+        assert int(Severity.ERROR) == 2
+    
+    def test_no_instance_dict(self):
+        """Тест что вердикт не несет __dict__ (используются __slots__)"""
+        verdict = Verdict(Severity.OK, "ok", (("[OK] done", ""),))
+        assert not hasattr(verdict, "__dict__")
+
+
+class TestCollectAllErrors:
+    """Тесты для режима сбора всех ошибок"""
+    
+    def _broken_document(self):
+        document = dict(ALL_DOCUMENTS["valid_invoice"])
+        document.update(is_signed=False, inn="123", total_amount=-5)
+        return document
+    
+    def test_collects_every_error(self):
+        """Тест что все ошибки документа возвращаются за один вызов"""
+        report = evaluate_document(self._broken_document(), context=ValidationContext.create("2024-02-04"))
+        assert [e.rule_id for e in report.errors] == ["is_signed", "inn", "amount"]
+        assert all(e.severity is Severity.ERROR for e in report.errors)
+    
+    def test_verdict_matches_check_rules(self):
+        """Тест что вердикт отчета совпадает с check_rules"""
+        context = ValidationContext.create("2024-02-04")
+        for name, document in list(ALL_DOCUMENTS.items()) + [("broken", self._broken_document())]:
+            report = evaluate_document(document, context=context)
+            assert str(report.verdict) == check_rules(document, context=context), name
+    
+    def test_warnings_collected_alongside_errors(self):
+        """Тест что предупреждения возвращаются вместе с ошибками"""
+        document = dict(ALL_DOCUMENTS["warning_expiring_soon"], is_signed=False)
+        report = evaluate_document(document, context=ValidationContext.create("2024-02-04"))
+        assert [e.rule_id for e in report.errors] == ["is_signed"]
+        assert [w.rule_id for w in report.warnings] == ["expiring_soon"]
+        assert report.messages() == [str(report.errors[0]), str(report.warnings[0])]
+    
+    def test_summary_built_from_same_pass(self):
+        """Тест что get_validation_summary - это отчет evaluate_document"""
+        document = self._broken_document()
+        assert evaluate_document(document).summary == get_validation_summary(document)
+    
+    def test_each_rule_runs_once(self):
+        """Тест что каждый узел плана выполняется не больше одного раза"""
+        plan = get_rule_set().plan_for("invoice")
+        calls = []
+        
+        def counted(node):
+            def run(document, context):
+                calls.append(node.check_id)
+                return node.run(document, context)
+            return replace(node, run=run)
+        
+        counted_plan = replace(plan, nodes=tuple(counted(node) for node in plan.nodes))
+        run_plan(self._broken_document(), counted_plan, ValidationContext.create(), collect_all=True)
+        assert len(calls) == len(set(calls))
+        assert {"is_signed", "inn", "amount", "large_amount"} <= set(calls)
+
 # ========================================
 # ЗАПУСК ТЕСТОВ
 # ========================================
@@ -0,0 +1,151 @@
+"""
+Тесты для кэша результатов валидации (validation_cache).
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+from mock_data import ALL_DOCUMENTS
+from logic import check_rules_verdict, evaluate_document, get_rule_set, RuleSet, ValidationContext
+from validation_cache import ValidationCache, document_key, KIND_REPORT
+
+
+CONTEXT = ValidationContext.create("2024-02-04")
+
+
+class TestDocumentKey:
+    """Тесты для ключа кэша"""
+
+    def test_key_ignores_key_order(self):
+        """Тест что порядок ключей словаря не влияет на хэш"""
+        document = ALL_DOCUMENTS["valid_invoice"]
+        reordered = dict(reversed(list(document.items())))
+        rules = get_rule_set()
+        assert document_key(document, rules, CONTEXT) == document_key(reordered, rules, CONTEXT)
+
+    def test_key_depends_on_content_date_and_rules(self):
+        """Тест что ключ меняется вместе с документом, датой и версией правил"""
+        document = ALL_DOCUMENTS["valid_invoice"]
+        rules = get_rule_set()
+        base = document_key(document, rules, CONTEXT)
+        assert base != document_key(dict(document, inn="123"), rules, CONTEXT)
+        assert base != document_key(document, rules, ValidationContext.create("2024-02-05"))
+        other_rules = RuleSet.from_dict(rules.raw, "other-version")
+        assert base != document_key(document, other_rules, CONTEXT)
+        assert base != document_key(document, rules, CONTEXT, KIND_REPORT)
+
+    def test_in_memory_rule_sets_differ(self):
+        """Тест что наборы правил из словаря без версии получают разные ключи"""
+        document = ALL_DOCUMENTS["valid_invoice"]
+        raw = get_rule_set().raw
+        changed = dict(raw, thresholds=dict(raw['thresholds'], max_amount=1.0))
+        first, second = RuleSet.from_dict(raw), RuleSet.from_dict(changed)
+        assert first.version and first.version == RuleSet.from_dict(dict(raw)).version
+        assert document_key(document, first, CONTEXT) != document_key(document, second, CONTEXT)
+
+    def test_key_keeps_value_types(self):
+        """Тест что 15000 и 15000.0 - разные ключи (тексты вердиктов различаются)"""
+        document = dict(ALL_DOCUMENTS["valid_invoice"], total_amount=15000)
+        rules = get_rule_set()
+        assert document_key(document, rules, CONTEXT) != document_key(
+            dict(document, total_amount=15000.0), rules, CONTEXT
+        )
+
+
+class TestValidationCache:
+    """Тесты для LRU-кэша"""
+
+    def test_results_match_uncached(self):
+        """Тест что кэш возвращает те же вердикты и отчеты"""
+        cache = ValidationCache()
+        for _ in range(2):
+            for name, document in ALL_DOCUMENTS.items():
+                assert cache.check(document, context=CONTEXT) == check_rules_verdict(document, context=CONTEXT), name
+                assert cache.evaluate(document, context=CONTEXT) == evaluate_document(document, context=CONTEXT), name
+
+    def test_hit_rate(self):
+        """Тест метрик попаданий и промахов"""
+        cache = ValidationCache()
+        document = ALL_DOCUMENTS["valid_invoice"]
+        cache.check(document, context=CONTEXT)
+        cache.check(document, context=CONTEXT)
+        cache.check(document, context=CONTEXT)
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.size) == (2, 1, 1)
+        assert stats.hit_rate == pytest.approx(2 / 3)
+
+    def test_results_are_copies(self):
+        """Тест что изменение полученного результата не портит следующие попадания"""
+        cache = ValidationCache()
+        document = ALL_DOCUMENTS["valid_invoice"]
+        report = cache.evaluate(document, context=CONTEXT)
+        expected = evaluate_document(document, context=CONTEXT)
+        report.summary['overall_status'] = "DECORATED"
+        report.summary['checks'].clear()
+        report.verdict.rule_id = "changed"
+        cache.check(document, context=CONTEXT).rule_id = "changed"
+
+        assert cache.evaluate(document, context=CONTEXT) == expected
+        assert cache.check(document, context=CONTEXT) == check_rules_verdict(document, context=CONTEXT)
+
+    def test_lru_eviction(self):
+        """Тест что вытесняется давно не использованная запись"""
+        cache = ValidationCache(maxsize=2)
+        first, second, third = list(ALL_DOCUMENTS.values())[:3]
+        cache.check(first, context=CONTEXT)
+        cache.check(second, context=CONTEXT)
+        cache.check(first, context=CONTEXT)
+        cache.check(third, context=CONTEXT)
+        stats = cache.stats()
+        assert (stats.size, stats.evictions) == (2, 1)
+        cache.check(first, context=CONTEXT)
+        assert cache.stats().hits == 2
+
+    def test_invalid_size(self):
+        """Тест некорректного размера кэша"""
+        with pytest.raises(ValueError):
+            ValidationCache(maxsize=0)
+
+    def test_disk_store_survives_restart(self, tmp_path):
+        """Тест что результаты читаются из SQLite после пересоздания кэша"""
+        path = str(tmp_path / "cache.sqlite")
+        documents = list(ALL_DOCUMENTS.values())
+        cache = ValidationCache(path=path)
+        expected = [(cache.check(d, context=CONTEXT), cache.evaluate(d, context=CONTEXT)) for d in documents]
+        cache.close()
+
+        restarted = ValidationCache(path=path)
+        actual = [(restarted.check(d, context=CONTEXT), restarted.evaluate(d, context=CONTEXT)) for d in documents]
+        assert actual == expected
+        stats = restarted.stats()
+        assert stats.misses == 0
+        assert stats.disk_hits == 2 * len(documents)
+        assert stats.disk_size == 2 * len(documents)
+        restarted.close()
+
+    def test_disk_size_limit(self, tmp_path):
+        """Тест что хранилище на диске не растет сверх лимита (старые записи удаляются)"""
+        path = str(tmp_path / "cache.sqlite")
+        documents = [dict(ALL_DOCUMENTS["valid_invoice"], document_number=f"INV-{i}") for i in range(10)]
+        cache = ValidationCache(maxsize=1, path=path, max_disk_size=4)
+        for document in documents:
+            cache.check(document, context=CONTEXT)
+        assert cache.stats().disk_size == 4
+        cache.close()
+
+        restarted = ValidationCache(maxsize=1, path=path, max_disk_size=4)
+        restarted.check(documents[-1], context=CONTEXT)
+        restarted.check(documents[0], context=CONTEXT)
+        stats = restarted.stats()
+        assert (stats.disk_hits, stats.misses, stats.disk_size) == (1, 1, 4)
+        restarted.close()
+
+        smaller = ValidationCache(path=path, max_disk_size=2)
+        assert smaller.stats().disk_size == 2
+        smaller.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])